@@ -0,0 +1,59 @@
+-- Migration v4: Performance / scan pipeline settings
+
+INSERT INTO config (key, value, description) VALUES
+  ('scan_workers',         2,      'Worker processes for scan statistics (0 = run in a thread)')
+ON CONFLICT (key) DO NOTHING;
+
+INSERT INTO config (key, value, description) VALUES
+  ('ohlcv_refresh_sec',    300,    'Min seconds between refreshes of the still-forming daily bar')
+ON CONFLICT (key) DO NOTHING;
+
+-- Publish config changes so every backend process can keep an in-memory copy
+CREATE OR REPLACE FUNCTION config_notify() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('config_changed', json_build_object('op', TG_OP, 'key', OLD.key)::text);
+        RETURN OLD;
+    END IF;
+    PERFORM pg_notify('config_changed', json_build_object('op', TG_OP, 'key', NEW.key, 'value', NEW.value)::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS config_notify ON config;
+CREATE TRIGGER config_notify
+    AFTER INSERT OR UPDATE OR DELETE ON config
+    FOR EACH ROW EXECUTE FUNCTION config_notify();
+
+-- Leg-to-leg fill skew of the opening orders
+ALTER TABLE trades ADD COLUMN IF NOT EXISTS leg_skew_ms INTEGER;
+
+-- Two-stage scan: liquid universe size, log-return prefilter and time budget
+INSERT INTO config (key, value, description) VALUES
+  ('universe_size',          200,    'Liquid USDT-M perps scanned, by 24h volume (0 = all above the volume floor)'),
+  ('prefilter_corr_min',     0.5,    'Min log-return correlation for a pair to reach the full stats stage'),
+  ('scan_clusters',          8,      'Hierarchical clusters on return correlation (0 = no clustering)'),
+  ('candidates_per_cluster', 300,    'Top-K pairs per cluster passed to the full stats stage'),
+  ('scan_budget_ms',         30000,  'Scan time budget; uncached candidates beyond it wait for the next scan'),
+  ('max_stale_days',         2,      'Missing newest daily bars bridged with the last close before a coin drops out of the scan')
+ON CONFLICT (key) DO NOTHING;
+
+-- Intraday bars kept in the local column store (not in Postgres)
+INSERT INTO config (key, value, description) VALUES
+  ('intraday_bars',          0,      'Bars of 1h/4h history synced into the local column store each scan (0 = off)')
+ON CONFLICT (key) DO NOTHING;
+
+-- Backtest-driven config search (engine/optimizer.py); leaderboard in details
+CREATE TABLE IF NOT EXISTS optimizer_runs (
+    id           SERIAL PRIMARY KEY,
+    started_at   TIMESTAMPTZ,
+    finished_at  TIMESTAMPTZ DEFAULT NOW(),
+    method       VARCHAR(20),
+    metric       VARCHAR(20),
+    days         INTEGER,
+    pairs        INTEGER,
+    evaluated    INTEGER,
+    total        INTEGER,
+    live_rank    INTEGER,
+    details      JSONB
+);
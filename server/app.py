@@ -1,6 +1,7 @@
 import os
 import asyncio
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+from typing import Optional
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import socketio
@@ -11,7 +12,12 @@ from engine.scanner import PairsScanner
 from engine.executor import TradeExecutor
 from engine.monitor import PositionMonitor
 from engine.reconciliation import ReconciliationService
-from engine.models import DBManager, get_db_conn, get_pool
+from engine.models import DATABASE_URL, DBManager, get_db_conn, get_pool
+from engine.config_store import config_store
+from engine.compute import shutdown_compute_pool
+from engine.delta_push import DeltaChannel, FastJSON, pair_key, trade_key
+from engine.portfolio_book import portfolio_book
+from engine.pair_results import CursorExpired, pair_results
 
 load_dotenv()
 
@@ -22,9 +28,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Scan-Id", "X-Total-Count", "X-Next-Cursor"],
 )
 
-sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*', json=FastJSON)
 socket_app = socketio.ASGIApp(sio, app)
 
 # Global singletons
@@ -34,14 +41,27 @@ executor        = TradeExecutor(exchange_client)
 monitor         = PositionMonitor(exchange_client, executor)
 reconciler      = ReconciliationService(exchange_client)
 db_manager      = DBManager()
+monitor_task: Optional[asyncio.Task] = None
+
+# How long shutdown waits for monitor-initiated closes (each verifies for ~6s)
+SHUTDOWN_CLOSE_TIMEOUT = 30.0
+
+# Versioned Socket.IO state: full snapshot on connect, changed fields afterwards
+pairs_channel     = DeltaChannel('pairs_update', pair_key)
+positions_channel = DeltaChannel('positions_update', trade_key)
+CHANNELS = {c.event: c for c in (pairs_channel, positions_channel)}
 
 
 @app.on_event("startup")
 async def startup_event():
+    global monitor_task
     print("TradingClaw Backend Starting (Binance USDT-M)...")
     await get_pool()
+    await config_store.start(DATABASE_URL)
+    await push_positions()                  # loads the portfolio book, seeds the positions channel
+    exchange_client.start_market_data()
     asyncio.create_task(auto_scan_loop())
-    asyncio.create_task(auto_monitor_loop())
+    monitor_task = asyncio.create_task(auto_monitor_loop())
     asyncio.create_task(auto_reconcile_loop())
 
 
@@ -50,7 +70,7 @@ async def auto_scan_loop():
         try:
             interval = await db_manager.get_config('scan_interval_sec', 60.0)
             results  = await scanner_engine.scan()
-            await sio.emit('pairs_update', [dict(r) for r in results])
+            await push_pairs(results)
             await asyncio.sleep(float(interval))
         except Exception as e:
             print(f"[AutoScan Error] {e}")
@@ -62,8 +82,7 @@ async def auto_monitor_loop():
         try:
             interval = await db_manager.get_config('monitor_interval_sec', 30.0)
             await monitor.run_once()
-            trades = await db_manager.get_open_trades()
-            await sio.emit('positions_update', trades)
+            await push_positions()
             await asyncio.sleep(float(interval))
         except Exception as e:
             print(f"[Monitor Error] {e}")
@@ -80,25 +99,89 @@ async def auto_reconcile_loop():
             await asyncio.sleep(60)
 
 
+# ═══ Socket.IO push ═══
+
+async def push_pairs(results):
+    delta = pairs_channel.publish(results)
+    if delta is not None:
+        await sio.emit(pairs_channel.event, delta)
+
+
+async def push_positions():
+    trades = await db_manager.get_open_trades()
+    delta = positions_channel.publish(trades, version=portfolio_book.version)
+    if delta is not None:
+        await sio.emit(positions_channel.event, delta)
+
+
+@sio.event
+async def connect(sid, environ):
+    for channel in CHANNELS.values():
+        await sio.emit(channel.event, channel.snapshot(), to=sid)
+
+
+@sio.event
+async def resync(sid, event):
+    """Client saw a gap in seq: resend the full snapshot for that event."""
+    channel = CHANNELS.get(event)
+    if channel is not None:
+        await sio.emit(channel.event, channel.snapshot(), to=sid)
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
+    # No new closes once the monitor loop stops; let the ones in flight finish both legs
+    if monitor_task is not None:
+        monitor_task.cancel()
+        await asyncio.gather(monitor_task, return_exceptions=True)
+    pending = await monitor.wait_closes(timeout=SHUTDOWN_CLOSE_TIMEOUT)
+    if pending:
+        print(f"[Shutdown] {pending} closes still running after {SHUTDOWN_CLOSE_TIMEOUT:.0f}s; check for one-legged positions")
     await exchange_client.close()
+    await config_store.stop()
+    shutdown_compute_pool()
     print("TradingClaw Backend Shutting down...")
 
 
 # ═══ Market Data ═══
 
 @app.get("/api/pairs")
-async def get_pairs():
-    async with (await get_db_conn()) as conn:
-        rows = await conn.fetch("""
-            SELECT symbol_a, symbol_b, correlation, hurst_exp, half_life,
-                   hedge_ratio, zscore, zone, qualified, scanned_at,
-                   cointegration_pvalue, validation_json
-            FROM pairs
-            ORDER BY CASE WHEN qualified THEN 0 ELSE 1 END, ABS(zscore) DESC
-        """)
-        return [dict(r) for r in rows]
+async def get_pairs(
+    request: Request,
+    zone: Optional[str] = None,
+    qualified: Optional[bool] = None,
+    symbol: Optional[str] = None,
+    min_corr: Optional[float] = None,
+    sort: Optional[str] = None,
+    order: str = 'desc',
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+):
+    """
+    Latest scan's pairs from memory. Body stays a plain list; paging and
+    versioning ride in headers (X-Next-Cursor, X-Total-Count, X-Scan-Id,
+    ETag). A matching If-None-Match gets 304 with no body.
+    """
+    if not pair_results.loaded:
+        pair_results.replace(await db_manager.fetch_pairs(), await db_manager.get_last_scan_id())
+
+    params = dict(zone=zone, qualified=qualified, symbol=symbol, min_corr=min_corr,
+                  sort=sort, order=order, limit=limit, cursor=cursor)
+    etag = pair_results.etag(params)
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers={'ETag': etag})
+
+    try:
+        page, next_cursor, total = pair_results.query(**params)
+    except CursorExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {'ETag': etag, 'X-Scan-Id': str(pair_results.scan_id), 'X-Total-Count': str(total)}
+    if next_cursor:
+        headers['X-Next-Cursor'] = next_cursor
+    return Response(content=FastJSON.dumps(page), media_type='application/json', headers=headers)
 
 
 @app.post("/api/scan/trigger")
@@ -106,7 +189,7 @@ async def trigger_scan(background_tasks: BackgroundTasks):
     async def scan_task():
         try:
             results = await scanner_engine.scan()
-            await sio.emit('pairs_update', [dict(r) for r in results])
+            await push_pairs(results)
         except Exception as e:
             print(f"[Scan Error] {e}")
     background_tasks.add_task(scan_task)
@@ -115,16 +198,21 @@ async def trigger_scan(background_tasks: BackgroundTasks):
 
 # ═══ Portfolio & Account ═══
 
+def _trade_symbols(trades) -> list:
+    return list({t['symbol_a'] for t in trades} | {t['symbol_b'] for t in trades})
+
+
 @app.get("/api/portfolio")
 async def get_portfolio():
     balance = await exchange_client.get_balance()
     stats   = await db_manager.get_trade_stats()
 
     open_trades = await db_manager.get_open_trades()
+    prices = await exchange_client.get_prices(_trade_symbols(open_trades))
     unrealized_pnl = 0.0
     enriched_positions = []
     for t in open_trades:
-        pnl = await monitor._estimate_pnl(t)
+        pnl = await monitor._estimate_pnl(t, prices.get(t['symbol_a']), prices.get(t['symbol_b']))
         unrealized_pnl += pnl
         enriched_positions.append({
             'group_id':       str(t['group_id']),
@@ -164,9 +252,10 @@ async def get_portfolio():
 @app.get("/api/positions")
 async def get_positions():
     open_trades = await db_manager.get_open_trades()
+    prices = await exchange_client.get_prices(_trade_symbols(open_trades))
     result = []
     for t in open_trades:
-        pnl = await monitor._estimate_pnl(t)
+        pnl = await monitor._estimate_pnl(t, prices.get(t['symbol_a']), prices.get(t['symbol_b']))
         result.append({
             'group_id':       str(t['group_id']),
             'symbol_a':       t['symbol_a'],
@@ -191,8 +280,7 @@ async def get_positions():
 async def open_trade(payload: dict):
     result = await executor.open_pair(payload)
     if result.get('success'):
-        trades = await db_manager.get_open_trades()
-        await sio.emit('positions_update', trades)
+        await push_positions()
     return result
 
 
@@ -201,8 +289,7 @@ async def close_trade(group_id: str, payload: dict = {}):
     reason = payload.get('reason', 'manual') if payload else 'manual'
     result = await executor.close_pair(group_id, exit_reason=reason)
     if result.get('success'):
-        trades = await db_manager.get_open_trades()
-        await sio.emit('positions_update', trades)
+        await push_positions()
     return result
 
 
@@ -210,9 +297,7 @@ async def close_trade(group_id: str, payload: dict = {}):
 
 @app.get("/api/config")
 async def get_all_configs():
-    async with (await get_db_conn()) as conn:
-        rows = await conn.fetch("SELECT key, value FROM config")
-        return {r['key']: r['value'] for r in rows}
+    return await db_manager.get_all_config()
 
 
 @app.put("/api/config/{key}")
@@ -222,7 +307,20 @@ async def update_config(key: str, data: dict):
             "INSERT INTO config (key, value) VALUES ($1, $2) ON CONFLICT (key) DO UPDATE SET value=$2",
             key, str(data.get('value'))
         )
-        return {"status": "ok"}
+    config_store.set(key, data.get('value'))
+    return {"status": "ok"}
+
+
+# ═══ Optimizer ═══
+
+@app.get("/api/optimizer/leaderboard")
+async def get_optimizer_leaderboard(run_id: Optional[int] = None, limit: int = 20):
+    """Ranked configs of the latest (or given) optimizer run, plus where the live config placed."""
+    run = await db_manager.get_optimizer_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="no optimizer run")
+    run['leaderboard'] = run['leaderboard'][:max(limit, 0)]
+    return run
 
 
 @app.get("/api/health")
@@ -231,6 +329,8 @@ async def health():
         "status": "ok",
         "version": "3.0.0-binance",
         "dry_run": exchange_client.dry_run,
+        "paper": exchange_client.paper,
+        "monitor": monitor.tick_stats(),
     }
 
 
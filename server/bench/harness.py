@@ -0,0 +1,149 @@
+"""
+Timing and allocation measurement for bench.run.
+
+Each case is timed call by call (perf_counter), then run once more under
+tracemalloc for the allocation numbers, so tracing never skews the
+latencies. tracemalloc sees every thread of this process but not the
+scan worker processes, so allocation figures for pool work cover the
+parent side only.
+"""
+import io
+import os
+import sys
+import json
+import time
+import inspect
+import platform
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Metrics compared against the baseline (lower is better)
+GATED = ('p50_ms', 'peak_kb')
+
+# Fewer timed calls than this and p99 is just the slowest one: only max_ms is reported
+P99_MIN_SAMPLES = 100
+
+
+async def _call(fn: Callable[[], Any]):
+    res = fn()
+    if inspect.isawaitable(res):
+        res = await res
+    return res
+
+
+async def measure(
+    name: str, fn: Callable[[], Any], repeat: int = 20, warmup: int = 2, units: int = 1,
+    unit: str = 'op', quiet: bool = True,
+) -> Dict[str, Any]:
+    """
+    Time `fn` (sync or async, no arguments) `repeat` times after `warmup`
+    calls. `units` is how much work one call does (pairs, trades, ...) for
+    the throughput figure. The engine's print logging is swallowed when quiet.
+    """
+    sink = io.StringIO() if quiet else sys.stdout
+    times = []
+    with redirect_stdout(sink):
+        for _ in range(warmup):
+            await _call(fn)
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            await _call(fn)
+            times.append(time.perf_counter() - t0)
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        await _call(fn)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    ms = np.array(times) * 1000
+    mean_s = float(ms.mean()) / 1000
+    return {
+        'name':       name,
+        'repeat':     repeat,
+        'units':      units,
+        'unit':       unit,
+        'mean_ms':    round(float(ms.mean()), 3),
+        'p50_ms':     round(float(np.percentile(ms, 50)), 3),
+        'p99_ms':     round(float(np.percentile(ms, 99)), 3) if len(ms) >= P99_MIN_SAMPLES else None,
+        'max_ms':     round(float(ms.max()), 3),
+        'min_ms':     round(float(ms.min()), 3),
+        'throughput': round(units / mean_s, 1) if mean_s > 0 else None,
+        'peak_kb':    round((peak - before) / 1024, 1),
+        'retained_kb': round((current - before) / 1024, 1),
+    }
+
+
+def scaling_exponent(sizes: Sequence[float], p50_ms: Sequence[float]) -> Optional[float]:
+    """Slope of log(time) vs log(size): ~1 linear, ~2 quadratic."""
+    if len(sizes) < 2:
+        return None
+    slope = np.polyfit(np.log(sizes), np.log(np.maximum(p50_ms, 1e-6)), 1)[0]
+    return round(float(slope), 2)
+
+
+# ─────────────────────────────────────────────────────
+# Baseline
+# ─────────────────────────────────────────────────────
+
+def environment() -> Dict[str, Any]:
+    return {
+        'python':  platform.python_version(),
+        'numpy':   np.__version__,
+        'machine': platform.machine(),
+        'cpus':    os.cpu_count(),
+    }
+
+
+def save_baseline(path: str, results: List[Dict[str, Any]]):
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': {r['name']: r for r in results}}, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions: a gated metric above baseline * (1 + tolerance). Cases missing from the baseline are skipped."""
+    regressions = []
+    recorded = baseline.get('results', {})
+    for r in results:
+        b = recorded.get(r['name'])
+        if not b:
+            continue
+        for metric in GATED:
+            old, new = b.get(metric), r.get(metric)
+            # ignore sub-millisecond / sub-64KB noise floors
+            floor = 1.0 if metric == 'p50_ms' else 64.0
+            if old is None or new is None or max(old, new) < floor:
+                continue
+            if new > old * (1 + tolerance):
+                change = f"+{(new / old - 1) * 100:.0f}%" if old > 0 else "was 0"
+                regressions.append(f"{r['name']}: {metric} {old} -> {new} ({change})")
+    return regressions
+
+
+# ─────────────────────────────────────────────────────
+# Report
+# ─────────────────────────────────────────────────────
+
+def print_table(results: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None):
+    recorded = (baseline or {}).get('results', {})
+    print(f"{'case':34s} {'n':>5s} {'p50 ms':>10s} {'p99 ms':>10s} {'max ms':>10s} {'throughput':>16s} "
+          f"{'peak KB':>10s} {'vs base':>8s}")
+    for r in results:
+        b = recorded.get(r['name'])
+        delta = f"{(r['p50_ms'] / b['p50_ms'] - 1) * 100:+.0f}%" if b and b.get('p50_ms') else ''
+        tput = f"{r['throughput']:.1f} {r['unit']}/s" if r['throughput'] is not None else '-'
+        p99 = f"{r['p99_ms']:10.2f}" if r.get('p99_ms') is not None else f"{'-':>10s}"
+        print(f"{r['name']:34s} {r['repeat']:5d} {r['p50_ms']:10.2f} {p99} {r['max_ms']:10.2f} {tput:>16s} "
+              f"{r['peak_kb']:10.1f} {delta:>8s}")
@@ -0,0 +1,244 @@
+"""
+Open-loop load test of the executor and monitor against the paper venue.
+
+    python -m bench.load                                  # 300 pairs/min for 60s
+    python -m bench.load --pairs-per-min 600 --duration 120 --reject
+
+Pair opens arrive at --pairs-per-min (Poisson) on a synthetic market
+replayed by engine.paper_venue at --speed, each held for ~--hold-sec and
+then closed through TradeExecutor.close_pair; PositionMonitor.run_once
+ticks every --monitor-sec over the growing book. The venue applies its
+latency, slippage and rate-limit models (--reject turns rate-limit waits
+into 429 rejections), and a share of opens (--overlap) deliberately
+reuses a coin already held so the exchange dedup layer has work to do.
+
+Reports end-to-end latency per stage (signal in -> trade persisted,
+close requested -> verified flat and persisted, monitor tick), why opens
+were blocked, and venue totals, including time spent waiting on the
+request-weight budget: a full pair lifecycle costs ~35 weight, so
+Binance's default 2400/min caps sustained throughput well below
+300 pairs/min. A close the executor reports done must leave the venue
+without those legs; a position fetch that fails (e.g. a 429 under
+--reject) makes the close unverified and the trade stays open instead.
+The drain waits out the rate limits and closes whatever is still open;
+afterwards the venue must be flat with no open trades left in the
+FakeDB. The exit code is 1 when any of that fails.
+"""
+import io
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+from contextlib import redirect_stdout
+from typing import Dict, List
+
+import numpy as np
+
+from bench.harness import P99_MIN_SAMPLES
+from engine.column_store import column_store
+from engine.executor import TradeExecutor
+from engine.monitor import PositionMonitor
+from engine.exchange import BinanceClient
+from engine.paper_venue import LatencyModel, PaperVenue, RateLimits, ReplayMarket, SlippageModel
+from sim.fake_db import FakeDB, attach_db
+from sim.synthetic import synthetic_market
+
+# Closes come from the load driver, not the stop rules
+NEVER_CLOSE = {
+    'zscore_sl': 1e9, 'zscore_tp': -1.0, 'max_loss_pct': 1e9, 'corr_break_sl': -2.0,
+    'funding_rate_max': 1.0, 'grace_period_sec': 0,
+}
+
+
+class LoadRun:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.latency: Dict[str, List[float]] = {'open': [], 'open_blocked': [], 'close': [], 'monitor_tick': []}
+        self.blocked: Dict[str, int] = {}
+        self.busy = set()            # coins held or in flight
+        self.tasks = set()
+        self.no_free = 0
+        self.closed_with_legs = 0    # closes reported done while the venue still held a leg
+        self.close_unverified = 0
+
+        market = synthetic_market(n_symbols=args.symbols, n_days=400, seed=args.seed)
+        self.symbols = market.symbols
+        for k, s in enumerate(market.symbols):
+            column_store.write('1d', s, market.days_ms, market.closes[:, k], market.volumes[:, k])
+        # replay the newest bars: the monitor's daily history is already in the store
+        replay = ReplayMarket.from_arrays(market.symbols, market.days_ms, market.closes, market.volumes, '1d',
+                                          start_ms=int(market.days_ms[-30]), speed=args.speed)
+        self.venue = PaperVenue(
+            replay, balance=args.balance, leverage=args.leverage,
+            latency=LatencyModel(args.latency_ms, args.jitter_ms, seed=args.seed),
+            slippage=SlippageModel(spread_bps=args.spread_bps),
+            limits=RateLimits(weight_per_min=args.weight_per_min, throttle=not args.reject),
+        )
+        self.client = BinanceClient()
+        self.client.attach_venue(self.venue)
+        self.db = FakeDB({**NEVER_CLOSE, 'max_open_pairs': 10**9, 'max_same_coin': 1, 'cooldown_sec': 0,
+                          'position_size_usd': args.size_usd}, latency_ms=args.db_latency_ms)
+        self.executor = TradeExecutor(self.client)
+        self.monitor = PositionMonitor(self.client, self.executor)
+        attach_db(self.db, self.executor, self.monitor)
+
+    def _pick_pair(self):
+        free = [s for s in self.symbols if s not in self.busy]
+        if self.busy and self.rng.random() < self.args.overlap and free:
+            return self.rng.choice(sorted(self.busy)), self.rng.choice(free)
+        if len(free) < 2:
+            return None
+        return tuple(self.rng.sample(free, 2))
+
+    async def _pair_lifecycle(self, sa: str, sb: str):
+        overlap = sa in self.busy
+        claimed = {sb} if overlap else {sa, sb}
+        self.busy |= claimed
+        try:
+            self.db.pairs[(sa, sb)] = {'symbol_a': sa, 'symbol_b': sb, 'zscore': 1.0, 'correlation': 0.9,
+                                       'hedge_ratio': 1.0}
+            t0 = time.perf_counter()
+            res = await self.executor.open_pair({
+                'symbol_a': sa, 'symbol_b': sb, 'zscore': self.rng.choice((-2.4, 2.4)),
+                'hedge_ratio': self.rng.uniform(0.8, 1.25), 'correlation': 0.9, 'half_life': 10,
+                'zone': 'safe', 'validation_json': {'sizePct': 1.0},
+            })
+            if not res.get('success'):
+                self.latency['open_blocked'].append(time.perf_counter() - t0)
+                reason = res.get('reason', '?').split(':')[0]
+                self.blocked[reason] = self.blocked.get(reason, 0) + 1
+                return
+            self.latency['open'].append(time.perf_counter() - t0)
+            await asyncio.sleep(self.rng.expovariate(1 / self.args.hold_sec))
+            t0 = time.perf_counter()
+            res = await self.executor.close_pair(res['groupId'], 'load_test')
+            if res.get('success'):
+                self.latency['close'].append(time.perf_counter() - t0)
+                self._check_flat(sa, sb)
+            elif res.get('reason') == 'close_unverified':
+                self.close_unverified += 1
+        finally:
+            self.busy -= claimed
+
+    def _check_flat(self, *coins: str):
+        """Venue's own book after a reported close: no leg left that no open trade accounts for."""
+        open_coins = {c for t in self.db.trades.values() if t['status'] == 'open' for c in (t['symbol_a'], t['symbol_b'])}
+        if any(c in self.venue.positions and c not in open_coins for c in coins):
+            self.closed_with_legs += 1
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            reason = f"crashed: {type(task.exception()).__name__}"
+            self.blocked[reason] = self.blocked.get(reason, 0) + 1
+
+    async def _arrivals(self, until: float):
+        rate = self.args.pairs_per_min / 60
+        while time.perf_counter() < until:
+            await asyncio.sleep(self.rng.expovariate(rate))
+            pair = self._pick_pair()
+            if pair is None:
+                self.no_free += 1
+                continue
+            self._spawn(self._pair_lifecycle(*pair))
+
+    async def _monitor(self, until: float):
+        while time.perf_counter() < until:
+            t0 = time.perf_counter()
+            await self.monitor.run_once()
+            self.latency['monitor_tick'].append(time.perf_counter() - t0)
+            await asyncio.sleep(max(self.args.monitor_sec - (time.perf_counter() - t0), 0))
+
+    async def _progress(self, until: float, out):
+        while time.perf_counter() < until:
+            await asyncio.sleep(10)
+            print(f"[Load] opened={len(self.latency['open'])} closed={len(self.latency['close'])} "
+                  f"blocked={len(self.latency['open_blocked'])} in_flight={len(self.tasks)} "
+                  f"venue_positions={len(self.venue.positions)}", file=out)
+
+    async def run(self, out) -> Dict[str, int]:
+        until = time.perf_counter() + self.args.duration
+        await asyncio.gather(self._arrivals(until), self._monitor(until), self._progress(until, out))
+        # drain: every pair in flight finishes its hold and close
+        if self.tasks:
+            await asyncio.gather(*list(self.tasks), return_exceptions=True)
+        # then, waiting out the limits, close what unverified closes left open
+        self.venue.limits.throttle = True
+        left = await self.db.get_open_trades()
+        results = await asyncio.gather(*(self.executor.close_pair(t['group_id'], 'load_test_drain') for t in left))
+        for t, res in zip(left, results):
+            if res.get('success'):
+                self._check_flat(t['symbol_a'], t['symbol_b'])
+        return {
+            'closed_with_legs': self.closed_with_legs,
+            'close_unverified': self.close_unverified,
+            'left_positions':   len(self.venue.positions),
+            'left_trades':      len(await self.db.get_open_trades()),
+        }
+
+
+def _row(name: str, seconds: List[float]) -> str:
+    if not seconds:
+        return f"{name:14s} {0:8d} {'-':>10s} {'-':>10s} {'-':>10s}"
+    ms = np.array(seconds) * 1000
+    p99 = f"{np.percentile(ms, 99):10.1f}" if len(ms) >= P99_MIN_SAMPLES else f"{'-':>10s}"
+    return f"{name:14s} {len(ms):8d} {np.percentile(ms, 50):10.1f} {p99} {ms.max():10.1f}"
+
+
+async def _main(args) -> int:
+    store_dir = tempfile.TemporaryDirectory(prefix='load-ohlcv-')
+    column_store.root = Path(store_dir.name)
+    out = sys.stdout
+    try:
+        load = LoadRun(args)
+        print(f"[Load] {args.pairs_per_min} pairs/min for {args.duration}s over {args.symbols} symbols "
+              f"(hold ~{args.hold_sec}s, venue latency {args.latency_ms}+{args.jitter_ms}ms)")
+        with redirect_stdout(out if args.verbose else io.StringIO()):
+            checks = await load.run(out)
+    finally:
+        store_dir.cleanup()
+
+    print(f"\n{'stage':14s} {'count':>8s} {'p50 ms':>10s} {'p99 ms':>10s} {'max ms':>10s}")
+    for name, seconds in load.latency.items():
+        print(_row(name, seconds))
+    opened = len(load.latency['open'])
+    print(f"\n[Load] achieved {opened / args.duration * 60:.0f} opens/min "
+          f"({len(load.latency['open_blocked'])} blocked, {load.no_free} arrivals with no free symbols)")
+    for reason, n in sorted(load.blocked.items(), key=lambda kv: -kv[1]):
+        print(f"[Load]   blocked {reason}: {n}")
+    print(f"[Load] venue {load.venue.stats()}")
+    print(f"[Load] checks {checks}")
+    return 1 if checks['closed_with_legs'] or checks['left_positions'] or checks['left_trades'] else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Executor / monitor load test on the paper venue")
+    parser.add_argument('--pairs-per-min', dest='pairs_per_min', type=float, default=300)
+    parser.add_argument('--duration', type=float, default=60, help='seconds of arrivals (the drain runs after)')
+    parser.add_argument('--symbols', type=int, default=400)
+    parser.add_argument('--hold-sec', dest='hold_sec', type=float, default=20, help='mean hold before close')
+    parser.add_argument('--monitor-sec', dest='monitor_sec', type=float, default=5)
+    parser.add_argument('--overlap', type=float, default=0.05, help='share of opens reusing a held coin')
+    parser.add_argument('--size-usd', dest='size_usd', type=float, default=500)
+    parser.add_argument('--balance', type=float, default=1_000_000)
+    parser.add_argument('--leverage', type=float, default=10)
+    parser.add_argument('--latency-ms', dest='latency_ms', type=float, default=20.0, help='venue round-trip base')
+    parser.add_argument('--jitter-ms', dest='jitter_ms', type=float, default=10.0)
+    parser.add_argument('--spread-bps', dest='spread_bps', type=float, default=2.0)
+    parser.add_argument('--db-latency-ms', dest='db_latency_ms', type=float, default=1.0)
+    parser.add_argument('--speed', type=float, default=3600, help='replay speed (3600 = one day per 24s)')
+    parser.add_argument('--weight-per-min', dest='weight_per_min', type=int, default=2400,
+                        help='venue request-weight budget (raise it to isolate engine-side latency)')
+    parser.add_argument('--reject', action='store_true', help='reject over-limit calls instead of waiting')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--verbose', action='store_true', help='show engine logging')
+    sys.exit(asyncio.run(_main(parser.parse_args())))
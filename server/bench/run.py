@@ -0,0 +1,193 @@
+"""
+Offline benchmarks for the scan, monitor and execution hot paths.
+
+    python -m bench.run                        # all cases, compared to bench/baseline.json
+    python -m bench.run --only scan,monitor --quick
+    python -m bench.run --save-baseline        # record this machine's numbers
+
+Everything runs against sim/: deterministic synthetic prices, a fake ccxt
+exchange behind the real BinanceClient (--latency-ms / --jitter-ms per
+call) and the in-memory FakeDB. The column store lives in a temp dir.
+Reports p50 / max latency (p99 too where a case has 100+ calls: the
+cheap single-call cases always do), throughput and allocations per case, a
+scaling exponent per size sweep, and exits 1 when a p50 or peak
+allocation is more than --tolerance above the stored baseline. Baselines
+are per machine: record one where the comparison runs.
+"""
+import os
+import sys
+import asyncio
+import argparse
+import tempfile
+import itertools
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from bench.harness import P99_MIN_SAMPLES, compare, load_baseline, measure, print_table, save_baseline, scaling_exponent
+from engine.column_store import column_store
+from engine.compute import shutdown_compute_pool
+from engine.executor import TradeExecutor
+from engine.monitor import PositionMonitor
+from engine.scanner import PairsScanner
+from engine.stats import compute_all_pair_stats, compute_pair_stats
+from sim.fake_db import FakeDB, attach_db
+from sim.fake_exchange import fake_binance_client
+from sim.synthetic import synthetic_market
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+GROUPS = ('stats', 'scan', 'monitor', 'executor')
+
+# Thresholds no synthetic trade can hit, so the monitored book stays the same size
+NEVER_CLOSE = {
+    'zscore_sl': 1e9, 'zscore_tp': -1.0, 'max_loss_pct': 1e9, 'corr_break_sl': -2.0,
+    'funding_rate_max': 1.0, 'grace_period_sec': 0,
+}
+
+
+async def bench_stats(args) -> List[Dict[str, Any]]:
+    market = synthetic_market(n_symbols=130, n_days=180, seed=args.seed)
+    prices = market.closes
+    a, b = prices[:, 0].tolist(), prices[:, 1].tolist()
+    results = [await measure('stats/compute_pair_stats', lambda: compute_pair_stats(a, b),
+                             repeat=max(args.repeat * 10, P99_MIN_SAMPLES), units=1, unit='pair')]
+    sizes = [500, 2000] if args.quick else [500, 2000, 8000]
+    idx_a, idx_b = np.triu_indices(prices.shape[1], k=1)
+    sweep = []
+    for n in sizes:
+        pairs = (idx_a[:n], idx_b[:n])
+        sweep.append(await measure(f'stats/batch pairs={n}', lambda: compute_all_pair_stats(prices, pairs),
+                                   repeat=args.repeat, units=n, unit='pair'))
+    results += sweep
+    print(f"[Bench] stats/batch scaling exponent {scaling_exponent(sizes, [r['p50_ms'] for r in sweep])}")
+    return results
+
+
+async def bench_scan(args) -> List[Dict[str, Any]]:
+    sizes = [25, 50] if args.quick else [25, 50, 100]
+    market = synthetic_market(n_symbols=150, n_days=400, seed=args.seed)
+    client = fake_binance_client(market, args.latency_ms, args.jitter_ms)
+    db = FakeDB({'scan_workers': args.workers}, latency_ms=args.db_latency_ms)
+    results, warm = [], []
+    for n in sizes:
+        db.config['universe_size'] = n
+        scanner = PairsScanner(client)
+        attach_db(db, scanner)
+        # warm: stats cache and column store already current, i.e. every scan after the first
+        warm.append(await measure(f'scan/warm universe={n}', scanner.scan, repeat=args.repeat, units=1, unit='scan'))
+
+        async def cold_scan():
+            fresh = PairsScanner(client)
+            attach_db(db, fresh)
+            await fresh.scan()
+        # cold: new scanner (empty stats cache), candles already stored
+        results.append(await measure(f'scan/cold universe={n}', cold_scan, repeat=max(args.repeat // 2, 3),
+                                     warmup=1, units=1, unit='scan'))
+    results += warm
+    print(f"[Bench] scan/warm scaling exponent {scaling_exponent(sizes, [r['p50_ms'] for r in warm])}")
+    shutdown_compute_pool()
+    return results
+
+
+async def bench_monitor(args) -> List[Dict[str, Any]]:
+    sizes = [5, 50] if args.quick else [5, 50, 500]
+    market = synthetic_market(n_symbols=60, n_days=200, seed=args.seed)
+    for k, s in enumerate(market.symbols):
+        column_store.write('1d', s, market.days_ms, market.closes[:, k], market.volumes[:, k])
+    client = fake_binance_client(market, args.latency_ms, args.jitter_ms)
+    prices = market.last_prices()
+    pairs = list(itertools.combinations(market.symbols, 2))
+    results = []
+    for n in sizes:
+        db = FakeDB(NEVER_CLOSE, latency_ms=args.db_latency_ms)
+        executor = TradeExecutor(client)
+        monitor = PositionMonitor(client, executor)
+        attach_db(db, executor, monitor)
+        for sa, sb in pairs[:n]:
+            db.pairs[(sa, sb)] = {'symbol_a': sa, 'symbol_b': sb, 'zscore': 1.0, 'correlation': 0.9, 'hedge_ratio': 1.0}
+            db.seed_trade(sa, sb, leg_a_entry_price=prices[sa], leg_b_entry_price=prices[sb])
+        results.append(await measure(f'monitor/run_once trades={n}', monitor.run_once,
+                                     repeat=args.repeat, units=n, unit='trade'))
+        assert len(await db.get_open_trades()) == n, "monitor closed trades during the benchmark"
+    print(f"[Bench] monitor scaling exponent {scaling_exponent(sizes, [r['p50_ms'] for r in results])}")
+    return results
+
+
+async def bench_executor(args) -> List[Dict[str, Any]]:
+    market = synthetic_market(n_symbols=40, n_days=200, seed=args.seed)
+    client = fake_binance_client(market, args.latency_ms, args.jitter_ms)
+    db = FakeDB({'max_open_pairs': 10**9, 'max_same_coin': 10**9, 'cooldown_sec': 0}, latency_ms=args.db_latency_ms)
+    executor = TradeExecutor(client)
+    attach_db(db, executor)
+    pairs = itertools.cycle(itertools.combinations(market.symbols, 2))
+    failures = []
+
+    async def open_next():
+        sa, sb = next(pairs)
+        client.exchange.positions.clear()            # each open starts flat on the venue
+        db.trades.clear()
+        res = await executor.open_pair({
+            'symbol_a': sa, 'symbol_b': sb, 'zscore': 2.4, 'hedge_ratio': 1.1, 'correlation': 0.9,
+            'half_life': 10, 'zone': 'safe', 'validation_json': {'sizePct': 1.0},
+        })
+        if not res.get('success'):
+            failures.append(res.get('reason'))
+
+    result = await measure('executor/open_pair', open_next, repeat=max(args.repeat * 5, P99_MIN_SAMPLES),
+                           units=1, unit='pair')
+    if failures:
+        raise RuntimeError(f"open_pair failed during the benchmark: {failures[:3]}")
+    return [result]
+
+
+async def _main(args) -> int:
+    groups = [g.strip() for g in args.only.split(',')] if args.only else list(GROUPS)
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        raise SystemExit(f"unknown group(s) {sorted(unknown)}; choose from {', '.join(GROUPS)}")
+
+    store_dir = tempfile.TemporaryDirectory(prefix='bench-ohlcv-')
+    column_store.root = Path(store_dir.name)
+    results = []
+    try:
+        for g in groups:
+            print(f"[Bench] {g} ...")
+            results += await globals()[f'bench_{g}'](args)
+    finally:
+        store_dir.cleanup()
+
+    baseline = load_baseline(args.baseline)
+    print()
+    print_table(results, baseline)
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\n[Bench] Baseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"\n[Bench] No baseline at {args.baseline} (run with --save-baseline to record one)")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for r in regressions:
+        print(f"[Bench] REGRESSION {r}")
+    print(f"\n[Bench] {len(regressions)} regression(s) at tolerance {args.tolerance:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Offline hot-path benchmarks")
+    parser.add_argument('--only', default='', help=f"comma list of {','.join(GROUPS)}")
+    parser.add_argument('--quick', action='store_true', help='smaller sweeps and fewer repeats')
+    parser.add_argument('--repeat', type=int, default=None)
+    parser.add_argument('--latency-ms', dest='latency_ms', type=float, default=2.0, help='fake exchange latency per call')
+    parser.add_argument('--jitter-ms', dest='jitter_ms', type=float, default=1.0)
+    parser.add_argument('--db-latency-ms', dest='db_latency_ms', type=float, default=0.5, help='FakeDB latency per call')
+    parser.add_argument('--workers', type=int, default=0, help='scan_workers for the scan cases (0 = thread)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', dest='save_baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.30, help='allowed slowdown before a case fails')
+    args = parser.parse_args()
+    if args.repeat is None:
+        args.repeat = 5 if args.quick else 20
+    sys.exit(asyncio.run(_main(args)))
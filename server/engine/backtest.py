@@ -0,0 +1,269 @@
+"""
+Walk-forward backtest of the live pairs strategy over stored daily history.
+
+    python -m engine.backtest --days 730 --symbols BTC,ETH,SOL,...
+
+Each day t is treated as one end-of-day scan: pair statistics come from the
+trailing `lookback` closes (stats.rolling_pair_stats, same math as the
+scanner), the scanner's stats filter and classify_zone pick the signals,
+TradeExecutor's guards and sizing open them at day t's close, and the
+PositionMonitor rules close them at a later daily close:
+
+    SL4 max loss -> SL1 z-stop -> SL2 time stop -> SL3 corr break -> TP
+
+PnL and fees follow TradeExecutor._compute_pnl (0.04% per side, 4 orders).
+Not modelled: funding payments and the funding-rate exit (no stored
+funding history), intraday stops, and the grace period (shorter than a bar).
+"""
+import math
+import asyncio
+import argparse
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .price_panel import PricePanel
+from .stats import ZONES, classify_zones, rolling_pair_stats
+
+FEE_RATE = 0.0004           # per side, as in TradeExecutor._compute_pnl
+
+EXIT_REASONS = ('sl_max_loss', 'sl_zscore', 'sl_time_stop', 'sl_corr_break', 'take_profit', 'end_of_data')
+
+
+class BacktestResult(NamedTuple):
+    trades: List[Dict[str, Any]]       # one dict per closed trade, in close order
+    days: np.ndarray                   # datetime64 index of the simulated days
+    equity: np.ndarray                 # realized + unrealized PnL (USD) at each day's close
+    summary: Dict[str, Any]
+
+
+def _ffill(a: np.ndarray) -> np.ndarray:
+    """Forward-fill NaN down the day axis (the pairs table keeps the last scanned value)."""
+    idx = np.where(np.isfinite(a), np.arange(a.shape[0])[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return a[idx, np.arange(a.shape[1])]
+
+
+def _param(config: dict, key: str, default: float) -> float:
+    value = config.get(key, default)
+    return float(default if value is None else value)
+
+
+def precompute(prices: np.ndarray, pairs: Tuple[np.ndarray, np.ndarray], lookback: int = 180) -> dict:
+    """Everything run_backtest derives that no config key affects: rolling stats plus the forward-filled z / corr."""
+    stats = rolling_pair_stats(prices, pairs[0], pairs[1], window=lookback)
+    stats['z_now'] = _ffill(stats['zscore'])
+    stats['corr_now'] = _ffill(stats['corr'])
+    return stats
+
+
+def run_backtest(
+    panel: PricePanel,
+    config: dict,
+    pairs: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    lookback: int = 180,
+    start: Optional[int] = None,
+    stats: Optional[dict] = None,
+) -> BacktestResult:
+    """
+    Replay `panel` day by day, vectorized across pairs.
+
+    `pairs` is (idx_a, idx_b) into panel.symbols (default every i<j).
+    `stats` may be a precomputed rolling_pair_stats result for the same
+    panel/pairs/lookback (see precompute), so parameter sweeps that only
+    change thresholds reuse it.
+    """
+    prices = panel.closes
+    n_days = prices.shape[0]
+    idx_a, idx_b = pairs if pairs is not None else np.triu_indices(prices.shape[1], k=1)
+    idx_a = np.asarray(idx_a, dtype=np.intp)
+    idx_b = np.asarray(idx_b, dtype=np.intp)
+    n_pairs = len(idx_a)
+    start = max(lookback - 1 if start is None else start, lookback - 1)
+    if stats is None:
+        stats = rolling_pair_stats(prices, idx_a, idx_b, window=lookback, start=start)
+
+    # ── Config (same keys and defaults as scanner / executor / monitor) ──
+    zscore_entry   = _param(config, 'zscore_entry',       2.0)
+    zscore_sl      = _param(config, 'zscore_sl',          3.0)
+    zscore_tp      = _param(config, 'zscore_tp',          0.5)
+    corr_min       = _param(config, 'corr_min',           0.8)
+    hl_min         = _param(config, 'half_life_min',      2.0)
+    hl_max         = _param(config, 'half_life_max',     35.0)
+    pvalue_max     = _param(config, 'pvalue_max',         0.05)
+    corr_break_sl  = _param(config, 'corr_break_sl',      0.50)
+    max_loss_pct   = _param(config, 'max_loss_pct',       5.0)
+    cooldown_days  = _param(config, 'cooldown_sec',    3600) / 86400
+    max_same_coin  = int(_param(config, 'max_same_coin',  2))
+    max_open_pairs = int(_param(config, 'max_open_pairs', 5))
+    base_size      = _param(config, 'position_size_usd', 500)
+
+    # ── Signals for every simulated (day, pair), fully vectorized; row i is day start + i ──
+    z, corr, beta, hl = stats['zscore'], stats['corr'], stats['beta'], stats['half_life']
+    sim = slice(start, n_days)
+    with np.errstate(invalid='ignore'):
+        stats_pass = (corr[sim] >= corr_min) & (hl[sim] >= hl_min) & (hl[sim] <= hl_max) \
+            & (stats['hurst'][sim] < 0.5) & (stats['pvalue'][sim] <= pvalue_max)
+        zone, size_pct = classify_zones(z[sim], config)
+        signal = stats_pass & (size_pct > 0) & (np.abs(z[sim]) >= zscore_entry) & (beta[sim] > 0)
+    # What the monitor sees for an open trade: the latest scanned z / corr
+    z_now    = stats['z_now']    if 'z_now' in stats    else _ffill(z)
+    corr_now = stats['corr_now'] if 'corr_now' in stats else _ffill(corr)
+
+    # ── Position state, one slot per pair ──
+    is_open   = np.zeros(n_pairs, dtype=bool)
+    entry_day = np.zeros(n_pairs, dtype=np.intp)
+    dir_a     = np.zeros(n_pairs)          # +1 long A / -1 short A (B is always opposite)
+    entry_a   = np.zeros(n_pairs)
+    entry_b   = np.zeros(n_pairs)
+    size_a    = np.zeros(n_pairs)
+    size_b    = np.zeros(n_pairs)
+    entry_hl  = np.zeros(n_pairs)
+    closed_at = np.full(n_pairs, -np.inf)
+    coin_open = np.zeros(prices.shape[1], dtype=np.intp)
+
+    trades: List[Dict[str, Any]] = []
+    realized = 0.0
+    equity = np.zeros(n_days - start)
+
+    def leg_pnl(t):
+        pa, pb = prices[t, idx_a], prices[t, idx_b]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return dir_a * (pa - entry_a) / entry_a * size_a - dir_a * (pb - entry_b) / entry_b * size_b
+
+    def close(k_list, t, reasons):
+        nonlocal realized
+        pnl_gross = leg_pnl(t)
+        for k, reason in zip(k_list, reasons):
+            fees = (size_a[k] + size_b[k]) * 2 * FEE_RATE
+            pnl = float(pnl_gross[k]) - fees if np.isfinite(pnl_gross[k]) else -fees
+            realized += pnl
+            trades.append({
+                'symbol_a':    panel.symbols[idx_a[k]],
+                'symbol_b':    panel.symbols[idx_b[k]],
+                'leg_a_side':  'buy' if dir_a[k] > 0 else 'sell',
+                'leg_b_side':  'sell' if dir_a[k] > 0 else 'buy',
+                'opened':      panel.days[entry_day[k]].item(),
+                'closed':      panel.days[t].item(),
+                'held_days':   int(t - entry_day[k]),
+                'size_a_usd':  float(size_a[k]),
+                'size_b_usd':  float(size_b[k]),
+                'entry_zscore': float(z[entry_day[k], k]),
+                'entry_zone':  ZONES[zone[entry_day[k] - start, k]],
+                'exit_zscore': float(z_now[t, k]) if np.isfinite(z_now[t, k]) else None,
+                'exit_reason': reason,
+                'fees':        round(float(fees), 4),
+                'pnl':         round(pnl, 4),
+            })
+            is_open[k] = False
+            closed_at[k] = t
+            coin_open[idx_a[k]] -= 1
+            coin_open[idx_b[k]] -= 1
+
+    for t in range(start, n_days):
+        # ── Exits: PositionMonitor rules, first matching rule wins ──
+        held = is_open & (entry_day < t)
+        if held.any():
+            pnl = leg_pnl(t)
+            alloc = size_a + size_b
+            with np.errstate(invalid='ignore', divide='ignore'):
+                loss_pct = np.where(pnl < 0, -pnl / alloc * 100, 0.0)
+                zt, ct = z_now[t], corr_now[t]
+                rules = [
+                    loss_pct >= max_loss_pct,
+                    np.abs(zt) >= zscore_sl,
+                    (entry_hl > 0) & ((t - entry_day) >= 2.0 * entry_hl),
+                    ct < corr_break_sl,
+                    np.abs(zt) <= zscore_tp,
+                ]
+            hit = np.zeros(n_pairs, dtype=bool)
+            reason = np.zeros(n_pairs, dtype=np.intp)
+            for r, cond in enumerate(rules):
+                new = held & cond & ~hit
+                reason[new] = r
+                hit |= new
+            if hit.any():
+                ks = np.nonzero(hit)[0]
+                close(ks, t, [EXIT_REASONS[r] for r in reason[ks]])
+
+        # ── Entries: strongest |z| first, TradeExecutor guards in order ──
+        cand = np.nonzero(signal[t - start] & ~is_open & ((t - closed_at) >= cooldown_days))[0]
+        if len(cand):
+            open_pairs = int(is_open.sum())
+            for k in cand[np.argsort(-np.abs(z[t, cand]), kind='stable')]:
+                a, b = idx_a[k], idx_b[k]
+                if coin_open[a] >= max_same_coin or coin_open[b] >= max_same_coin:
+                    continue
+                if open_pairs >= max_open_pairs:
+                    break
+                is_open[k]   = True
+                entry_day[k] = t
+                dir_a[k]     = -1.0 if z[t, k] > 0 else 1.0       # z > 0: short A, long B
+                entry_a[k]   = prices[t, a]
+                entry_b[k]   = prices[t, b]
+                size_a[k]    = base_size * size_pct[t - start, k]
+                size_b[k]    = base_size * beta[t, k] * size_pct[t - start, k]
+                entry_hl[k]  = hl[t, k] if np.isfinite(hl[t, k]) and hl[t, k] > 0 else 0.0
+                coin_open[a] += 1
+                coin_open[b] += 1
+                open_pairs   += 1
+
+        unrealized = leg_pnl(t)[is_open]
+        equity[t - start] = realized + float(np.nansum(unrealized))
+
+    if is_open.any():
+        ks = np.nonzero(is_open)[0]
+        close(ks, n_days - 1, ['end_of_data'] * len(ks))
+        equity[-1] = realized
+
+    return BacktestResult(trades, panel.days[start:], equity, summarize(trades, equity))
+
+
+def summarize(trades: Sequence[Dict[str, Any]], equity: np.ndarray) -> Dict[str, Any]:
+    pnl = np.array([t['pnl'] for t in trades], dtype=float)
+    wins, losses = pnl[pnl > 0], pnl[pnl <= 0]
+    daily = np.diff(equity, prepend=0.0)
+    peak = np.maximum.accumulate(np.concatenate([[0.0], equity]))[1:]
+    sharpe = float(daily.mean() / daily.std() * math.sqrt(365)) if len(daily) > 1 and daily.std() > 0 else 0.0
+    return {
+        'total_pnl':    round(float(pnl.sum()), 4),
+        'total_fees':   round(float(sum(t['fees'] for t in trades)), 4),
+        'total_trades': len(trades),
+        'wins':         len(wins),
+        'losses':       len(losses),
+        'win_rate':     round(len(wins) / len(trades) * 100, 2) if trades else 0.0,
+        'avg_win':      round(float(wins.mean()), 4) if len(wins) else 0.0,
+        'avg_loss':     round(float(losses.mean()), 4) if len(losses) else 0.0,
+        'max_drawdown': round(float((peak - equity).max()), 4) if len(equity) else 0.0,
+        'sharpe':       round(sharpe, 3),
+        'avg_hold_days': round(float(np.mean([t['held_days'] for t in trades])), 2) if trades else 0.0,
+        'exit_reasons': {r: sum(t['exit_reason'] == r for t in trades) for r in EXIT_REASONS},
+    }
+
+
+async def load_panel(db, symbols: Optional[List[str]] = None, days: int = 730) -> PricePanel:
+    """Daily closes for a backtest straight from ohlcv_daily (all stored symbols by default)."""
+    if symbols is None:
+        symbols = await db.get_ohlcv_symbols()
+    return await db.get_price_panel(symbols, days)
+
+
+async def _main(args):
+    from .models import DBManager
+    db = DBManager()
+    symbols = [s.strip().upper() for s in args.symbols.split(',')] if args.symbols else None
+    panel = await load_panel(db, symbols, args.days + args.lookback - 1)
+    config = await db.get_all_config()
+    result = run_backtest(panel, config, lookback=args.lookback)
+    print(f"[Backtest] {len(panel.symbols)} symbols, {len(panel)} days "
+          f"({panel.days[0] if len(panel) else '-'} .. {panel.days[-1] if len(panel) else '-'})")
+    for k, v in result.summary.items():
+        print(f"  {k:14s} {v}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Walk-forward backtest over ohlcv_daily")
+    parser.add_argument('--days', type=int, default=730, help='days to simulate (history loaded: days + lookback - 1)')
+    parser.add_argument('--lookback', type=int, default=180)
+    parser.add_argument('--symbols', default='')
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,85 @@
+from typing import NamedTuple
+
+import numpy as np
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.spatial.distance import squareform
+
+RETURN_WINDOW = 90    # days of log returns for the prefilter
+MIN_OVERLAP   = 59    # returns both legs need (60 closes, same floor as the full stats)
+
+
+class Candidates(NamedTuple):
+    idx_a: np.ndarray          # candidate pairs, best return correlation first
+    idx_b: np.ndarray
+    score: np.ndarray          # log-return correlation of each candidate
+    clusters: np.ndarray       # cluster label per symbol
+    n_pairs: int               # pairs in the full universe, N(N-1)/2
+
+
+def return_correlations(prices: np.ndarray, window: int = RETURN_WINDOW, min_overlap: int = MIN_OVERLAP) -> np.ndarray:
+    """
+    (symbols x symbols) Pearson correlation of daily log returns over the last
+    `window` days, pairwise-complete so younger listings still get a value.
+    Pairs with fewer than `min_overlap` common returns are NaN. A handful of
+    matrix products, O(window * N^2), so cheap next to the per-pair stats.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rets = np.diff(np.log(prices[-(window + 1):]), axis=0)
+    present = np.isfinite(rets)
+    m = present.astype(float)
+    x = np.where(present, rets, 0.0)
+
+    n   = m.T @ m                  # common observations
+    sx  = x.T @ m                  # sum of i over rows where j is present
+    sxx = (x * x).T @ m
+    sxy = x.T @ x
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = n * sxy - sx * sx.T
+        var = (n * sxx - sx * sx) * (n * sxx - sx * sx).T
+        corr = cov / np.sqrt(var)
+    corr[(n < min_overlap) | ~np.isfinite(corr)] = np.nan
+    return corr
+
+
+def cluster_symbols(corr: np.ndarray, n_clusters: int) -> np.ndarray:
+    """Average-linkage hierarchical clustering on 1 - corr; one label per symbol."""
+    n = corr.shape[0]
+    if n_clusters <= 1 or n < 3:
+        return np.zeros(n, dtype=int)
+    dist = 1.0 - np.nan_to_num(corr, nan=0.0)
+    np.fill_diagonal(dist, 0.0)
+    dist = np.clip((dist + dist.T) / 2, 0.0, 2.0)
+    tree = linkage(squareform(dist, checks=False), method='average')
+    return fcluster(tree, t=min(n_clusters, n), criterion='maxclust') - 1
+
+
+def select_candidates(
+    prices: np.ndarray, corr_min: float = 0.5, n_clusters: int = 0, per_cluster: int = 300,
+) -> Candidates:
+    """
+    Stage one of the scan: keep only pairs worth the full beta / half-life /
+    Hurst / ADF pass. A pair survives if both legs fall in the same cluster
+    (when clustering is on), its log-return correlation is at least
+    `corr_min`, and it is among the `per_cluster` best of its cluster.
+    """
+    n_syms = prices.shape[1]
+    corr = return_correlations(prices)
+    clusters = cluster_symbols(corr, n_clusters)
+
+    idx_a, idx_b = np.triu_indices(n_syms, k=1)
+    score = corr[idx_a, idx_b]
+    keep = np.isfinite(score) & (score >= corr_min) & (clusters[idx_a] == clusters[idx_b])
+    idx_a, idx_b, score = idx_a[keep], idx_b[keep], score[keep]
+
+    # Top-K per cluster: sort by (cluster, -score), then take the first K of each run
+    label = clusters[idx_a]
+    order = np.lexsort((-score, label))
+    label = label[order]
+    starts = np.searchsorted(label, label, side='left')
+    top = order[(np.arange(len(order)) - starts) < per_cluster]
+    top = top[np.argsort(-score[top], kind='stable')]
+
+    return Candidates(
+        idx_a=idx_a[top], idx_b=idx_b[top], score=score[top],
+        clusters=clusters, n_pairs=n_syms * (n_syms - 1) // 2,
+    )
@@ -0,0 +1,71 @@
+import numpy as np
+from scipy.special import ndtr
+
+# MacKinnon (1994) p-value surface for the ADF t-statistic,
+# constant-only regression, one I(1) series (same table statsmodels uses).
+_TAU_MAX    = 2.74
+_TAU_MIN    = -18.83
+_TAU_STAR   = -1.61
+_TAU_SMALLP = (2.1659, 1.4412, 0.038269)
+_TAU_LARGEP = (1.7339, 0.93202, -0.12745, -0.010368)
+
+# Max absolute difference vs statsmodels adfuller(x, maxlag=1, autolag=None)[1]
+ADF_PVALUE_TOL = 1e-8
+
+
+def mackinnon_pvalues(tstat) -> np.ndarray:
+    """Vectorized statsmodels.tsa.adfvalues.mackinnonp(t, regression='c', N=1)."""
+    t = np.asarray(tstat, dtype=float)
+    small = np.polynomial.polynomial.polyval(t, _TAU_SMALLP)
+    large = np.polynomial.polynomial.polyval(t, _TAU_LARGEP)
+    p = ndtr(np.where(t <= _TAU_STAR, small, large))
+    p = np.where(t > _TAU_MAX, 1.0, p)
+    p = np.where(t < _TAU_MIN, 0.0, p)
+    return np.where(np.isnan(t), np.nan, p)
+
+
+def adf_tstats(spreads: np.ndarray) -> np.ndarray:
+    """
+    Lag-1 ADF t-statistics for every column of a (days x pairs) spread matrix.
+
+    Stacked least squares of  dx_t = c + g*x_{t-1} + d*dx_{t-1} + e_t
+    solved in closed form per column; returns t(g), NaN where degenerate.
+    """
+    x = np.asarray(spreads, dtype=float)
+    if x.ndim == 1:
+        x = x[:, None]
+    dx = np.diff(x, axis=0)
+
+    y  = dx[1:]        # dx_t
+    x1 = x[1:-1]       # x_{t-1}
+    x2 = dx[:-1]       # dx_{t-1}
+    n  = y.shape[0]
+
+    # Partial out the constant, then solve the 2x2 normal equations
+    y  = y  - y.mean(axis=0)
+    x1 = x1 - x1.mean(axis=0)
+    x2 = x2 - x2.mean(axis=0)
+
+    s11 = np.einsum('ij,ij->j', x1, x1)
+    s22 = np.einsum('ij,ij->j', x2, x2)
+    s12 = np.einsum('ij,ij->j', x1, x2)
+    s1y = np.einsum('ij,ij->j', x1, y)
+    s2y = np.einsum('ij,ij->j', x2, y)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        det   = s11 * s22 - s12 * s12
+        gamma = (s22 * s1y - s12 * s2y) / det
+        delta = (s11 * s2y - s12 * s1y) / det
+        resid = y - x1 * gamma - x2 * delta
+        sigma2 = np.einsum('ij,ij->j', resid, resid) / (n - 3)
+        tstat = gamma / np.sqrt(sigma2 * s22 / det)
+
+    return np.where((det > 0) & (sigma2 > 0), tstat, np.nan)
+
+
+def adf_pvalues(spreads: np.ndarray) -> np.ndarray:
+    """
+    Batched equivalent of adfuller(s, maxlag=1, autolag=None)[1] for each
+    column of a (days x pairs) spread matrix. NaN where the test is undefined.
+    """
+    return mackinnon_pvalues(adf_tstats(spreads))
@@ -0,0 +1,208 @@
+import os
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .price_panel import PricePanel
+
+# Bar length per supported timeframe (ms)
+TIMEFRAMES = {'1h': 3_600_000, '4h': 14_400_000, '1d': 86_400_000}
+
+# One append-only file per field: open time (ms), close, volume
+FIELDS = (('ts', np.int64), ('close', np.float64), ('volume', np.float64))
+
+_EPOCH_DAY = date(1970, 1, 1)
+
+
+def _day_ms(d: date) -> int:
+    return (d - _EPOCH_DAY).days * 86_400_000
+
+
+class ColumnStore:
+    """
+    Local columnar OHLCV store: {root}/{timeframe}/{symbol}/{ts,close,volume}.bin.
+
+    Each file is a raw little-endian int64/float64 array, appended to as bars
+    arrive and memory-mapped for reads, so the scanner gets NumPy views with
+    no row parsing. The last bar may be rewritten in place (the forming
+    candle); older bars are immutable. A write that would change history
+    (a backfilled gap) rewrites that symbol's files atomically instead.
+    Values land in close/volume before ts, and a reader takes the shortest
+    file, so a torn append is invisible.
+
+    Postgres stays the durable source for daily bars (sync_daily). Intraday
+    bars (1h/4h) come straight from the exchange (sync_exchange) and live
+    only here, keeping millions of rows out of the relational tables.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or os.getenv('OHLCV_STORE_DIR', 'data/ohlcv'))
+        self._maps: Dict[str, Tuple[tuple, np.ndarray]] = {}
+        self._synced_at: Dict[Tuple[str, str], float] = {}
+
+    # ─────────────────────────────────────────────────────
+    # Files
+    # ─────────────────────────────────────────────────────
+
+    def _dir(self, timeframe: str, symbol: str) -> Path:
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"unsupported timeframe {timeframe!r}")
+        return self.root / timeframe / symbol
+
+    def _map(self, path: str, dtype) -> np.ndarray:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return np.empty(0, dtype=dtype)
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        hit = self._maps.get(path)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        n = st.st_size // np.dtype(dtype).itemsize
+        # plain ndarray view over the mapping (keeps it alive, skips memmap's slicing overhead)
+        arr = np.asarray(np.memmap(path, dtype=dtype, mode='r', shape=(n,))) if n else np.empty(0, dtype=dtype)
+        self._maps[path] = (key, arr)
+        return arr
+
+    def read(self, timeframe: str, symbol: str, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(ts_ms, close, volume) read-only views of the last `limit` bars, oldest first."""
+        d = str(self._dir(timeframe, symbol))
+        cols = [self._map(os.path.join(d, f"{name}.bin"), dtype) for name, dtype in FIELDS]
+        n = min(len(c) for c in cols)
+        start = 0 if limit is None else max(n - limit, 0)
+        return tuple(c[start:n] for c in cols)
+
+    def last_ts(self, timeframe: str, symbol: str) -> Optional[int]:
+        ts = self.read(timeframe, symbol, 1)[0]
+        return int(ts[-1]) if len(ts) else None
+
+    def write(self, timeframe: str, symbol: str, ts: np.ndarray, close: np.ndarray, volume: np.ndarray) -> int:
+        """Merge bars (sorted by ts) into the store; returns how many bars were new."""
+        ts = np.asarray(ts, dtype=np.int64)
+        if not len(ts):
+            return 0
+        close = np.asarray(close, dtype=np.float64)
+        volume = np.asarray(volume, dtype=np.float64)
+        old_ts, old_close, old_volume = self.read(timeframe, symbol)
+        n = len(old_ts)
+        if n and ts[0] < old_ts[-1] and not np.isin(ts[ts < old_ts[-1]], old_ts).all():
+            # Bars inside the stored range that the store lacks: rebuild the whole series
+            merged = {int(t): (c, v) for t, c, v in zip(old_ts, old_close, old_volume)}
+            merged.update({int(t): (c, v) for t, c, v in zip(ts, close, volume)})
+            keys = np.array(sorted(merged), dtype=np.int64)
+            vals = np.array([merged[k] for k in keys.tolist()], dtype=np.float64).reshape(-1, 2)
+            self.rewrite(timeframe, symbol, keys, vals[:, 0], vals[:, 1])
+            return len(keys) - n
+
+        d = self._dir(timeframe, symbol)
+        d.mkdir(parents=True, exist_ok=True)
+        if n and ts[-1] >= old_ts[-1]:
+            at = np.searchsorted(ts, old_ts[-1])
+            if at < len(ts) and ts[at] == old_ts[-1]:
+                # Forming bar: overwrite the last record in place
+                for (name, dtype), arr in zip(FIELDS[1:], (close, volume)):
+                    with open(d / f"{name}.bin", 'r+b') as f:
+                        f.seek((n - 1) * 8)
+                        f.write(np.asarray(arr[at:at + 1], dtype=dtype).tobytes())
+        new = ts > old_ts[-1] if n else np.ones(len(ts), dtype=bool)
+        if new.any():
+            for (name, dtype), arr in zip(FIELDS[::-1], (volume, close, ts)):
+                self._truncate_append(d / f"{name}.bin", n, np.asarray(arr[new], dtype=dtype))
+        return int(new.sum())
+
+    @staticmethod
+    def _truncate_append(path: Path, n: int, values: np.ndarray):
+        with open(path, 'ab') as f:
+            f.truncate(n * 8)           # drop the tail of a torn earlier append
+            f.write(values.tobytes())
+
+    def rewrite(self, timeframe: str, symbol: str, ts: np.ndarray, close: np.ndarray, volume: np.ndarray):
+        d = self._dir(timeframe, symbol)
+        d.mkdir(parents=True, exist_ok=True)
+        for (name, dtype), arr in zip(FIELDS[::-1], (volume, close, ts)):
+            tmp = d / f"{name}.bin.tmp"
+            tmp.write_bytes(np.asarray(arr, dtype=dtype).tobytes())
+            os.replace(tmp, d / f"{name}.bin")
+
+    # ─────────────────────────────────────────────────────
+    # Panels
+    # ─────────────────────────────────────────────────────
+
+    def panel(self, symbols: Sequence[str], timeframe: str = '1d', limit: int = 180) -> PricePanel:
+        """Last `limit` bars of every symbol as a time-aligned PricePanel."""
+        series = [self.read(timeframe, s, limit) for s in symbols]
+        stamps = np.unique(np.concatenate([s[0] for s in series])) if series else np.empty(0, np.int64)
+        stamps = stamps[-limit:]
+        unit = 'datetime64[D]' if timeframe == '1d' else 'datetime64[ms]'
+        panel = PricePanel.empty(stamps.astype('datetime64[ms]').astype(unit), symbols)
+        for k, (ts, close, volume) in enumerate(series):
+            keep = ts >= stamps[0] if len(stamps) else np.zeros(len(ts), dtype=bool)
+            rows = np.searchsorted(stamps, ts[keep])
+            panel.closes[rows, k] = close[keep]
+            panel.volumes[rows, k] = volume[keep]
+            panel.present[rows, k] = True
+        return panel
+
+    # ─────────────────────────────────────────────────────
+    # Sync
+    # ─────────────────────────────────────────────────────
+
+    async def sync_daily(self, db, symbols: List[str]) -> Dict[str, int]:
+        """
+        Bring the daily store in line with ohlcv_daily: re-read each symbol
+        from its last stored day (the bar that may still have been forming),
+        or in full when Postgres holds bars the store is missing.
+        """
+        last = {}
+        for s in symbols:
+            ts = self.last_ts('1d', s)
+            last[s] = datetime.fromtimestamp(ts / 1000, tz=timezone.utc).date() if ts is not None else None
+        # Rows Postgres holds up to each symbol's last stored day; a mismatch means a backfilled gap
+        coverage = await db.get_ohlcv_coverage(last)
+        rebuild = {s for s in symbols if last[s] is not None and coverage.get(s, 0) != len(self.read('1d', s)[0])}
+        rows = await db.get_ohlcv_since({s: None if s in rebuild else last[s] for s in symbols})
+        by_sym: Dict[str, list] = {}
+        for r in rows:
+            by_sym.setdefault(r['symbol'], []).append(r)
+        appended = 0
+        for s, rs in by_sym.items():
+            ts = np.array([_day_ms(r['ts']) for r in rs], dtype=np.int64)
+            close = np.array([float(r['close']) for r in rs])
+            volume = np.array([float(r['volume'] or 0) for r in rs])
+            if s in rebuild:
+                self.rewrite('1d', s, ts, close, volume)
+            else:
+                appended += self.write('1d', s, ts, close, volume)
+        return {'appended': appended, 'rebuilt': len(rebuild)}
+
+    async def sync_exchange(self, exchange, symbols: List[str], timeframe: str, bars: int) -> Dict[str, int]:
+        """
+        Intraday bars straight from the exchange: a full `bars` fetch for new
+        symbols, otherwise from the last stored (possibly forming) bar. Each
+        symbol is refreshed at most once per bar length.
+        """
+        step = TIMEFRAMES[timeframe]
+        now = time.time()
+        since, full = {}, []
+        for s in symbols:
+            if now - self._synced_at.get((timeframe, s), 0) < step / 1000:
+                continue
+            last = self.last_ts(timeframe, s)
+            if last is None:
+                full.append(s)
+            else:
+                since[s] = last
+        fetched = await exchange.fetch_ohlcv_many(full + list(since), bars, since, timeframe=timeframe)
+        appended = 0
+        for s, rows in fetched.items():
+            if rows:
+                arr = np.array([[r[0], r[4], r[5] or 0] for r in rows], dtype=np.float64)
+                appended += self.write(timeframe, s, arr[:, 0].astype(np.int64), arr[:, 1], arr[:, 2])
+            self._synced_at[(timeframe, s)] = now
+        return {'symbols': len(fetched), 'appended': appended}
+
+
+column_store = ColumnStore()
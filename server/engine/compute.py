@@ -0,0 +1,67 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterator, Optional, Tuple
+
+import numpy as np
+
+from .stats import PairStatsBatch, compute_all_pair_stats
+
+CHUNK_PAIRS = 2000
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+
+
+def get_compute_pool(workers: int) -> Optional[Executor]:
+    """
+    Process-wide worker pool for CPU-bound scan math.
+    workers <= 0 disables the pool (work runs in the default thread executor).
+    The pool is rebuilt when the configured size changes.
+    """
+    global _pool, _pool_size
+    if workers <= 0:
+        shutdown_compute_pool()
+        return None
+    if _pool is None or _pool_size != workers:
+        shutdown_compute_pool()
+        # spawn: never fork a process that is running an event loop + sockets
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        _pool_size = workers
+    return _pool
+
+
+def shutdown_compute_pool():
+    global _pool, _pool_size
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool, _pool_size = None, 0
+
+
+def pair_stats_chunk(prices: np.ndarray, idx_a: np.ndarray, idx_b: np.ndarray) -> PairStatsBatch:
+    """Worker entry point: stats for one slice of the pair list."""
+    return compute_all_pair_stats(prices, pairs=(idx_a, idx_b))
+
+
+async def stream_pair_stats(
+    prices: np.ndarray, workers: int, pairs: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    chunk_pairs: int = CHUNK_PAIRS,
+) -> AsyncIterator[PairStatsBatch]:
+    """
+    Split the pairs of a (days x symbols) matrix (default all i<j) into chunks,
+    compute them off the event loop and yield each PairStatsBatch as soon as it completes.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_compute_pool(workers)
+    idx_a, idx_b = pairs if pairs is not None else np.triu_indices(prices.shape[1], k=1)
+
+    futures = [
+        loop.run_in_executor(pool, pair_stats_chunk, prices, idx_a[i:i + chunk_pairs], idx_b[i:i + chunk_pairs])
+        for i in range(0, len(idx_a), chunk_pairs)
+    ]
+    try:
+        for fut in asyncio.as_completed(futures):
+            yield await fut
+    finally:
+        for fut in futures:
+            fut.cancel()
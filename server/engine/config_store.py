@@ -0,0 +1,104 @@
+import json
+import asyncio
+from typing import Any, Dict, Optional
+
+import asyncpg
+
+CONFIG_CHANNEL = 'config_changed'
+
+
+def parse_config_value(value):
+    try:
+        return float(value)
+    except Exception:
+        return value
+
+
+class ConfigStore:
+    """
+    Process-wide in-memory copy of the `config` table.
+
+    Loaded once at startup, then kept current by Postgres LISTEN/NOTIFY: the
+    config_notify trigger (db/migrate_v4.sql) publishes every insert, update
+    and delete on CONFIG_CHANNEL, so edits made through the API, psql or
+    another process land here within one notification round trip. Reads are
+    plain dict lookups. If the listener connection drops it reconnects and
+    reloads the whole table.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._conn: Optional[asyncpg.Connection] = None
+        self._dsn: Optional[str] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self.loaded = False
+
+    async def start(self, dsn: str):
+        self._dsn = dsn
+        await self._connect()
+
+    async def stop(self):
+        if self._reconnect_task is not None and not self._reconnect_task.done():
+            self._reconnect_task.cancel()
+            await asyncio.gather(self._reconnect_task, return_exceptions=True)
+        self._reconnect_task = None
+        if self._conn is not None and not self._conn.is_closed():
+            self._conn.remove_termination_listener(self._on_terminated)
+            await self._conn.close()
+        self._conn = None
+        self.loaded = False
+
+    def get(self, key: str, default=None):
+        return self._values.get(key, default)
+
+    def all(self) -> Dict[str, Any]:
+        return dict(self._values)
+
+    def set(self, key: str, value):
+        """Apply a local write immediately (the NOTIFY echo is idempotent)."""
+        self._values[key] = parse_config_value(value)
+
+    # ─────────────────────────────────────────────────────
+    # Listener
+    # ─────────────────────────────────────────────────────
+
+    async def _connect(self):
+        self._conn = await asyncpg.connect(self._dsn)
+        self._conn.add_termination_listener(self._on_terminated)
+        await self._conn.add_listener(CONFIG_CHANNEL, self._on_notify)
+        # Load after LISTEN so no change can slip in between
+        rows = await self._conn.fetch("SELECT key, value FROM config")
+        self._values = {r['key']: parse_config_value(r['value']) for r in rows}
+        self.loaded = True
+        print(f"[Config] Loaded {len(self._values)} keys, listening on '{CONFIG_CHANNEL}'")
+
+    def _on_notify(self, conn, pid, channel, payload):
+        try:
+            msg = json.loads(payload)
+        except ValueError:
+            return
+        if msg.get('op') == 'DELETE':
+            self._values.pop(msg['key'], None)
+        else:
+            self._values[msg['key']] = parse_config_value(msg['value'])
+
+    def _on_terminated(self, conn):
+        # One reconnect loop at a time; keep the reference so it is not collected mid-retry
+        if self._reconnect_task is not None and not self._reconnect_task.done():
+            return
+        print("[Config] Listener connection lost, reconnecting...")
+        self._reconnect_task = asyncio.get_event_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 1.0
+        while True:
+            try:
+                await self._connect()
+                return
+            except Exception as e:
+                print(f"[Config] Reconnect failed: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+
+config_store = ConfigStore()
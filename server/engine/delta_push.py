@@ -0,0 +1,117 @@
+import json
+import math
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+try:
+    import orjson
+except ImportError:      # stdlib fallback, same wire format
+    orjson = None
+
+
+def _plain(value: Any) -> Any:
+    """Wire form of a DB/engine value: Decimal -> float, datetime -> ISO string, UUID -> str, NaN -> None."""
+    if isinstance(value, float):
+        return None if math.isnan(value) else value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _default(value: Any) -> Any:
+    plain = _plain(value)
+    if plain is value:
+        if hasattr(value, 'tolist'):          # numpy scalars / arrays
+            return value.tolist()
+        raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+    return plain
+
+
+class FastJSON:
+    """
+    JSON module for python-socketio (`AsyncServer(json=FastJSON)`).
+
+    Uses orjson when installed and falls back to the stdlib. python-socketio
+    encodes a broadcast once and reuses the packet for every client, so the
+    encode cost per tick is independent of how many clients are connected.
+    """
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs) -> str:
+        if orjson is not None:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode()
+        return json.dumps(obj, default=_default, separators=(',', ':'))
+
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s)
+
+
+class DeltaChannel:
+    """
+    Versioned, delta-encoded state for one Socket.IO event.
+
+    publish(rows) diffs the new rows against the last published state and
+    returns only what changed, keyed by `key(row)`:
+
+        {'seq': 8, 'base': 7, 'full': False,
+         'upsert': {'BTC/ETH': {'zscore': 2.1}, ...},   # changed fields only (all fields for new keys)
+         'remove': ['SOL/ADA']}
+
+    or None when nothing changed, so idle ticks send nothing. Passing the
+    source's change counter as `version` skips the diff entirely when the
+    source has not moved since the last publish. snapshot()
+    returns the whole state for a client that just connected or that saw a
+    gap in `seq` (`base` is the seq a delta applies on top of).
+    """
+
+    def __init__(self, event: str, key: Callable[[Mapping], str]):
+        self.event = event
+        self.key = key
+        self.seq = 0
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._version: Optional[int] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'seq': self.seq, 'full': True, 'items': self._state}
+
+    def publish(self, rows: Iterable[Mapping], version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        if version is not None and version == self._version:
+            return None
+        self._version = version
+        new_state: Dict[str, Dict[str, Any]] = {}
+        upsert: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            k = self.key(row)
+            item = {f: _plain(v) for f, v in row.items()}
+            new_state[k] = item
+            old = self._state.get(k)
+            if old is None:
+                upsert[k] = item
+                continue
+            changed = {f: v for f, v in item.items() if f not in old or old[f] != v}
+            if changed:
+                upsert[k] = changed
+        remove: List[str] = [k for k in self._state if k not in new_state]
+
+        self._state = new_state
+        if not upsert and not remove:
+            return None
+        self.seq += 1
+        return {'seq': self.seq, 'base': self.seq - 1, 'full': False, 'upsert': upsert, 'remove': remove}
+
+
+def pair_key(row: Mapping) -> str:
+    return f"{row['symbol_a']}/{row['symbol_b']}"
+
+
+def trade_key(row: Mapping) -> str:
+    return str(row['group_id'])
@@ -4,11 +4,34 @@ import asyncio
 import ccxt.async_support as ccxt
 from typing import List, Dict, Any, Optional
 
+from .market_data import MarketDataFeed
+from .funding import FundingRateService
+from .column_store import TIMEFRAMES
+
+# Max kline requests in flight; ccxt's throttler still spaces them by endpoint weight
+OHLCV_CONCURRENCY = 32
+
+# All-market ticker snapshot shared by every caller within this window
+PRICE_SNAPSHOT_TTL = 1.0
+
+# Oldest snapshot still served when a refresh fails; past it prices read as missing (None)
+PRICE_SNAPSHOT_MAX_AGE = 3 * PRICE_SNAPSHOT_TTL
+
+class OrderNotSent(Exception):
+    """A paired leg was never submitted because its counterpart failed first."""
+
+
+class PositionUnknown(Exception):
+    """A position fetch failed (rate limit, network): the position is unknown, not flat."""
+
+
 class BinanceClient:
     def __init__(self):
         api_key = os.getenv('BINANCE_API_KEY', '')
         secret  = os.getenv('BINANCE_SECRET_KEY', '')
-        self.dry_run = not bool(api_key)
+        # EXCHANGE_MODE=paper: orders and positions go to an in-process simulated venue
+        self.paper = os.getenv('EXCHANGE_MODE', 'live').lower() == 'paper'
+        self.dry_run = not bool(api_key) and not self.paper
 
         self.exchange = ccxt.binance({
             'apiKey': api_key,
@@ -19,16 +42,39 @@ class BinanceClient:
                 'adjustForTimeDifference': True,
             },
         })
+        self._ohlcv_sem = asyncio.Semaphore(OHLCV_CONCURRENCY)
+        self.market_data = MarketDataFeed()
+        self.funding = FundingRateService(self.exchange)
+        self._price_snapshot: Dict[str, float] = {}
+        self._snapshot_at = 0.0
+        self._snapshot_task: Optional[asyncio.Task] = None
+        if self.paper:
+            from .paper_venue import paper_venue_from_env
+            self.attach_venue(paper_venue_from_env(self.exchange))
+
+    def attach_venue(self, venue):
+        """Route every exchange call through a simulated venue (engine.paper_venue) instead of Binance."""
+        self.exchange = venue
+        self.funding = FundingRateService(venue)
+        self.paper = True
+        self.dry_run = False
+
+    def start_market_data(self):
+        """Start the websocket mark price / funding feed (call from a running loop)."""
+        # replayed prices must not be overridden by live mark prices
+        if os.getenv('MARKET_DATA_WS', '1') != '0' and not getattr(self.exchange, 'replaying', False):
+            self.market_data.start()
 
     async def close(self):
+        await self.market_data.stop()
         await self.exchange.close()
 
     # ─────────────────────────────────────────────────────
     # Universe
     # ─────────────────────────────────────────────────────
 
-    async def get_trading_symbols(self, min_volume: float = 20_000_000) -> List[Dict[str, Any]]:
-        """Return top-25 USDT-M perpetuals by 24h volume above min_volume."""
+    async def get_trading_symbols(self, min_volume: float = 20_000_000, limit: Optional[int] = 25) -> List[Dict[str, Any]]:
+        """Return the top `limit` USDT-M perpetuals by 24h volume above min_volume (all if limit is None)."""
         markets = await self.exchange.load_markets()
         # Linear USDT-M swaps only
         symbols = [
@@ -49,30 +95,106 @@ class BinanceClient:
                 })
 
         qualified.sort(key=lambda x: x['vol'], reverse=True)
-        return qualified[:25]
+        return qualified[:limit] if limit else qualified
 
     # ─────────────────────────────────────────────────────
     # Market Data
     # ─────────────────────────────────────────────────────
 
-    async def fetch_ohlcv(self, coin: str, days: int = 180) -> List[List[Any]]:
-        since = int((time.time() - days * 86400) * 1000)
-        return await self.exchange.fetch_ohlcv(f"{coin}/USDT:USDT", '1d', since, days)
+    async def fetch_ohlcv(
+        self, coin: str, days: int = 180, since: Optional[int] = None, timeframe: str = '1d',
+    ) -> List[List[Any]]:
+        """Candles (daily by default): the last `days` bars, or every bar from `since` (ms) if given."""
+        limit = None if since is not None else days
+        if since is None:
+            since = int(time.time() * 1000) - days * TIMEFRAMES[timeframe]
+        async with self._ohlcv_sem:
+            return await self.exchange.fetch_ohlcv(f"{coin}/USDT:USDT", timeframe, since, limit)
+
+    async def fetch_ohlcv_many(
+        self, coins: List[str], days: int = 180, since: Optional[Dict[str, int]] = None, timeframe: str = '1d',
+    ) -> Dict[str, List[List[Any]]]:
+        """
+        Fetch candles for many coins concurrently (bounded by the kline
+        semaphore and ccxt's rate limiter). `since` maps coin -> start ms for
+        tail fetches. Coins that fail are left out.
+        """
+        since = since or {}
+        results = await asyncio.gather(
+            *(self.fetch_ohlcv(c, days, since.get(c), timeframe) for c in coins), return_exceptions=True,
+        )
+        out = {}
+        for coin, res in zip(coins, results):
+            if isinstance(res, Exception):
+                print(f"[Exchange] OHLCV fetch failed for {coin}: {res}")
+                continue
+            out[coin] = res
+        return out
 
     async def get_mark_price(self, symbol: str) -> Optional[float]:
+        cached = self.market_data.mark_price(symbol)
+        if cached is not None:
+            return cached
         try:
             ticker = await self.exchange.fetch_ticker(f"{symbol}/USDT:USDT")
             return float(ticker.get('last') or ticker.get('mark') or 0) or None
         except Exception:
             return None
 
+    async def get_prices(self, symbols: List[str]) -> Dict[str, Optional[float]]:
+        """
+        Prices for many coins from one per-tick snapshot: websocket mark prices
+        where fresh, otherwise a single shared fetch_tickers call (TTL + single-flight).
+        """
+        out = {s: self.market_data.mark_price(s) for s in symbols}
+        missing = [s for s, p in out.items() if p is None]
+        if missing:
+            snapshot = await self._ticker_snapshot()
+            for s in missing:
+                out[s] = snapshot.get(s)
+        return out
+
+    async def _ticker_snapshot(self) -> Dict[str, float]:
+        if time.time() - self._snapshot_at < PRICE_SNAPSHOT_TTL:
+            return self._price_snapshot
+        if self._snapshot_task is None or self._snapshot_task.done():
+            self._snapshot_task = asyncio.create_task(self._refresh_ticker_snapshot())
+        return await asyncio.shield(self._snapshot_task)
+
+    async def _refresh_ticker_snapshot(self) -> Dict[str, float]:
+        try:
+            tickers = await self.exchange.fetch_tickers()
+        except Exception as e:
+            age = time.time() - self._snapshot_at
+            if age < PRICE_SNAPSHOT_MAX_AGE:
+                print(f"[Exchange] Ticker snapshot failed: {e} (serving the {age:.1f}s old one)")
+                return self._price_snapshot
+            print(f"[Exchange] Ticker snapshot failed: {e} (last one {age:.0f}s old, prices unavailable)")
+            return {}
+        snapshot = {}
+        for sym, t in tickers.items():
+            if not sym.endswith('/USDT:USDT'):
+                continue
+            price = float(t.get('last') or t.get('mark') or 0)
+            if price > 0:
+                snapshot[sym.split('/')[0]] = price
+        self._price_snapshot = snapshot
+        self._snapshot_at = time.time()
+        return snapshot
+
     async def get_funding_rate(self, symbol: str) -> float:
         """Return absolute current funding rate (e.g. 0.0001 = 0.01%)."""
+        cached = self.market_data.funding_rate(symbol)
+        if cached is None:
+            cached = await self.funding.rate(symbol)
+        return abs(cached) if cached is not None else 0.0
+
+    async def get_funding_history(self, symbol: str, since_ms: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Settled funding rates for a coin since since_ms, cached per funding epoch."""
         try:
-            fr = await self.exchange.fetch_funding_rate(f"{symbol}/USDT:USDT")
-            return abs(float(fr.get('fundingRate') or 0))
+            return await self.funding.history(symbol, since_ms)
         except Exception:
-            return 0.0
+            return []
 
     # ─────────────────────────────────────────────────────
     # Account
@@ -97,28 +219,63 @@ class BinanceClient:
         size_usd: notional USD value of the leg
         Returns order dict with 'id', 'average' (fill price).
         """
+        return await self.submit_order(await self.prepare_order(symbol, side, size_usd))
+
+    async def prepare_order(self, symbol: str, side: str, size_usd: float, price: Optional[float] = None) -> Dict[str, Any]:
+        """Resolve reference price and exchange precision for a market order without sending it."""
+        if price is None:
+            price = (await self.get_prices([symbol]))[symbol]
+        if not price:
+            if not self.dry_run:
+                raise ValueError(f"no price for {symbol}")
+            price = 1.0
+        qty = size_usd / price
+        if not self.dry_run:
+            sym = f"{symbol}/USDT:USDT"
+            await self.exchange.load_markets()   # cached by ccxt after the first call
+            qty = float(self.exchange.amount_to_precision(sym, qty))
+        return {'symbol': symbol, 'side': side, 'size_usd': size_usd, 'price': price, 'qty': qty}
+
+    async def submit_order(self, prepared: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a prepared market order. Adds 'acked_at_ms' (local ack time)."""
+        symbol, side, price, qty = prepared['symbol'], prepared['side'], prepared['price'], prepared['qty']
         if self.dry_run:
-            mock_price = await self.get_mark_price(symbol) or 1.0
-            print(f"[DRY RUN] {side.upper()} {symbol} notional=${size_usd:.2f} ~{size_usd/mock_price:.4f} contracts @ {mock_price:.4f}")
-            return {
+            print(f"[DRY RUN] {side.upper()} {symbol} notional=${prepared['size_usd']:.2f} ~{qty:.4f} contracts @ {price:.4f}")
+            order = {
                 'id':      f'mock_{int(time.time() * 1000)}',
                 'symbol':  symbol,
                 'side':    side,
-                'average': mock_price,
-                'filled':  size_usd / mock_price,
-                'cost':    size_usd,
+                'average': price,
+                'filled':  qty,
+                'cost':    prepared['size_usd'],
             }
-
-        sym    = f"{symbol}/USDT:USDT"
-        ticker = await self.exchange.fetch_ticker(sym)
-        price  = float(ticker['last'])
-        markets = await self.exchange.load_markets()
-        qty    = size_usd / price
-        qty    = float(self.exchange.amount_to_precision(sym, qty))
-
-        order = await self.exchange.create_market_order(sym, side, qty)
+        else:
+            order = await self.exchange.create_market_order(f"{symbol}/USDT:USDT", side, qty)
+        order['acked_at_ms'] = time.time() * 1000
         return order
 
+    async def place_pair_orders(
+        self, symbol_a: str, side_a: str, size_a: float, symbol_b: str, side_b: str, size_b: float,
+    ) -> List[Any]:
+        """
+        Open both legs of a pair together: price both from one snapshot,
+        resolve precision up front, then submit the two orders concurrently.
+        Returns [result_a, result_b]; a failed leg is returned as its exception
+        (OrderNotSent if it was held back because the other leg failed to prepare).
+        """
+        prices = await self.get_prices([symbol_a, symbol_b])
+        prepared = await asyncio.gather(
+            self.prepare_order(symbol_a, side_a, size_a, prices[symbol_a]),
+            self.prepare_order(symbol_b, side_b, size_b, prices[symbol_b]),
+            return_exceptions=True,
+        )
+        if any(isinstance(p, Exception) for p in prepared):
+            # nothing was sent; the leg that could be prepared reports OrderNotSent
+            return [p if isinstance(p, Exception) else OrderNotSent("other leg failed to prepare") for p in prepared]
+        return list(await asyncio.gather(
+            self.submit_order(prepared[0]), self.submit_order(prepared[1]), return_exceptions=True,
+        ))
+
     async def close_position(self, symbol: str, open_side: str) -> Dict[str, Any]:
         """
         Close an open position via reduce-only market order.
@@ -149,21 +306,21 @@ class BinanceClient:
     # ─────────────────────────────────────────────────────
 
     async def get_position(self, symbol: str) -> Optional[Dict]:
-        """Return position dict if open, else None."""
+        """Return position dict if open, else None. Raises PositionUnknown if the fetch fails."""
         if self.dry_run:
             return None
         try:
             positions = await self.exchange.fetch_positions([f"{symbol}/USDT:USDT"])
-            return next((p for p in positions if abs(float(p.get('contracts') or 0)) > 0), None)
-        except Exception:
-            return None
+        except Exception as e:
+            raise PositionUnknown(f"{symbol}: {e}") from e
+        return next((p for p in positions if abs(float(p.get('contracts') or 0)) > 0), None)
 
     async def get_all_positions(self) -> List[Dict]:
-        """Return all open positions."""
+        """Return all open positions. Raises PositionUnknown if the fetch fails."""
         if self.dry_run:
             return []
         try:
             positions = await self.exchange.fetch_positions()
-            return [p for p in positions if abs(float(p.get('contracts') or 0)) > 0]
-        except Exception:
-            return []
+        except Exception as e:
+            raise PositionUnknown(str(e)) from e
+        return [p for p in positions if abs(float(p.get('contracts') or 0)) > 0]
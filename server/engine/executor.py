@@ -4,7 +4,7 @@ import math
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from .exchange import BinanceClient
+from .exchange import BinanceClient, OrderNotSent, PositionUnknown
 from .models import DBManager
 
 
@@ -12,7 +12,8 @@ class TradeExecutor:
     """
     Full atomic trade executor with:
     - 5-layer dedup guard
-    - Atomic two-leg execution with rollback
+    - Atomic two-leg execution (legs submitted concurrently) with rollback
+    - Leg-to-leg fill skew recorded per trade
     - Post-close verification (retry x3)
     - Grace period persistence
     - Full DB persistence
@@ -21,6 +22,7 @@ class TradeExecutor:
     def __init__(self, exchange: BinanceClient):
         self.exchange = exchange
         self.db = DBManager()
+        self._group_locks = {}   # group_id -> [asyncio.Lock, users]; one close at a time per trade
 
     # ─────────────────────────────────────────────────────
     # Open
@@ -55,29 +57,39 @@ class TradeExecutor:
         if abs(z) < zscore_entry:
             return self._fail("zscore_below_entry")
 
-        # ── Dedup Layer 2: DB open check ──
-        if await self.db.is_pair_open(sym_a, sym_b):
+        # ── Dedup Layers 2-5: one DB round trip + both exchange checks, all concurrent ──
+        state, pos_a, pos_b = await asyncio.gather(
+            self.db.get_pretrade_state(sym_a, sym_b, cooldown_sec),
+            self.exchange.get_position(sym_a),
+            self.exchange.get_position(sym_b),
+            return_exceptions=True,
+        )
+        for res in (state, pos_a, pos_b):
+            if isinstance(res, Exception) and not isinstance(res, PositionUnknown):
+                raise res
+
+        # Layer 2: DB open check
+        if state['pair_open']:
             return self._fail("pair_already_open")
 
-        # ── Dedup Layer 3: Exchange position check ──
-        pos_a = await self.exchange.get_position(sym_a)
-        pos_b = await self.exchange.get_position(sym_b)
+        # Layer 3: Exchange position check (a failed fetch is not "no position")
+        if isinstance(pos_a, PositionUnknown) or isinstance(pos_b, PositionUnknown):
+            return self._fail("exchange_position_unknown")
         if pos_a or pos_b:
             return self._fail("exchange_position_exists")
 
-        # ── Dedup Layer 4: Cooldown ──
-        if await self.db.is_in_cooldown(sym_a, sym_b, cooldown_sec):
+        # Layer 4: Cooldown
+        if state['in_cooldown']:
             return self._fail("in_cooldown")
 
-        # ── Dedup Layer 5: Concentration limit ──
-        if await self.db.get_coin_open_count(sym_a) >= max_same_coin:
+        # Layer 5: Concentration limit
+        if state['open_count_a'] >= max_same_coin:
             return self._fail(f"concentration_limit_{sym_a}")
-        if await self.db.get_coin_open_count(sym_b) >= max_same_coin:
+        if state['open_count_b'] >= max_same_coin:
             return self._fail(f"concentration_limit_{sym_b}")
 
         # Check total open pairs limit
-        open_trades = await self.db.get_open_trades()
-        if len(open_trades) >= max_open_pairs:
+        if state['open_pairs'] >= max_open_pairs:
             return self._fail("max_open_pairs_reached")
 
         # ── Sizing ──
@@ -93,19 +105,26 @@ class TradeExecutor:
         group_id = str(uuid.uuid4())
         print(f"[Executor] Opening {sym_a}({side_a}/${size_a:.0f}) / {sym_b}({side_b}/${size_b:.0f}) | Z={z:.3f} β={beta:.3f}")
 
-        # ── Atomic Execution: Leg A ──
-        try:
-            order_a = await self.exchange.place_order(sym_a, side_a, size_a)
-        except Exception as e:
-            return self._fail(f"leg_a_failed: {e}")
-
-        # ── Atomic Execution: Leg B ──
-        try:
-            order_b = await self.exchange.place_order(sym_b, side_b, size_b)
-        except Exception as e:
-            print(f"[Executor] Leg B failed: {e}. Rolling back Leg A...")
+        # ── Atomic Execution: both legs submitted together ──
+        order_a, order_b = await self.exchange.place_pair_orders(sym_a, side_a, size_a, sym_b, side_b, size_b)
+        failed_a = isinstance(order_a, Exception)
+        failed_b = isinstance(order_b, Exception)
+
+        if failed_a and failed_b:
+            if isinstance(order_a, OrderNotSent):
+                return self._fail(f"leg_b_failed: {order_b}")
+            return self._fail(f"leg_a_failed: {order_a}")
+        if failed_a:
+            print(f"[Executor] Leg A failed: {order_a}. Rolling back Leg B...")
+            await self._rollback_leg(sym_b, side_b, size_b)
+            return self._fail(f"leg_a_failed_rollback: {order_a}")
+        if failed_b:
+            print(f"[Executor] Leg B failed: {order_b}. Rolling back Leg A...")
             await self._rollback_leg(sym_a, side_a, size_a)
-            return self._fail(f"leg_b_failed_rollback: {e}")
+            return self._fail(f"leg_b_failed_rollback: {order_b}")
+
+        leg_skew_ms = self._leg_skew_ms(order_a, order_b)
+        print(f"[Executor] Legs filled, skew={leg_skew_ms}ms")
 
         # ── DB Persistence (immediately after both legs confirm) ──
         price_a = float(order_a.get('average') or order_a.get('price') or 0)
@@ -131,6 +150,7 @@ class TradeExecutor:
             'entry_zone':        zone,
             'validation_json':   signal.get('validation_json', {}),
             'grace_until':       grace_until,
+            'leg_skew_ms':       leg_skew_ms,
         })
 
         print(f"[Executor] Pair opened. GroupID={group_id}")
@@ -141,6 +161,17 @@ class TradeExecutor:
     # ─────────────────────────────────────────────────────
 
     async def close_pair(self, group_id: str, exit_reason: str = 'manual') -> dict:
+        entry = self._group_locks.setdefault(group_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await self._close_pair_locked(group_id, exit_reason)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._group_locks[group_id]
+
+    async def _close_pair_locked(self, group_id: str, exit_reason: str) -> dict:
         trade = await self.db.get_trade_by_group(group_id)
         if not trade:
             return self._fail("trade_not_found")
@@ -168,11 +199,18 @@ class TradeExecutor:
             err_b = str(e)
             print(f"[Executor] Close Leg B error: {e}")
 
-        # Post-close verification: retry up to 3 times
+        # Post-close verification: retry up to 3 times; a failed fetch never counts as flat
+        unverified = False
         for attempt in range(3):
             await asyncio.sleep(2)
-            still_a = await self.exchange.get_position(sym_a)
-            still_b = await self.exchange.get_position(sym_b)
+            try:
+                still_a = await self.exchange.get_position(sym_a)
+                still_b = await self.exchange.get_position(sym_b)
+            except PositionUnknown as e:
+                unverified = True
+                print(f"[Executor] Post-close verify attempt {attempt+1}: position unknown ({e}), retrying...")
+                continue
+            unverified = False
             if not still_a and not still_b:
                 break
             print(f"[Executor] Post-close verify attempt {attempt+1}: positions still open, retrying...")
@@ -187,6 +225,10 @@ class TradeExecutor:
                 except Exception:
                     pass
         else:
+            if unverified:
+                # Leave the trade open so the monitor retries the close on a later tick
+                print(f"[Executor] WARNING: Could not verify {sym_a}/{sym_b} closed, trade left open.")
+                return self._fail("close_unverified")
             print(f"[Executor] WARNING: Could not fully close {sym_a}/{sym_b} after 3 attempts. Manual intervention may be required.")
 
         # Calculate PnL
@@ -205,26 +247,49 @@ class TradeExecutor:
     # ─────────────────────────────────────────────────────
 
     async def _rollback_leg(self, symbol: str, open_side: str, size_usd: float):
-        """Try to close a single leg that was opened. Retry 3 times."""
+        """
+        Try to close a single leg that was opened. Retry 3 times. After a
+        close whose verification fetch failed, later attempts only re-check
+        the position; another close is sent once the leg is seen still open.
+        """
+        send_close = True
         for attempt in range(3):
             try:
-                await self.exchange.close_position(symbol, open_side)
+                if send_close:
+                    await self.exchange.close_position(symbol, open_side)
+                    await asyncio.sleep(1)
                 # Verify
-                await asyncio.sleep(1)
                 pos = await self.exchange.get_position(symbol)
                 if not pos:
                     print(f"[Executor] Rollback {symbol} succeeded on attempt {attempt+1}")
                     return
+                send_close = True
+            except PositionUnknown as e:
+                send_close = False
+                print(f"[Executor] Rollback {symbol} attempt {attempt+1}: position unknown ({e}), re-checking...")
             except Exception as e:
+                send_close = True
                 print(f"[Executor] Rollback {symbol} attempt {attempt+1} failed: {e}")
             await asyncio.sleep(1)
         print(f"[Executor] CRITICAL: Rollback {symbol} failed after 3 attempts. Manual intervention required!")
 
+    @staticmethod
+    def _leg_skew_ms(order_a: dict, order_b: dict) -> Optional[int]:
+        """Fill-time gap between the legs: exchange timestamps if both have one, else local acks."""
+        ts_a = order_a.get('lastTradeTimestamp') or order_a.get('timestamp')
+        ts_b = order_b.get('lastTradeTimestamp') or order_b.get('timestamp')
+        if not (ts_a and ts_b):
+            ts_a, ts_b = order_a.get('acked_at_ms'), order_b.get('acked_at_ms')
+        if not (ts_a and ts_b):
+            return None
+        return int(round(abs(float(ts_a) - float(ts_b))))
+
     async def _compute_pnl(self, trade: dict) -> float:
         """Compute estimated PnL from entry/exit prices."""
         try:
-            price_a_exit = await self.exchange.get_mark_price(trade['symbol_a']) or 0
-            price_b_exit = await self.exchange.get_mark_price(trade['symbol_b']) or 0
+            prices = await self.exchange.get_prices([trade['symbol_a'], trade['symbol_b']])
+            price_a_exit = prices[trade['symbol_a']] or 0
+            price_b_exit = prices[trade['symbol_b']] or 0
             entry_a = float(trade.get('leg_a_entry_price') or 0)
             entry_b = float(trade.get('leg_b_entry_price') or 0)
             size_a  = float(trade.get('leg_a_size_usd') or 0)
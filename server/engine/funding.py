@@ -0,0 +1,102 @@
+import time
+import asyncio
+from typing import Any, Dict, List, Optional
+
+
+class FundingRateService:
+    """
+    Funding rates for all USDT-M perps, refreshed by funding epoch.
+
+    One fetch_funding_rates call loads every symbol's predicted rate and next
+    funding time. The snapshot stays valid until the earliest upcoming
+    settlement; inside the last `near_settlement_sec` before it, it is
+    refreshed at most every `near_refresh_sec` as the predicted rate settles.
+    When an epoch passes, the previous predicted rate becomes the coin's
+    `last_rate`. Per-symbol rate history is cached the same way for PnL
+    attribution.
+    """
+
+    def __init__(self, exchange, near_settlement_sec: float = 300, near_refresh_sec: float = 60):
+        self.exchange = exchange                 # ccxt client
+        self.near_settlement_sec = near_settlement_sec
+        self.near_refresh_sec = near_refresh_sec
+        self._rates: Dict[str, Dict[str, Any]] = {}      # coin -> {rate, last_rate, next_funding_ms}
+        self._fetched_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._history: Dict[str, tuple] = {}             # coin -> (valid_until_ms, since_ms, rows)
+
+    # ─────────────────────────────────────────────────────
+    # Current rates
+    # ─────────────────────────────────────────────────────
+
+    async def get(self, coin: str) -> Optional[Dict[str, Any]]:
+        await self._ensure_fresh()
+        return self._rates.get(coin)
+
+    async def rate(self, coin: str) -> Optional[float]:
+        """Signed predicted funding rate for the upcoming settlement."""
+        info = await self.get(coin)
+        return info['rate'] if info else None
+
+    def _expired(self) -> bool:
+        age = time.time() - self._fetched_at
+        next_ms = min((r['next_funding_ms'] for r in self._rates.values() if r['next_funding_ms']), default=0)
+        if not next_ms:
+            return age >= self.near_refresh_sec
+        if time.time() * 1000 >= next_ms - self.near_settlement_sec * 1000:
+            return age >= self.near_refresh_sec
+        return False
+
+    async def _ensure_fresh(self):
+        if not self._expired():
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        await asyncio.shield(self._refresh_task)
+
+    async def _refresh(self):
+        try:
+            raw = await self.exchange.fetch_funding_rates()
+        except Exception as e:
+            print(f"[Funding] fetch_funding_rates failed: {e}")
+            self._fetched_at = time.time()   # keep serving the old snapshot, retry later
+            return
+        rates = {}
+        for sym, fr in raw.items():
+            if not sym.endswith('/USDT:USDT') or fr.get('fundingRate') is None:
+                continue
+            coin = sym.split('/')[0]
+            next_ms = int(fr.get('fundingTimestamp') or fr.get('nextFundingTimestamp') or 0)
+            prev = self._rates.get(coin)
+            last_rate = fr.get('previousFundingRate')
+            if last_rate is None and prev is not None:
+                # Epoch rolled over since the last snapshot: the old prediction was settled
+                last_rate = prev['rate'] if next_ms != prev['next_funding_ms'] else prev['last_rate']
+            rates[coin] = {
+                'rate':            float(fr['fundingRate']),
+                'last_rate':       float(last_rate) if last_rate is not None else None,
+                'next_funding_ms': next_ms,
+            }
+        self._rates = rates
+        self._fetched_at = time.time()
+
+    # ─────────────────────────────────────────────────────
+    # History (PnL attribution)
+    # ─────────────────────────────────────────────────────
+
+    async def history(self, coin: str, since_ms: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Settled funding rates for a coin ([{timestamp, rate}], oldest first) since since_ms."""
+        now_ms = time.time() * 1000
+        cached = self._history.get(coin)
+        if cached is None or now_ms >= cached[0] or (cached[1] or 0) > (since_ms or 0):
+            rows = await self.exchange.fetch_funding_rate_history(f"{coin}/USDT:USDT", since_ms)
+            rows = [{'timestamp': int(r['timestamp']), 'rate': float(r['fundingRate'])} for r in rows]
+            info = await self.get(coin)
+            valid_until = info['next_funding_ms'] if info and info['next_funding_ms'] else now_ms + 3600 * 1000
+            cached = (valid_until, since_ms, rows)
+            self._history[coin] = cached
+        return [r for r in cached[2] if since_ms is None or r['timestamp'] >= since_ms]
+
+    async def accrued_rate(self, coin: str, since_ms: int) -> float:
+        """Sum of settled funding rates since since_ms (multiply by notional for USD)."""
+        return sum(r['rate'] for r in await self.history(coin, since_ms))
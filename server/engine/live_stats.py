@@ -0,0 +1,129 @@
+import math
+from datetime import date
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+class RollingPairStats:
+    """
+    Intraday z-score and correlation for one pair against a frozen daily beta.
+
+    Seeded with aligned daily closes (oldest first, last = still-forming bar).
+    Keeps running sums / cross-sums over the price window and a ring buffer of
+    the last `z_window` spreads, so each new price observation costs O(1):
+      - same day   -> overwrite the forming bar
+      - new day    -> append a bar, drop the oldest (sums are re-derived once
+                      per roll to shed accumulated rounding error)
+    zscore matches step 6 of compute_pair_stats (population std), correlation
+    matches step 1, both as if the daily close were the latest price.
+    """
+
+    def __init__(
+        self, closes_a: Sequence[float], closes_b: Sequence[float], beta: float,
+        z_window: int = 60, day: Optional[date] = None,
+    ):
+        n = min(len(closes_a), len(closes_b))
+        if n < z_window:
+            raise ValueError(f"need at least {z_window} aligned closes, got {n}")
+        self.beta     = float(beta)
+        self.day      = day
+        self.z_window = z_window
+
+        self._a = np.array(closes_a[-n:], dtype=float)
+        self._b = np.array(closes_b[-n:], dtype=float)
+        self._head = n - 1                      # slot of the forming bar
+        self._s = (self._a - self.beta * self._b)[-z_window:].copy()
+        self._s_head = z_window - 1
+        self._resum()
+
+    # ─────────────────────────────────────────────────────
+    # Updates
+    # ─────────────────────────────────────────────────────
+
+    def update(self, price_a: float, price_b: float, day: Optional[date] = None) -> Optional[float]:
+        """Fold in a live price pair and return the fresh z-score."""
+        if day is not None and self.day is not None and day != self.day:
+            self.roll(price_a, price_b, day)
+            return self.zscore
+
+        a_old, b_old = self._a[self._head], self._b[self._head]
+        self._remove_prices(a_old, b_old)
+        self._add_prices(price_a, price_b)
+        self._a[self._head], self._b[self._head] = price_a, price_b
+
+        s_new = price_a - self.beta * price_b
+        s_old = self._s[self._s_head]
+        self._s_sum += (s_new - self._s_ref) - (s_old - self._s_ref)
+        self._s_sq  += (s_new - self._s_ref) ** 2 - (s_old - self._s_ref) ** 2
+        self._s[self._s_head] = s_new
+        if day is not None:
+            self.day = day
+        return self.zscore
+
+    def roll(self, price_a: float, price_b: float, day: Optional[date] = None):
+        """Start a new daily bar with the given prices, evicting the oldest."""
+        self._head = (self._head + 1) % len(self._a)
+        self._a[self._head], self._b[self._head] = price_a, price_b
+        self._s_head = (self._s_head + 1) % self.z_window
+        self._s[self._s_head] = price_a - self.beta * price_b
+        self.day = day
+        self._resum()
+
+    # ─────────────────────────────────────────────────────
+    # Outputs
+    # ─────────────────────────────────────────────────────
+
+    @property
+    def spread(self) -> float:
+        return float(self._s[self._s_head])
+
+    @property
+    def zscore(self) -> Optional[float]:
+        n    = self.z_window
+        mean = self._s_sum / n
+        var  = self._s_sq / n - mean * mean
+        if var <= 0:
+            return None
+        return (self.spread - self._s_ref - mean) / math.sqrt(var)
+
+    @property
+    def correlation(self) -> Optional[float]:
+        n = len(self._a)
+        ma, mb = self._sa / n, self._sb / n
+        var_a = self._saa / n - ma * ma
+        var_b = self._sbb / n - mb * mb
+        if var_a <= 0 or var_b <= 0:
+            return None
+        return (self._sab / n - ma * mb) / math.sqrt(var_a * var_b)
+
+    # ─────────────────────────────────────────────────────
+    # Helpers (sums are kept relative to a reference level for precision)
+    # ─────────────────────────────────────────────────────
+
+    def _resum(self):
+        self._ref_a = float(self._a.mean())
+        self._ref_b = float(self._b.mean())
+        da, db = self._a - self._ref_a, self._b - self._ref_b
+        self._sa, self._sb = float(da.sum()), float(db.sum())
+        self._saa, self._sbb, self._sab = float(da @ da), float(db @ db), float(da @ db)
+
+        self._s_ref = float(self._s.mean())
+        ds = self._s - self._s_ref
+        self._s_sum, self._s_sq = float(ds.sum()), float(ds @ ds)
+
+    def _add_prices(self, a: float, b: float):
+        da, db = a - self._ref_a, b - self._ref_b
+        self._sa += da
+        self._sb += db
+        self._saa += da * da
+        self._sbb += db * db
+        self._sab += da * db
+
+    def _remove_prices(self, a: float, b: float):
+        da, db = a - self._ref_a, b - self._ref_b
+        self._sa -= da
+        self._sb -= db
+        self._saa -= da * da
+        self._sbb -= db * db
+        self._sab -= da * db
@@ -0,0 +1,112 @@
+import os
+import time
+import json
+import asyncio
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+
+# All-market mark price + funding stream (USDT-M), pushed every second
+DEFAULT_WS_URL = 'wss://fstream.binance.com/stream?streams=!markPrice@arr@1s'
+
+
+class MarketDataFeed:
+    """
+    Long-lived websocket subscription to Binance's all-market mark price stream.
+
+    Keeps an in-memory cache per coin ('BTC') of
+      - mark price
+      - current funding rate and next funding time
+    each with the local receive time. Readers get None when the value is
+    missing or older than max_age_sec, so callers can fall back to REST.
+    Reconnects with exponential backoff; Binance drops streams every 24h.
+    """
+
+    def __init__(self, url: Optional[str] = None, max_age_sec: float = 5.0):
+        self.url = url or os.getenv('BINANCE_MARKET_WS_URL', DEFAULT_WS_URL)
+        self.max_age_sec = max_age_sec
+        self._marks: Dict[str, Tuple[float, float]] = {}            # coin -> (price, received_at)
+        self._funding: Dict[str, Tuple[float, int, float]] = {}     # coin -> (rate, next_funding_ms, received_at)
+        self._task: Optional[asyncio.Task] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.connected = asyncio.Event()
+
+    # ─────────────────────────────────────────────────────
+    # Lifecycle
+    # ─────────────────────────────────────────────────────
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session:
+            await self._session.close()
+            self._session = None
+        self.connected.clear()
+
+    async def _run(self):
+        backoff = 1.0
+        self._session = self._session or aiohttp.ClientSession()
+        while True:
+            try:
+                async with self._session.ws_connect(self.url, heartbeat=30) as ws:
+                    print(f"[MarketData] Connected {self.url}")
+                    self.connected.set()
+                    backoff = 1.0
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            self._ingest(json.loads(msg.data))
+                        elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[MarketData] Stream error: {e}")
+            self.connected.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    # ─────────────────────────────────────────────────────
+    # Cache
+    # ─────────────────────────────────────────────────────
+
+    def _ingest(self, msg: dict):
+        data = msg.get('data', msg)
+        if isinstance(data, dict):
+            data = [data]
+        now = time.time()
+        for u in data:
+            if u.get('e') != 'markPriceUpdate':
+                continue
+            sym = u['s']
+            if not sym.endswith('USDT'):
+                continue
+            coin = sym[:-4]
+            self._marks[coin] = (float(u['p']), now)
+            if u.get('r') not in (None, ''):
+                self._funding[coin] = (float(u['r']), int(u.get('T') or 0), now)
+
+    def mark_price(self, coin: str) -> Optional[float]:
+        hit = self._marks.get(coin)
+        if hit and time.time() - hit[1] <= self.max_age_sec:
+            return hit[0]
+        return None
+
+    def funding_rate(self, coin: str) -> Optional[float]:
+        """Signed current funding rate, None if missing or stale."""
+        hit = self._funding.get(coin)
+        if hit and time.time() - hit[2] <= self.max_age_sec:
+            return hit[0]
+        return None
+
+    def next_funding_time(self, coin: str) -> Optional[int]:
+        hit = self._funding.get(coin)
+        return hit[1] if hit else None
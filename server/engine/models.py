@@ -1,9 +1,14 @@
 import os
 import json
-from typing import List, Optional, Dict, Any
+from datetime import date, datetime, timezone
+from typing import List, Optional, Dict, Any, Mapping, Tuple
 import asyncpg
 from dotenv import load_dotenv
 
+from .config_store import config_store, parse_config_value
+from .portfolio_book import portfolio_book
+from .price_panel import PricePanel
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -23,6 +28,27 @@ async def get_db_conn():
     return pool.acquire()
 
 
+_UPSERT_PAIR_SQL = """
+    INSERT INTO pairs (symbol_a, symbol_b, correlation, hurst_exp, half_life,
+        hedge_ratio, zscore, zone, qualified, validation_json, scanned_at, cointegration_pvalue)
+    VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,NOW(),$11)
+    ON CONFLICT (symbol_a, symbol_b) DO UPDATE SET
+        correlation=$3, hurst_exp=$4, half_life=$5, hedge_ratio=$6,
+        zscore=$7, zone=$8, qualified=$9, validation_json=$10,
+        scanned_at=NOW(), cointegration_pvalue=$11
+"""
+
+
+def _pair_params(data: dict) -> tuple:
+    return (
+        data['symbol_a'], data['symbol_b'],
+        data['correlation'], data['hurst_exp'], data['half_life'],
+        data['hedge_ratio'], data['zscore'], data['zone'],
+        data['qualified'], json.dumps(data['validation_json']),
+        data['cointegration_pvalue'],
+    )
+
+
 class DBManager:
 
     @staticmethod
@@ -34,6 +60,33 @@ class DBManager:
                 symbol, ts, close, volume,
             )
 
+    @staticmethod
+    async def save_ohlcv_bulk(symbol: str, rows: List[List[Any]]):
+        """
+        Upsert ccxt OHLCV rows ([ms, o, h, l, c, v], ...) for one symbol in a
+        single transaction: COPY into a temp staging table, then one merge.
+        Existing days are overwritten so a still-forming bar gets its final close.
+        """
+        if not rows:
+            return
+        records = [
+            (symbol, datetime.fromtimestamp(r[0] / 1000, tz=timezone.utc).date(), float(r[4]), float(r[5] or 0))
+            for r in rows
+        ]
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "CREATE TEMP TABLE ohlcv_stage (LIKE ohlcv_daily INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                await conn.copy_records_to_table(
+                    'ohlcv_stage', records=records, columns=['symbol', 'ts', 'close', 'volume'],
+                )
+                await conn.execute(
+                    "INSERT INTO ohlcv_daily (symbol, ts, close, volume) SELECT symbol, ts, close, volume FROM ohlcv_stage "
+                    "ON CONFLICT (symbol, ts) DO UPDATE SET close=EXCLUDED.close, volume=EXCLUDED.volume"
+                )
+
     @staticmethod
     async def get_ohlcv(symbol: str, limit: int = 180) -> List[float]:
         pool = await get_pool()
@@ -45,25 +98,110 @@ class DBManager:
             return [float(r['close']) for r in reversed(rows)]
 
     @staticmethod
-    async def upsert_pair(data: dict):
+    async def get_price_panel(symbols: List[str], limit: int = 180) -> PricePanel:
+        """Last `limit` daily candles of every symbol in one query, as a date-aligned PricePanel."""
+        if not symbols:
+            return PricePanel.empty([], [])
         pool = await get_pool()
         async with pool.acquire() as conn:
-            await conn.execute(
+            rows = await conn.fetch(
                 """
-                INSERT INTO pairs (symbol_a, symbol_b, correlation, hurst_exp, half_life,
-                    hedge_ratio, zscore, zone, qualified, validation_json, scanned_at, cointegration_pvalue)
-                VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,NOW(),$11)
-                ON CONFLICT (symbol_a, symbol_b) DO UPDATE SET
-                    correlation=$3, hurst_exp=$4, half_life=$5, hedge_ratio=$6,
-                    zscore=$7, zone=$8, qualified=$9, validation_json=$10,
-                    scanned_at=NOW(), cointegration_pvalue=$11
+                SELECT symbol, ts, close, volume FROM (
+                    SELECT symbol, ts, close, volume,
+                           ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY ts DESC) AS rn
+                    FROM ohlcv_daily WHERE symbol = ANY($1::varchar[])
+                ) t
+                WHERE rn <= $2
                 """,
-                data['symbol_a'], data['symbol_b'],
-                data['correlation'], data['hurst_exp'], data['half_life'],
-                data['hedge_ratio'], data['zscore'], data['zone'],
-                data['qualified'], json.dumps(data['validation_json']),
-                data['cointegration_pvalue'],
+                list(symbols), limit,
             )
+        return PricePanel.from_rows(rows, symbols, limit)
+
+    @staticmethod
+    async def get_ohlcv_symbols() -> List[str]:
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("SELECT DISTINCT symbol FROM ohlcv_daily ORDER BY symbol")
+            return [r['symbol'] for r in rows]
+
+    @staticmethod
+    async def get_ohlcv_coverage(last_days: Dict[str, Optional[date]]) -> Dict[str, int]:
+        """Per symbol, the number of stored daily rows up to and including last_days[symbol]."""
+        if not last_days:
+            return {}
+        symbols = list(last_days)
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT o.symbol, COUNT(*) AS n
+                FROM ohlcv_daily o
+                JOIN unnest($1::varchar[], $2::date[]) AS s(symbol, last_day) ON o.symbol = s.symbol
+                WHERE o.ts <= s.last_day
+                GROUP BY o.symbol
+                """,
+                symbols, [last_days[s] or date(1970, 1, 1) for s in symbols],
+            )
+        return {r['symbol']: r['n'] for r in rows}
+
+    @staticmethod
+    async def get_ohlcv_since(since: Dict[str, Optional[date]]) -> List[asyncpg.Record]:
+        """Daily rows (symbol, ts, close, volume) from since[symbol] onward (all rows if None), ordered by symbol, ts."""
+        if not since:
+            return []
+        symbols = list(since)
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            return await conn.fetch(
+                """
+                SELECT o.symbol, o.ts, o.close, o.volume
+                FROM ohlcv_daily o
+                JOIN unnest($1::varchar[], $2::date[]) AS s(symbol, since) ON o.symbol = s.symbol
+                WHERE o.ts >= s.since
+                ORDER BY o.symbol, o.ts
+                """,
+                symbols, [since[s] or date(1970, 1, 1) for s in symbols],
+            )
+
+    @staticmethod
+    async def get_ohlcv_sync_state(symbols: List[str], since: date) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-symbol coverage of ohlcv_daily from `since`: row count, first/last
+        stored day and the day before the earliest gap (None if contiguous).
+        """
+        if not symbols:
+            return {}
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT symbol, COUNT(*) AS rows, MIN(ts) AS first_ts, MAX(ts) AS last_ts,
+                       MIN(prev_ts) FILTER (WHERE ts - prev_ts > 1) AS gap_from
+                FROM (
+                    SELECT symbol, ts, LAG(ts) OVER (PARTITION BY symbol ORDER BY ts) AS prev_ts
+                    FROM ohlcv_daily WHERE symbol = ANY($1::varchar[]) AND ts >= $2
+                ) t
+                GROUP BY symbol
+                """,
+                list(symbols), since,
+            )
+            return {r['symbol']: dict(r) for r in rows}
+
+    @staticmethod
+    async def upsert_pair(data: dict):
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(_UPSERT_PAIR_SQL, *_pair_params(data))
+
+    @staticmethod
+    async def upsert_pairs(pairs: List[dict]):
+        """Upsert many scanned pairs in one transaction (pipelined executemany)."""
+        if not pairs:
+            return
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany(_UPSERT_PAIR_SQL, [_pair_params(p) for p in pairs])
 
     @staticmethod
     async def get_pair_stats(symbol_a: str, symbol_b: str) -> Optional[Dict]:
@@ -76,52 +214,104 @@ class DBManager:
             return dict(row) if row else None
 
     @staticmethod
-    async def save_scan_result(total, qualified, signals, blocked, duration, details):
+    async def save_scan_result(total, qualified, signals, blocked, duration, details) -> int:
         pool = await get_pool()
         async with pool.acquire() as conn:
-            await conn.execute(
-                "INSERT INTO scan_results (total_pairs, qualified, signals, blocked, duration_ms, details) VALUES ($1,$2,$3,$4,$5,$6)",
+            return await conn.fetchval(
+                "INSERT INTO scan_results (total_pairs, qualified, signals, blocked, duration_ms, details) VALUES ($1,$2,$3,$4,$5,$6) RETURNING id",
                 total, qualified, signals, blocked, duration, json.dumps(details),
             )
 
+    @staticmethod
+    async def get_last_scan_id() -> int:
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            return await conn.fetchval("SELECT COALESCE(MAX(id), 0) FROM scan_results")
+
+    @staticmethod
+    async def fetch_pairs() -> List[Dict]:
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT symbol_a, symbol_b, correlation, hurst_exp, half_life,
+                       hedge_ratio, zscore, zone, qualified, scanned_at,
+                       cointegration_pvalue, validation_json
+                FROM pairs
+            """)
+            return [dict(r) for r in rows]
+
+    @staticmethod
+    async def save_optimizer_run(run: dict) -> int:
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            return await conn.fetchval(
+                """
+                INSERT INTO optimizer_runs (started_at, method, metric, days, pairs, evaluated, total, live_rank, details)
+                VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9) RETURNING id
+                """,
+                run['started_at'], run['method'], run['metric'], run['days'], run['pairs'],
+                run['evaluated'], run['total'], run['live_rank'],
+                json.dumps({k: run[k] for k in ('keys', 'live', 'leaderboard')}),
+            )
+
+    @staticmethod
+    async def get_optimizer_run(run_id: Optional[int] = None) -> Optional[Dict]:
+        """One optimizer run (latest by default) with its leaderboard."""
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            if run_id is None:
+                row = await conn.fetchrow("SELECT * FROM optimizer_runs ORDER BY id DESC LIMIT 1")
+            else:
+                row = await conn.fetchrow("SELECT * FROM optimizer_runs WHERE id=$1", run_id)
+        if row is None:
+            return None
+        run = dict(row)
+        run.update(json.loads(run.pop('details')))
+        return run
+
+    @staticmethod
+    async def set_backtest_rank(keys: List[str], rank: int, total: int):
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(
+                "UPDATE config SET backtest_rank=$2, backtest_total=$3, last_optimized=NOW() WHERE key = ANY($1)",
+                keys, rank, total,
+            )
+
     @staticmethod
     async def get_config(key: str, default=None):
+        if config_store.loaded:
+            return config_store.get(key, default)
         pool = await get_pool()
         async with pool.acquire() as conn:
             row = await conn.fetchrow("SELECT value FROM config WHERE key=$1", key)
             if row:
-                try:
-                    return float(row['value'])
-                except Exception:
-                    return row['value']
+                return parse_config_value(row['value'])
             return default
 
     @staticmethod
     async def get_all_config() -> Dict[str, Any]:
+        if config_store.loaded:
+            return config_store.all()
         pool = await get_pool()
         async with pool.acquire() as conn:
             rows = await conn.fetch("SELECT key, value FROM config")
-            result = {}
-            for r in rows:
-                try:
-                    result[r['key']] = float(r['value'])
-                except Exception:
-                    result[r['key']] = r['value']
-            return result
+            return {r['key']: parse_config_value(r['value']) for r in rows}
 
     @staticmethod
     async def open_trade(data: dict) -> str:
         pool = await get_pool()
         async with pool.acquire() as conn:
-            await conn.execute(
+            row = await conn.fetchrow(
                 """
                 INSERT INTO trades (
                     group_id, symbol_a, symbol_b,
                     leg_a_side, leg_a_size_usd, leg_a_order_id, leg_a_entry_price,
                     leg_b_side, leg_b_size_usd, leg_b_order_id, leg_b_entry_price,
                     entry_zscore, entry_corr, entry_beta, entry_half_life, entry_zone,
-                    validation_json, grace_until, status, opened_at
-                ) VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11,$12,$13,$14,$15,$16,$17,$18,'open',NOW())
+                    validation_json, grace_until, leg_skew_ms, status, opened_at
+                ) VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11,$12,$13,$14,$15,$16,$17,$18,$19,'open',NOW())
+                RETURNING *
                 """,
                 data['group_id'], data['symbol_a'], data['symbol_b'],
                 data['leg_a_side'], data['leg_a_size_usd'], data['leg_a_order_id'], data.get('leg_a_entry_price'),
@@ -129,8 +319,9 @@ class DBManager:
                 data['entry_zscore'], data['entry_corr'], data['entry_beta'],
                 data.get('entry_half_life'), data['entry_zone'],
                 json.dumps(data.get('validation_json', {})),
-                data.get('grace_until'),
+                data.get('grace_until'), data.get('leg_skew_ms'),
             )
+        portfolio_book.on_open(dict(row))
         return data['group_id']
 
     @staticmethod
@@ -141,18 +332,27 @@ class DBManager:
                 "UPDATE trades SET status='closed', exit_zscore=$2, exit_reason=$3, pnl_usd=$4, closed_at=NOW() WHERE group_id=$1",
                 group_id, exit_zscore, exit_reason, pnl_usd,
             )
+        portfolio_book.on_close(group_id)
 
     @staticmethod
     async def update_trade_zscore(group_id: str, current_zscore: float):
         pool = await get_pool()
         async with pool.acquire() as conn:
-            await conn.execute(
-                "UPDATE trades SET current_zscore=$2, last_monitored_at=NOW() WHERE group_id=$1",
+            monitored_at = await conn.fetchval(
+                "UPDATE trades SET current_zscore=$2, last_monitored_at=NOW() WHERE group_id=$1 RETURNING last_monitored_at",
                 group_id, current_zscore,
             )
+        portfolio_book.on_zscore(group_id, current_zscore, monitored_at)
+
+    @staticmethod
+    async def get_open_trades() -> Tuple[Mapping, ...]:
+        """Immutable snapshot of open trades, served from the in-memory PortfolioBook."""
+        if not portfolio_book.loaded:
+            portfolio_book.load(await DBManager.fetch_open_trades())
+        return portfolio_book.snapshot()
 
     @staticmethod
-    async def get_open_trades() -> List[Dict]:
+    async def fetch_open_trades() -> List[Dict]:
         pool = await get_pool()
         async with pool.acquire() as conn:
             rows = await conn.fetch("SELECT * FROM trades WHERE status='open' ORDER BY opened_at ASC")
@@ -200,6 +400,29 @@ class DBManager:
             )
             return int(val or 0)
 
+    @staticmethod
+    async def get_pretrade_state(symbol_a: str, symbol_b: str, cooldown_sec: float) -> Dict[str, Any]:
+        """Every DB-side pre-trade check for a pair in one round trip."""
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(
+                """
+                SELECT
+                    COUNT(*) FILTER (WHERE symbol_a=$1 AND symbol_b=$2) > 0          AS pair_open,
+                    EXISTS (
+                        SELECT 1 FROM trades
+                        WHERE symbol_a=$1 AND symbol_b=$2 AND status='closed'
+                          AND closed_at > NOW() - ($3 || ' seconds')::INTERVAL
+                    )                                                                AS in_cooldown,
+                    COUNT(*) FILTER (WHERE symbol_a=$1 OR symbol_b=$1)               AS open_count_a,
+                    COUNT(*) FILTER (WHERE symbol_a=$2 OR symbol_b=$2)               AS open_count_b,
+                    COUNT(*)                                                         AS open_pairs
+                FROM trades WHERE status='open'
+                """,
+                symbol_a, symbol_b, str(int(cooldown_sec)),
+            )
+            return dict(row)
+
     @staticmethod
     async def get_trade_stats() -> Dict[str, Any]:
         pool = await get_pool()
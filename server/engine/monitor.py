@@ -1,10 +1,13 @@
 import asyncio
 import math
+import time
+from collections import deque
 from datetime import datetime, timezone
 
 from .exchange import BinanceClient
 from .models import DBManager
-from .stats import compute_pair_stats
+from .live_stats import RollingPairStats
+from .column_store import column_store
 
 
 class PositionMonitor:
@@ -23,112 +26,220 @@ class PositionMonitor:
         self.exchange = exchange
         self.executor = executor
         self.db = DBManager()
+        self._live = {}          # group_id -> RollingPairStats
+        self._close_tasks = {}   # group_id -> asyncio.Task running executor.close_pair
+        self.tick_ms = deque(maxlen=500)
 
     async def run_once(self):
+        tick_start = time.perf_counter()
         open_trades = await self.db.get_open_trades()
+        open_ids = {str(t['group_id']) for t in open_trades}
+        for gid in [g for g in self._live if g not in open_ids]:
+            del self._live[gid]
         if not open_trades:
+            self._record_tick(time.perf_counter() - tick_start, 0)
             return
 
         config = await self.db.get_all_config()
+        now = datetime.now(timezone.utc)
+
+        # One price snapshot per tick for every leg
+        prices = await self.exchange.get_prices(
+            list({t['symbol_a'] for t in open_trades} | {t['symbol_b'] for t in open_trades})
+        )
+
+        # Every trade is evaluated concurrently; closes are handed off, never awaited here
+        results = await asyncio.gather(
+            *(self._check_trade(t, config, prices, now) for t in open_trades), return_exceptions=True,
+        )
+        for trade, res in zip(open_trades, results):
+            if isinstance(res, Exception):
+                print(f"[Monitor] Check failed for {trade['symbol_a']}/{trade['symbol_b']}: {res}")
+
+        self._record_tick(time.perf_counter() - tick_start, len(open_trades))
+
+    async def _check_trade(self, trade: dict, config: dict, prices: dict, now: datetime):
         zscore_sl       = float(config.get('zscore_sl',          3.0))
         corr_break_sl   = float(config.get('corr_break_sl',      0.50))
         max_loss_pct    = float(config.get('max_loss_pct',        5.0))
         funding_max     = float(config.get('funding_rate_max',    0.001))
         beta_drift_max  = float(config.get('beta_drift_max_pct', 20.0))
 
-        now = datetime.now(timezone.utc)
+        group_id = str(trade['group_id'])
+        if group_id in self._close_tasks:
+            return  # close already in flight
+        sym_a    = trade['symbol_a']
+        sym_b    = trade['symbol_b']
+        entry_hl = float(trade.get('entry_half_life') or 0)
+        entry_beta = float(trade.get('entry_beta') or 0)
+        opened_at = trade['opened_at']
+        if opened_at.tzinfo is None:
+            opened_at = opened_at.replace(tzinfo=timezone.utc)
 
-        for trade in open_trades:
-            group_id = str(trade['group_id'])
-            sym_a    = trade['symbol_a']
-            sym_b    = trade['symbol_b']
-            entry_hl = float(trade.get('entry_half_life') or 0)
-            entry_beta = float(trade.get('entry_beta') or 0)
-            opened_at = trade['opened_at']
-            if opened_at.tzinfo is None:
-                opened_at = opened_at.replace(tzinfo=timezone.utc)
-
-            grace_until = trade.get('grace_until')
-            in_grace = grace_until is not None and (
-                grace_until if grace_until.tzinfo else grace_until.replace(tzinfo=timezone.utc)
-            ) > now
-
-            # ── Get latest pair stats ──
-            pair = await self.db.get_pair_stats(sym_a, sym_b)
-            if not pair:
-                continue
-
-            current_z    = float(pair.get('zscore') or 0)
-            current_corr = float(pair.get('correlation') or 1.0)
-            current_beta = float(pair.get('hedge_ratio') or entry_beta)
-
-            # Update current z in DB
-            await self.db.update_trade_zscore(group_id, current_z)
-
-            # ── SL4: Max Loss (works even in grace period) ──
-            pnl = await self._estimate_pnl(trade)
-            size_a = float(trade.get('leg_a_size_usd') or 0)
-            size_b = float(trade.get('leg_b_size_usd') or 0)
-            allocated = size_a + size_b
-            if allocated > 0:
-                loss_pct = (-pnl / allocated * 100) if pnl < 0 else 0
-                if loss_pct >= max_loss_pct:
-                    print(f"[Monitor] SL4 Max Loss on {sym_a}/{sym_b}: -{loss_pct:.1f}% >= {max_loss_pct}%")
-                    await self.executor.close_pair(group_id, 'sl_max_loss')
-                    continue
-
-            # ── Funding rate check (both legs) ──
-            fr_a = await self.exchange.get_funding_rate(sym_a)
-            fr_b = await self.exchange.get_funding_rate(sym_b)
-            if max(fr_a, fr_b) > funding_max:
-                print(f"[Monitor] Funding rate emergency exit {sym_a}/{sym_b}: fr_a={fr_a:.4f} fr_b={fr_b:.4f}")
-                await self.executor.close_pair(group_id, 'funding_rate_too_high')
-                continue
-
-            # ── Checks that respect grace period ──
-            if not in_grace:
-                # SL1: Z-Score Stop
-                if abs(current_z) >= zscore_sl:
-                    print(f"[Monitor] SL1 Z-Stop {sym_a}/{sym_b}: |z|={abs(current_z):.3f} >= {zscore_sl}")
-                    await self.executor.close_pair(group_id, 'sl_zscore')
-                    continue
-
-                # SL2: Time Stop
-                if entry_hl > 0:
-                    max_hold_days = 2.0 * entry_hl
-                    held_days = (now - opened_at).total_seconds() / 86400
-                    if held_days >= max_hold_days:
-                        print(f"[Monitor] SL2 Time Stop {sym_a}/{sym_b}: held={held_days:.1f}d >= {max_hold_days:.1f}d")
-                        await self.executor.close_pair(group_id, 'sl_time_stop')
-                        continue
-
-                # SL3: Correlation Break
-                if current_corr < corr_break_sl:
-                    print(f"[Monitor] SL3 Corr Break {sym_a}/{sym_b}: corr={current_corr:.3f} < {corr_break_sl}")
-                    await self.executor.close_pair(group_id, 'sl_corr_break')
-                    continue
+        grace_until = trade.get('grace_until')
+        in_grace = grace_until is not None and (
+            grace_until if grace_until.tzinfo else grace_until.replace(tzinfo=timezone.utc)
+        ) > now
 
-            else:
-                remaining = (grace_until.replace(tzinfo=timezone.utc) if grace_until.tzinfo is None else grace_until) - now
-                print(f"[Monitor] {sym_a}/{sym_b} in grace period ({remaining.seconds}s remaining), skipping SL1-3")
-
-            # ── Take Profit ──
-            tp_threshold = float(config.get('zscore_tp', 0.5))
-            if abs(current_z) <= tp_threshold:
-                print(f"[Monitor] TP {sym_a}/{sym_b}: z={current_z:.3f} reached {tp_threshold}")
-                await self.executor.close_pair(group_id, 'take_profit')
-                continue
-
-            # ── Beta drift warning ──
-            if entry_beta > 0 and current_beta > 0:
-                drift_pct = abs(current_beta - entry_beta) / entry_beta * 100
-                if drift_pct > beta_drift_max:
-                    print(f"[Monitor] WARNING beta drift {sym_a}/{sym_b}: entry={entry_beta:.3f} current={current_beta:.3f} drift={drift_pct:.1f}%")
-
-    async def _estimate_pnl(self, trade: dict) -> float:
+        # ── Get latest pair stats ──
+        pair = await self.db.get_pair_stats(sym_a, sym_b)
+        if not pair:
+            return
+
+        current_z    = float(pair.get('zscore') or 0)
+        current_corr = float(pair.get('correlation') or 1.0)
+        current_beta = float(pair.get('hedge_ratio') or entry_beta)
+
+        # Fresh intraday z / corr from live prices against the frozen daily beta
+        price_a = prices.get(sym_a)
+        price_b = prices.get(sym_b)
+        live = await self._live_stats(group_id, sym_a, sym_b, current_beta)
+        if live and price_a and price_b:
+            live_z = live.update(price_a, price_b, now.date())
+            if live_z is not None:
+                current_z = live_z
+            current_corr = live.correlation or current_corr
+
+        # Update current z in DB
+        await self.db.update_trade_zscore(group_id, current_z)
+
+        # ── SL4: Max Loss (works even in grace period) ──
+        pnl = await self._estimate_pnl(trade, price_a, price_b)
+        size_a = float(trade.get('leg_a_size_usd') or 0)
+        size_b = float(trade.get('leg_b_size_usd') or 0)
+        allocated = size_a + size_b
+        if allocated > 0:
+            loss_pct = (-pnl / allocated * 100) if pnl < 0 else 0
+            if loss_pct >= max_loss_pct:
+                print(f"[Monitor] SL4 Max Loss on {sym_a}/{sym_b}: -{loss_pct:.1f}% >= {max_loss_pct}%")
+                self._request_close(group_id, 'sl_max_loss')
+                return
+
+        # ── Funding rate check (both legs) ──
+        fr_a = await self.exchange.get_funding_rate(sym_a)
+        fr_b = await self.exchange.get_funding_rate(sym_b)
+        if max(fr_a, fr_b) > funding_max:
+            print(f"[Monitor] Funding rate emergency exit {sym_a}/{sym_b}: fr_a={fr_a:.4f} fr_b={fr_b:.4f}")
+            self._request_close(group_id, 'funding_rate_too_high')
+            return
+
+        # ── Checks that respect grace period ──
+        if not in_grace:
+            # SL1: Z-Score Stop
+            if abs(current_z) >= zscore_sl:
+                print(f"[Monitor] SL1 Z-Stop {sym_a}/{sym_b}: |z|={abs(current_z):.3f} >= {zscore_sl}")
+                self._request_close(group_id, 'sl_zscore')
+                return
+
+            # SL2: Time Stop
+            if entry_hl > 0:
+                max_hold_days = 2.0 * entry_hl
+                held_days = (now - opened_at).total_seconds() / 86400
+                if held_days >= max_hold_days:
+                    print(f"[Monitor] SL2 Time Stop {sym_a}/{sym_b}: held={held_days:.1f}d >= {max_hold_days:.1f}d")
+                    self._request_close(group_id, 'sl_time_stop')
+                    return
+
+            # SL3: Correlation Break
+            if current_corr < corr_break_sl:
+                print(f"[Monitor] SL3 Corr Break {sym_a}/{sym_b}: corr={current_corr:.3f} < {corr_break_sl}")
+                self._request_close(group_id, 'sl_corr_break')
+                return
+
+        else:
+            remaining = (grace_until.replace(tzinfo=timezone.utc) if grace_until.tzinfo is None else grace_until) - now
+            print(f"[Monitor] {sym_a}/{sym_b} in grace period ({remaining.seconds}s remaining), skipping SL1-3")
+
+        # ── Take Profit ──
+        tp_threshold = float(config.get('zscore_tp', 0.5))
+        if abs(current_z) <= tp_threshold:
+            print(f"[Monitor] TP {sym_a}/{sym_b}: z={current_z:.3f} reached {tp_threshold}")
+            self._request_close(group_id, 'take_profit')
+            return
+
+        # ── Beta drift warning ──
+        if entry_beta > 0 and current_beta > 0:
+            drift_pct = abs(current_beta - entry_beta) / entry_beta * 100
+            if drift_pct > beta_drift_max:
+                print(f"[Monitor] WARNING beta drift {sym_a}/{sym_b}: entry={entry_beta:.3f} current={current_beta:.3f} drift={drift_pct:.1f}%")
+
+    # ─────────────────────────────────────────────────────
+    # Close supervision
+    # ─────────────────────────────────────────────────────
+
+    def _request_close(self, group_id: str, reason: str):
+        """Hand a close off to its own task; at most one in flight per group."""
+        task = self._close_tasks.get(group_id)
+        if task is not None and not task.done():
+            return
+        task = asyncio.create_task(self.executor.close_pair(group_id, reason))
+        self._close_tasks[group_id] = task
+        task.add_done_callback(lambda t: self._close_done(group_id, reason, t))
+
+    def _close_done(self, group_id: str, reason: str, task: asyncio.Task):
+        self._close_tasks.pop(group_id, None)
+        if task.cancelled():
+            return
+        err = task.exception()
+        if err is not None:
+            print(f"[Monitor] Close {group_id} ({reason}) crashed: {err}. Will retry next tick.")
+        elif not task.result().get('success'):
+            print(f"[Monitor] Close {group_id} ({reason}) not done: {task.result().get('reason')}")
+
+    async def wait_closes(self, timeout: float = None) -> int:
+        """
+        Wait for all in-flight closes (shutdown / tests), at most `timeout`
+        seconds. Closes still running are left running, never cancelled
+        halfway through a pair; returns how many there are.
+        """
+        if not self._close_tasks:
+            return 0
+        _, pending = await asyncio.wait(list(self._close_tasks.values()), timeout=timeout)
+        return len(pending)
+
+    def _record_tick(self, seconds: float, n_trades: int):
+        ms = seconds * 1000
+        self.tick_ms.append(ms)
+        if n_trades:
+            print(f"[Monitor] Tick {ms:.1f}ms for {n_trades} trades ({len(self._close_tasks)} closes in flight)")
+
+    def tick_stats(self) -> dict:
+        if not self.tick_ms:
+            return {'ticks': 0}
+        ordered = sorted(self.tick_ms)
+        return {
+            'ticks':   len(ordered),
+            'last_ms': round(self.tick_ms[-1], 1),
+            'p50_ms':  round(ordered[len(ordered) // 2], 1),
+            'max_ms':  round(ordered[-1], 1),
+        }
+
+    async def _live_stats(self, group_id: str, sym_a: str, sym_b: str, beta: float):
+        """Rolling stats for a trade, (re)seeded from daily closes when new or the daily beta moved."""
+        live = self._live.get(group_id)
+        if live is not None and live.beta == beta:
+            return live
+        if beta <= 0:
+            return None
+        panel = column_store.panel([sym_a, sym_b], '1d', 180)
+        if not panel.present.any(axis=0).all():
+            panel = await self.db.get_price_panel([sym_a, sym_b], 180)   # store not synced yet
+        days, closes_a, closes_b = panel.aligned(sym_a, sym_b)
+        try:
+            live = RollingPairStats(closes_a, closes_b, beta, day=days[-1].item() if len(days) else None)
+        except ValueError:
+            return None
+        self._live[group_id] = live
+        return live
+
+    async def _estimate_pnl(self, trade: dict, price_a: float = None, price_b: float = None) -> float:
         try:
-            price_a = await self.exchange.get_mark_price(trade['symbol_a']) or 0
-            price_b = await self.exchange.get_mark_price(trade['symbol_b']) or 0
+            if price_a is None or price_b is None:
+                prices  = await self.exchange.get_prices([trade['symbol_a'], trade['symbol_b']])
+                price_a = prices[trade['symbol_a']]
+                price_b = prices[trade['symbol_b']]
+            price_a = price_a or 0
+            price_b = price_b or 0
             entry_a = float(trade.get('leg_a_entry_price') or 0)
             entry_b = float(trade.get('leg_b_entry_price') or 0)
             size_a  = float(trade.get('leg_a_size_usd') or 0)
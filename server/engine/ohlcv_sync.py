@@ -0,0 +1,71 @@
+import asyncio
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List
+
+from .exchange import BinanceClient
+from .models import DBManager
+
+
+class OHLCVSync:
+    """
+    Keeps ohlcv_daily current with delta fetches instead of full reloads.
+
+    Per symbol, using the stored coverage of the lookback window:
+      - no rows, or short history not yet backfilled -> one full `days` fetch
+      - otherwise -> fetch from the last stored day (the bar that may still
+        have been forming) or from the start of the earliest gap, whichever
+        is older, up to now
+    The forming bar is refreshed at most every `refresh_sec` per symbol.
+    A gap is fetched once; if the exchange has no bars for it (delisting,
+    venue outage) it stays unfilled and later syncs go back to tail fetches.
+    """
+
+    def __init__(self, exchange: BinanceClient, days: int = 180, min_rows: int = 144):
+        self.exchange = exchange
+        self.db = DBManager()
+        self.days = days
+        self.min_rows = min_rows
+        self._synced_at: Dict[str, float] = {}
+        self._backfilled = set()
+        self._gap_tried: Dict[str, date] = {}   # symbol -> gap start already fetched once
+
+    async def sync(self, symbols: List[str], refresh_sec: float = 300) -> Dict[str, int]:
+        today  = datetime.now(timezone.utc).date()
+        start  = today - timedelta(days=self.days)
+        state  = await self.db.get_ohlcv_sync_state(symbols, start)
+        now    = time.time()
+
+        full, since = [], {}
+        for sym in symbols:
+            st = state.get(sym)
+            if st is None or (st['rows'] < self.min_rows and sym not in self._backfilled):
+                full.append(sym)
+                continue
+            gap_from = st['gap_from']
+            if gap_from is not None and self._gap_tried.get(sym) == gap_from:
+                gap_from = None                      # already fetched once, the exchange has nothing for it
+            if gap_from is None and st['last_ts'] >= today and now - self._synced_at.get(sym, 0) < refresh_sec:
+                continue
+            from_day = min(gap_from, st['last_ts']) if gap_from else st['last_ts']
+            since[sym] = int(datetime(from_day.year, from_day.month, from_day.day, tzinfo=timezone.utc).timestamp() * 1000)
+
+        if full:
+            print(f"[OHLCVSync] Full fetch for {len(full)} coins: {full}")
+        fetched = await self.exchange.fetch_ohlcv_many(full + list(since), self.days, since)
+        await asyncio.gather(*(self.db.save_ohlcv_bulk(s, rows) for s, rows in fetched.items()))
+
+        for sym in fetched:
+            self._synced_at[sym] = now
+            gap = state[sym]['gap_from'] if sym in state else None
+            if gap is not None:
+                self._gap_tried[sym] = gap
+            if sym in full:
+                self._backfilled.add(sym)
+
+        return {
+            'full':    len([s for s in full if s in fetched]),
+            'tail':    len([s for s in since if s in fetched]),
+            'skipped': len(symbols) - len(full) - len(since),
+            'failed':  len(full) + len(since) - len(fetched),
+        }
@@ -0,0 +1,315 @@
+"""
+Config optimizer over the walk-forward backtester.
+
+    python -m engine.optimizer --method halving --n 729 --days 730 --workers 8
+
+Searches the entry / exit / filter thresholds in SEARCH_SPACE with a grid,
+random or successive-halving search. None of those keys changes the pair
+statistics, so rolling_pair_stats runs once per job (split across the
+compute pool) and is shared with the workers as memory-mapped .npy files;
+each candidate config is then only a threshold pass plus the day loop.
+
+Successive halving scores every sampled config on the most recent
+sim_days / eta^k days, keeps the best 1/eta, and repeats on eta times more
+history until the survivors run on the full period.
+
+The ranked leaderboard is stored in optimizer_runs and served at
+/api/optimizer/leaderboard. Config values are never changed; each searched
+key gets backtest_rank / backtest_total (where the live settings place among
+the full-history results) and last_optimized.
+
+The pair list is fixed for a job (every pair of the `--universe` most traded
+symbols), unlike the live scanner which re-picks candidates every scan.
+"""
+import os
+import json
+import math
+import time
+import random
+import shutil
+import asyncio
+import argparse
+import itertools
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .backtest import load_panel, precompute, run_backtest
+from .compute import CHUNK_PAIRS, get_compute_pool
+from .price_panel import PricePanel
+
+SEARCH_SPACE: Dict[str, Tuple[float, ...]] = {
+    'zscore_entry':  (1.5, 1.75, 2.0, 2.25, 2.5, 2.75),
+    'zscore_tp':     (0.0, 0.25, 0.5, 0.75, 1.0),
+    'zscore_sl':     (2.75, 3.0, 3.25, 3.5, 4.0, 4.5),
+    'safe_buffer':   (0.25, 0.5, 0.75, 1.0),
+    'corr_min':      (0.5, 0.6, 0.7, 0.8, 0.9),
+    'half_life_min': (1, 2, 3, 5, 7),
+    'half_life_max': (15, 20, 30, 45),
+    'pvalue_max':    (0.01, 0.05, 0.1),
+}
+
+METRICS = ('sharpe', 'total_pnl')
+METHODS = ('grid', 'random', 'halving')
+LEADERBOARD_SIZE = 50
+TASK_CONFIGS = 4              # configs per pool task
+STAT_FIELDS = ('corr', 'beta', 'half_life', 'hurst', 'zscore', 'pvalue', 'z_now', 'corr_now')
+
+
+def is_valid(params: Dict[str, float]) -> bool:
+    """Ordered thresholds: tp < entry < safe_max (sl - buffer), half_life_min < half_life_max."""
+    return (params['zscore_tp'] < params['zscore_entry'] < params['zscore_sl'] - params['safe_buffer']
+            and params['half_life_min'] < params['half_life_max'])
+
+
+def grid_configs(space: Dict[str, Sequence[float]], base: Dict[str, float]) -> List[Dict[str, float]]:
+    keys = list(space)
+    out = []
+    for values in itertools.product(*space.values()):
+        params = {**base, **dict(zip(keys, values))}
+        if is_valid(params):
+            out.append(dict(zip(keys, values)))
+    return out
+
+
+def random_configs(space: Dict[str, Sequence[float]], base: Dict[str, float], n: int, seed: int = 0) -> List[Dict[str, float]]:
+    """Up to n distinct valid points of the grid, drawn uniformly."""
+    rng = random.Random(seed)
+    keys = list(space)
+    total = math.prod(len(v) for v in space.values())
+    if n >= total:
+        configs = grid_configs(space, base)
+        rng.shuffle(configs)
+        return configs
+    seen, out = set(), []
+    for _ in range(n * 50):
+        values = tuple(rng.choice(space[k]) for k in keys)
+        if values in seen:
+            continue
+        seen.add(values)
+        if is_valid({**base, **dict(zip(keys, values))}):
+            out.append(dict(zip(keys, values)))
+            if len(out) == n:
+                break
+    return out
+
+
+def score(summary: Dict[str, Any], metric: str, min_trades: int) -> float:
+    return float(summary[metric]) if summary['total_trades'] >= min_trades else -math.inf
+
+
+# ─────────────────────────────────────────────────────
+# Shared arrays (parent writes, pool workers map read-only)
+# ─────────────────────────────────────────────────────
+
+_shared: Dict[str, tuple] = {}
+
+
+def _npy(path: str, name: str) -> str:
+    return os.path.join(path, f"{name}.npy")
+
+
+def _load_shared(path: str):
+    """(panel, pairs, stats, lookback) for one job directory, mapped once per worker."""
+    hit = _shared.get(path)
+    if hit is None:
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        closes = np.load(_npy(path, 'closes'), mmap_mode='r')
+        days = np.load(_npy(path, 'days'))
+        panel = PricePanel(days, meta['symbols'], closes, np.full(closes.shape, np.nan), np.isfinite(closes))
+        pairs = (np.load(_npy(path, 'idx_a')), np.load(_npy(path, 'idx_b')))
+        stats = {k: np.load(_npy(path, k), mmap_mode='r') for k in STAT_FIELDS}
+        hit = _shared[path] = (panel, pairs, stats, meta['lookback'])
+    return hit
+
+
+def precompute_chunk(path: str, lo: int, hi: int):
+    """Worker entry point: rolling stats for pairs [lo, hi), written into the shared files."""
+    closes = np.load(_npy(path, 'closes'), mmap_mode='r')
+    idx_a, idx_b = np.load(_npy(path, 'idx_a')), np.load(_npy(path, 'idx_b'))
+    with open(os.path.join(path, 'meta.json')) as f:
+        lookback = json.load(f)['lookback']
+    stats = precompute(np.asarray(closes), (idx_a[lo:hi], idx_b[lo:hi]), lookback)
+    for k in STAT_FIELDS:
+        out = np.load(_npy(path, k), mmap_mode='r+')
+        out[:, lo:hi] = stats[k]
+        out.flush()
+
+
+def evaluate_chunk(path: str, configs: List[Dict[str, float]], base: Dict[str, Any], start: int) -> List[Dict[str, Any]]:
+    """Worker entry point: backtest summaries for a few configs from day `start` on."""
+    panel, pairs, stats, lookback = _load_shared(path)
+    return [run_backtest(panel, {**base, **c}, pairs, lookback, start, stats).summary for c in configs]
+
+
+# ─────────────────────────────────────────────────────
+# Search
+# ─────────────────────────────────────────────────────
+
+class Optimizer:
+    def __init__(self, panel: PricePanel, config: Dict[str, Any], lookback: int = 180, workers: int = 0,
+                 pairs: Optional[Tuple[np.ndarray, np.ndarray]] = None):
+        self.panel = panel
+        self.config = dict(config)
+        self.lookback = lookback
+        self.workers = workers
+        self.pairs = pairs if pairs is not None else np.triu_indices(len(panel.symbols), k=1)
+        self.path: Optional[str] = None
+        self.evaluated = 0
+
+    @property
+    def sim_days(self) -> int:
+        return max(len(self.panel) - self.lookback + 1, 0)
+
+    async def prepare(self):
+        """Write prices to a job directory and fill the rolling stats across the pool."""
+        self.path = tempfile.mkdtemp(prefix='optimizer-')
+        closes = np.ascontiguousarray(self.panel.closes)
+        np.save(_npy(self.path, 'closes'), closes)
+        np.save(_npy(self.path, 'days'), self.panel.days)
+        np.save(_npy(self.path, 'idx_a'), np.asarray(self.pairs[0], dtype=np.intp))
+        np.save(_npy(self.path, 'idx_b'), np.asarray(self.pairs[1], dtype=np.intp))
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump({'symbols': self.panel.symbols, 'lookback': self.lookback}, f)
+        n_pairs = len(self.pairs[0])
+        for k in STAT_FIELDS:
+            np.lib.format.open_memmap(_npy(self.path, k), mode='w+', dtype=np.float64,
+                                      shape=(closes.shape[0], n_pairs)).flush()
+        loop = asyncio.get_running_loop()
+        pool = get_compute_pool(self.workers)
+        await asyncio.gather(*(
+            loop.run_in_executor(pool, precompute_chunk, self.path, lo, min(lo + CHUNK_PAIRS, n_pairs))
+            for lo in range(0, n_pairs, CHUNK_PAIRS)
+        ))
+
+    def cleanup(self):
+        if self.path:
+            shutil.rmtree(self.path, ignore_errors=True)
+            _shared.pop(self.path, None)
+            self.path = None
+
+    async def evaluate(self, configs: List[Dict[str, float]], days: int) -> List[Dict[str, Any]]:
+        """Summaries for each config over the most recent `days` simulated days."""
+        loop = asyncio.get_running_loop()
+        pool = get_compute_pool(self.workers)
+        start = len(self.panel) - days
+        base = {k: v for k, v in self.config.items() if isinstance(v, (int, float))}
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(pool, evaluate_chunk, self.path, configs[i:i + TASK_CONFIGS], base, start)
+            for i in range(0, len(configs), TASK_CONFIGS)
+        ))
+        self.evaluated += len(configs)
+        return [s for chunk in chunks for s in chunk]
+
+    async def search(self, method: str, keys: Sequence[str], n: int = 200, metric: str = 'sharpe',
+                     min_trades: int = 20, eta: int = 3, min_days: int = 60, seed: int = 0) -> Dict[str, Any]:
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {', '.join(METHODS)}")
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+        space = {k: SEARCH_SPACE[k] for k in keys}
+        base = {k: float(self.config.get(k, SEARCH_SPACE[k][0])) for k in SEARCH_SPACE}
+        live = {k: base[k] for k in keys}
+        full = self.sim_days
+
+        if method == 'grid':
+            configs = grid_configs(space, base)
+        else:
+            configs = random_configs(space, base, n, seed)
+        rungs = [full]
+        if method == 'halving':
+            while rungs[0] // eta >= min_days and len(configs) // eta ** len(rungs) >= 1:
+                rungs.insert(0, rungs[0] // eta)
+
+        for days in rungs:
+            if days == full and live not in configs:
+                configs.append(live)
+            summaries = await self.evaluate(configs, days)
+            need = max(1, round(min_trades * days / full))
+            scored = sorted(
+                zip(configs, summaries),
+                key=lambda cs: (score(cs[1], metric, need), cs[1]['total_pnl']),
+                reverse=True,
+            )
+            print(f"[Optimizer] {len(configs)} configs on {days}d, best {metric}="
+                  f"{scored[0][1][metric] if scored else '-'}")
+            if days != full:
+                configs = [c for c, _ in scored[:max(1, len(scored) // eta)]]
+
+        board = []
+        for rank, (c, s) in enumerate(scored, start=1):
+            sc = score(s, metric, min_trades)
+            board.append({'rank': rank, 'score': sc if math.isfinite(sc) else None,
+                          'params': c, 'summary': s, 'live': c == live})
+        live_entry = next(e for e in board if e['live'])
+        return {
+            'method': method,
+            'metric': metric,
+            'keys': list(keys),
+            'days': full,
+            'pairs': len(self.pairs[0]),
+            'evaluated': self.evaluated,
+            'total': len(board),
+            'live_rank': live_entry['rank'],
+            'live': live_entry,
+            'leaderboard': board[:LEADERBOARD_SIZE],
+        }
+
+
+def top_symbols(panel: PricePanel, n: int) -> List[str]:
+    """The n symbols with the highest mean daily volume over the panel."""
+    with np.errstate(invalid='ignore'):
+        vol = np.nan_to_num(np.nanmean(np.where(panel.present, panel.volumes, np.nan), axis=0))
+    order = np.argsort(-vol, kind='stable')[:n]
+    return [panel.symbols[k] for k in sorted(order)]
+
+
+async def _main(args):
+    from .models import DBManager
+    db = DBManager()
+    started = datetime.now(timezone.utc)
+    symbols = [s.strip().upper() for s in args.symbols.split(',')] if args.symbols else None
+    panel = await load_panel(db, symbols, args.days + args.lookback - 1)
+    if symbols is None and args.universe:
+        panel = await load_panel(db, top_symbols(panel, args.universe), args.days + args.lookback - 1)
+    config = await db.get_all_config()
+    keys = [k.strip() for k in args.keys.split(',')] if args.keys else list(SEARCH_SPACE)
+
+    opt = Optimizer(panel, config, lookback=args.lookback, workers=args.workers)
+    t0 = time.time()
+    try:
+        await opt.prepare()
+        print(f"[Optimizer] Stats for {len(opt.pairs[0])} pairs x {opt.sim_days} days in {time.time() - t0:.1f}s")
+        run = await opt.search(args.method, keys, n=args.n, metric=args.metric,
+                               min_trades=args.min_trades, eta=args.eta, seed=args.seed)
+    finally:
+        opt.cleanup()
+
+    run['started_at'] = started
+    run_id = await db.save_optimizer_run(run)
+    await db.set_backtest_rank(keys, run['live_rank'], run['total'])
+    print(f"[Optimizer] Run {run_id}: {run['evaluated']} backtests in {time.time() - t0:.0f}s, "
+          f"live config ranks {run['live_rank']}/{run['total']}")
+    for e in run['leaderboard'][:10]:
+        print(f"  #{e['rank']:<3} {run['metric']}={e['summary'][run['metric']]:<10} "
+              f"trades={e['summary']['total_trades']:<5} {e['params']}{'  (live)' if e['live'] else ''}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Backtest-driven config search")
+    parser.add_argument('--method', choices=METHODS, default='halving')
+    parser.add_argument('--n', type=int, default=729, help='configs sampled (random / halving)')
+    parser.add_argument('--metric', choices=METRICS, default='sharpe')
+    parser.add_argument('--keys', default='', help=f"comma list, default all of: {','.join(SEARCH_SPACE)}")
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--lookback', type=int, default=180)
+    parser.add_argument('--symbols', default='')
+    parser.add_argument('--universe', type=int, default=60, help='most traded symbols when --symbols is not given')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--min-trades', dest='min_trades', type=int, default=20)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(_main(parser.parse_args()))
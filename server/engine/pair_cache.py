@@ -0,0 +1,61 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .stats import PairStatsBatch
+
+# Statistics that depend only on completed daily history (z-score is re-evaluated every scan)
+CACHED_FIELDS = ('corr', 'beta', 'half_life', 'hurst', 'pvalue')
+
+
+class PairStatsCache:
+    """
+    Memoized daily pair statistics.
+
+    An entry is keyed on (symbol_a, symbol_b) and tagged with the data version
+    it was computed from: each leg's last candle day and history length, plus
+    the lookback. A new daily candle, a backfilled gap or a lookback change
+    therefore misses and the pair is recomputed; otherwise the stored
+    corr / beta / half-life / Hurst / ADF p-value are reused as-is.
+    Thresholds (corr_min, pvalue_max, zones...) are applied after the cache,
+    so config changes take effect on the next scan without eviction.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Tuple[tuple, tuple]] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    @staticmethod
+    def versions(last_days: List, lengths: np.ndarray, lookback: int) -> List[tuple]:
+        """Per-symbol data version, aligned with the price matrix columns."""
+        return [(d, int(n), lookback) for d, n in zip(last_days, lengths)]
+
+    def lookup(
+        self, symbols: List[str], versions: List[tuple], idx_a: np.ndarray, idx_b: np.ndarray,
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Return (miss mask, cached field arrays with NaN on misses)."""
+        n = len(idx_a)
+        miss = np.ones(n, dtype=bool)
+        values = np.full((n, len(CACHED_FIELDS)), np.nan)
+        for k, (i, j) in enumerate(zip(idx_a.tolist(), idx_b.tolist())):
+            hit = self._entries.get((symbols[i], symbols[j]))
+            if hit is not None and hit[0] == (versions[i], versions[j]):
+                miss[k] = False
+                values[k] = hit[1]
+        return miss, {f: values[:, c] for c, f in enumerate(CACHED_FIELDS)}
+
+    def store(self, symbols: List[str], versions: List[tuple], batch: PairStatsBatch):
+        cols = np.column_stack([getattr(batch, f) for f in CACHED_FIELDS])
+        for k, (i, j) in enumerate(zip(batch.idx_a.tolist(), batch.idx_b.tolist())):
+            self._entries[(symbols[i], symbols[j])] = ((versions[i], versions[j]), tuple(cols[k].tolist()))
+
+    def retain(self, symbols: List[str], idx_a: np.ndarray, idx_b: np.ndarray):
+        """Drop entries for pairs that left the universe."""
+        keep = {(symbols[i], symbols[j]) for i, j in zip(idx_a.tolist(), idx_b.tolist())}
+        for key in [k for k in self._entries if k not in keep]:
+            del self._entries[key]
@@ -0,0 +1,147 @@
+import json
+import base64
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+# Fields returned by /api/pairs, same as the old `SELECT ... FROM pairs`
+PAIR_FIELDS = (
+    'symbol_a', 'symbol_b', 'correlation', 'hurst_exp', 'half_life',
+    'hedge_ratio', 'zscore', 'zone', 'qualified', 'scanned_at',
+    'cointegration_pvalue', 'validation_json',
+)
+
+# sort name -> row key (None sorts last in either direction)
+SORT_KEYS = {
+    'zscore':      lambda r: abs(r['zscore']) if r['zscore'] is not None else None,
+    'correlation': lambda r: r['correlation'],
+    'half_life':   lambda r: r['half_life'],
+    'hurst':       lambda r: r['hurst_exp'],
+    'pvalue':      lambda r: r['cointegration_pvalue'],
+    'symbol':      lambda r: (r['symbol_a'], r['symbol_b']),
+}
+
+
+class CursorExpired(Exception):
+    """The cursor belongs to an older scan; the client should restart from page one."""
+
+
+class _ResultSet(NamedTuple):
+    scan_id: int
+    rows: Tuple[Dict[str, Any], ...]     # default order: qualified first, then |z| desc
+
+
+def _default_order(row) -> tuple:
+    z = row['zscore']
+    return (0 if row['qualified'] else 1, -abs(z) if z is not None else 0.0)
+
+
+class PairResults:
+    """
+    In-memory copy of the latest scan's pairs, served by GET /api/pairs.
+
+    The scanner replaces the whole set after each scan in a single reference
+    assignment, so a request always reads one consistent scan and repeat
+    polls never touch Postgres. Until the first scan of this process it is
+    loaded once from the `pairs` table. Queries filter and sort the
+    immutable rows; cursors are (scan_id, offset) so they stay valid for the
+    lifetime of one scan and are rejected once it is replaced.
+    """
+
+    def __init__(self):
+        self._set = _ResultSet(0, ())
+        self.loaded = False
+
+    @property
+    def scan_id(self) -> int:
+        return self._set.scan_id
+
+    def replace(self, rows: Iterable[Mapping], scan_id: int, scanned_at: Optional[datetime] = None):
+        scanned_at = scanned_at or datetime.now(timezone.utc)
+        normalized = []
+        for r in rows:
+            row = {f: r.get(f) for f in PAIR_FIELDS}
+            if row['scanned_at'] is None:
+                row['scanned_at'] = scanned_at
+            if isinstance(row['validation_json'], str):
+                row['validation_json'] = json.loads(row['validation_json'])
+            for f in ('correlation', 'hurst_exp', 'half_life', 'hedge_ratio', 'zscore', 'cointegration_pvalue'):
+                if row[f] is not None:
+                    row[f] = float(row[f])
+            normalized.append(row)
+        normalized.sort(key=_default_order)
+        self._set = _ResultSet(int(scan_id), tuple(normalized))
+        self.loaded = True
+
+    # ─────────────────────────────────────────────────────
+    # Queries
+    # ─────────────────────────────────────────────────────
+
+    def etag(self, params: Mapping) -> str:
+        """Strong ETag for one scan + one query (filters, sort and page)."""
+        key = json.dumps(sorted((k, v) for k, v in params.items() if v is not None), default=str)
+        return f'"{self.scan_id}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"'
+
+    def query(
+        self,
+        zone: Optional[str] = None,
+        qualified: Optional[bool] = None,
+        symbol: Optional[str] = None,
+        min_corr: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: str = 'desc',
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+        """Returns (page, next_cursor, total matching). Raises CursorExpired / ValueError."""
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be positive")
+        result = self._set
+        rows: Iterable[Dict[str, Any]] = result.rows
+        if zone is not None:
+            zones = {z.strip() for z in zone.split(',')}
+            rows = [r for r in rows if r['zone'] in zones]
+        if qualified is not None:
+            rows = [r for r in rows if bool(r['qualified']) == qualified]
+        if symbol is not None:
+            symbol = symbol.upper()
+            rows = [r for r in rows if symbol in (r['symbol_a'], r['symbol_b'])]
+        if min_corr is not None:
+            rows = [r for r in rows if r['correlation'] is not None and r['correlation'] >= min_corr]
+        rows = list(rows)
+
+        if sort is not None:
+            if sort not in SORT_KEYS:
+                raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+            key = SORT_KEYS[sort]
+            present = [r for r in rows if key(r) is not None]
+            present.sort(key=key, reverse=(order == 'desc'))
+            rows = present + [r for r in rows if key(r) is None]
+
+        offset = self._decode_cursor(cursor, result.scan_id) if cursor else 0
+        if limit is None:
+            return rows[offset:], None, len(rows)
+        page = rows[offset:offset + limit]
+        next_offset = offset + limit
+        next_cursor = self._encode_cursor(result.scan_id, next_offset) if next_offset < len(rows) else None
+        return page, next_cursor, len(rows)
+
+    @staticmethod
+    def _encode_cursor(scan_id: int, offset: int) -> str:
+        return base64.urlsafe_b64encode(f"{scan_id}:{offset}".encode()).decode().rstrip('=')
+
+    @staticmethod
+    def _decode_cursor(cursor: str, scan_id: int) -> int:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            cursor_scan, offset = (int(x) for x in raw.split(':'))
+        except Exception:
+            raise ValueError("invalid cursor")
+        if cursor_scan != scan_id:
+            raise CursorExpired(f"cursor is for scan {cursor_scan}, current scan is {scan_id}")
+        return offset
+
+
+pair_results = PairResults()
@@ -0,0 +1,551 @@
+"""
+In-process simulated Binance USDT-M venue for paper trading and load tests.
+
+    EXCHANGE_MODE=paper                        # live public prices, simulated account
+    EXCHANGE_MODE=paper PAPER_REPLAY=1h        # replay the column store's 1h bars
+
+or in-process:
+
+    venue = PaperVenue(ReplayMarket.from_store(column_store, '1h'), balance=50_000)
+    client.attach_venue(venue)
+
+PaperVenue is ccxt-shaped (the calls BinanceClient makes), so every live
+BinanceClient code path runs against it: positions are held per coin,
+reduce-only closes clip at the held size, get_position / get_all_positions
+see real state, and post-close verification, reconciliation and the
+exchange dedup layer are exercised. Orders are priced off the source's
+mark at the moment they reach the venue, then moved by a spread +
+square-root impact slippage model; every call pays a sampled round-trip
+latency and is charged against Binance's request-weight and order-count
+windows. Public market data comes from `source`: a keyless ccxt client
+(live prices) or a ReplayMarket walking recorded bars forward in time.
+No funding is settled on paper positions.
+"""
+import os
+import math
+import time
+import random
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import ccxt.async_support as ccxt
+
+from .column_store import TIMEFRAMES
+
+FUNDING_INTERVAL_MS = 8 * 3600 * 1000
+TAKER_FEE = 0.0004
+
+# USDT-M request weights for the calls BinanceClient makes (fapi docs)
+WEIGHTS = {
+    'load_markets': 1, 'fetch_tickers': 40, 'fetch_ticker': 1, 'fetch_ohlcv': 5,
+    'fetch_funding_rates': 10, 'fetch_funding_rate_history': 1, 'fetch_balance': 5,
+    'create_market_order': 1, 'fetch_positions': 5,
+}
+
+
+def _pair(coin: str) -> str:
+    return f"{coin}/USDT:USDT"
+
+
+def _coin(symbol: str) -> str:
+    return symbol.split('/')[0]
+
+
+# ─────────────────────────────────────────────────────
+# Models
+# ─────────────────────────────────────────────────────
+
+class LatencyModel:
+    """Round trip = base + lognormal jitter, with an occasional tail spike."""
+
+    def __init__(self, base_ms: float = 20.0, jitter_ms: float = 10.0, tail_prob: float = 0.01,
+                 tail_ms: float = 400.0, seed: Optional[int] = None):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self.tail_prob = tail_prob
+        self.tail_ms = tail_ms
+        self._rng = random.Random(seed)
+
+    def sample(self) -> float:
+        """One round trip in seconds."""
+        ms = self.base_ms
+        if self.jitter_ms > 0:
+            ms += self.jitter_ms * self._rng.lognormvariate(0.0, 0.5)
+        if self.tail_prob > 0 and self._rng.random() < self.tail_prob:
+            ms += self.tail_ms * self._rng.random()
+        return max(ms, 0.0) / 1000
+
+
+class SlippageModel:
+    """
+    Taker fills cross half the spread plus square-root market impact:
+    impact_bps = impact * sqrt(notional / 24h quote volume) * 1e4.
+    """
+
+    def __init__(self, spread_bps: float = 2.0, impact: float = 0.1, default_adv: float = 5e7):
+        self.spread_bps = spread_bps
+        self.impact = impact
+        self.default_adv = default_adv
+
+    def bps(self, notional: float, adv: Optional[float]) -> float:
+        adv = adv if adv and adv > 0 else self.default_adv
+        return self.spread_bps / 2 + self.impact * math.sqrt(max(notional, 0.0) / adv) * 1e4
+
+    def fill_price(self, mark: float, side: str, notional: float, adv: Optional[float]) -> float:
+        move = self.bps(notional, adv) / 1e4
+        return mark * (1 + move) if side == 'buy' else mark * (1 - move)
+
+
+class RateLimits:
+    """
+    Binance USDT-M fixed windows: request weight per minute, orders per 10s
+    and per minute. Over the limit the call waits for the next window
+    (`throttle`, what ccxt's enableRateLimit gives the real client) or is
+    rejected with ccxt.RateLimitExceeded, as a 429 would be.
+    """
+
+    def __init__(self, weight_per_min: int = 2400, orders_per_10s: int = 300, orders_per_min: int = 1200,
+                 throttle: bool = True, clock: Callable[[], float] = time.time):
+        self.limits = {'weight': (60.0, weight_per_min), 'orders_10s': (10.0, orders_per_10s),
+                       'orders_1m': (60.0, orders_per_min)}
+        self.throttle = throttle
+        self.clock = clock
+        self._used: Dict[str, Tuple[int, int]] = {}      # limit -> (window index, used)
+        self.rejected = 0
+        self.waited_sec = 0.0
+
+    def _blocked(self, cost: Dict[str, int]) -> float:
+        """Seconds until every limit in `cost` has room (0 = now), charging it when it fits."""
+        now = self.clock()
+        wait = 0.0
+        for name, n in cost.items():
+            window, cap = self.limits[name]
+            idx = int(now // window)
+            at, used = self._used.get(name, (idx, 0))
+            if at != idx:
+                used = 0
+            if used + n > cap:
+                wait = max(wait, (idx + 1) * window - now)
+        if wait == 0.0:
+            for name, n in cost.items():
+                window, _ = self.limits[name]
+                idx = int(now // window)
+                at, used = self._used.get(name, (idx, 0))
+                self._used[name] = (idx, (used if at == idx else 0) + n)
+        return wait
+
+    async def acquire(self, weight: int, orders: int = 0):
+        cost = {'weight': weight}
+        if orders:
+            cost.update(orders_10s=orders, orders_1m=orders)
+        while True:
+            wait = self._blocked(cost)
+            if wait == 0.0:
+                return
+            if not self.throttle:
+                self.rejected += 1
+                raise ccxt.RateLimitExceeded(f"paper venue: rate limit exceeded, retry in {wait:.1f}s")
+            self.waited_sec += wait
+            await asyncio.sleep(wait)
+
+
+# ─────────────────────────────────────────────────────
+# Recorded price replay
+# ─────────────────────────────────────────────────────
+
+class ReplayMarket:
+    """
+    ccxt-shaped public market data replaying recorded bars. Replay time
+    starts at `start_ms` (default: halfway through the recording, so the
+    first half serves as history) and advances `speed` times faster than
+    the wall clock; prices are interpolated between bar closes and hold
+    the last close once the recording runs out. fetch_ohlcv only returns
+    bars that have closed by replay time. With `rebase` the recording is
+    shifted (by whole bars) so the replay starts now, keeping the engine's
+    wall-clock `since` windows and day boundaries meaningful.
+    """
+    replaying = True
+
+    def __init__(
+        self, paths: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]], timeframe: str = '1h',
+        start_ms: Optional[int] = None, speed: float = 60.0, funding_rate: float = 0.0001,
+        rebase: bool = True, clock: Callable[[], float] = time.time,
+    ):
+        paths = {c: p for c, p in paths.items() if len(p[0]) >= 2}
+        if not paths:
+            raise ValueError("replay needs at least one symbol with two or more bars")
+        self.timeframe = timeframe
+        self.bar_ms = TIMEFRAMES[timeframe]
+        first = min(int(ts[0]) for ts, _, _ in paths.values())
+        last = max(int(ts[-1]) for ts, _, _ in paths.values())
+        start = start_ms if start_ms is not None else first + (last - first) // 2
+        self._t0 = clock()
+        shift = (int(self._t0 * 1000) - start) // self.bar_ms * self.bar_ms if rebase else 0
+        self.paths = {c: (np.asarray(ts, dtype=np.int64) + shift, close, vol) for c, (ts, close, vol) in paths.items()}
+        self.start_ms = start + shift
+        self.end_ms = last + shift
+        self.speed = speed
+        self.funding_rate = funding_rate
+        self.clock = clock
+
+    @classmethod
+    def from_arrays(cls, symbols: Sequence[str], ts_ms: np.ndarray, closes: np.ndarray,
+                    volumes: np.ndarray, timeframe: str = '1d', **kwargs) -> 'ReplayMarket':
+        """From a (bars x symbols) close / volume grid sharing one timestamp column."""
+        ts = np.asarray(ts_ms, dtype=np.int64)
+        return cls({s: (ts, np.asarray(closes[:, k], dtype=float), np.asarray(volumes[:, k], dtype=float))
+                    for k, s in enumerate(symbols)}, timeframe, **kwargs)
+
+    @classmethod
+    def from_store(cls, store, timeframe: str = '1h', symbols: Optional[Sequence[str]] = None,
+                   limit: Optional[int] = None, **kwargs) -> 'ReplayMarket':
+        """From the column store's bars (every stored symbol for the timeframe by default)."""
+        if symbols is None:
+            tf_dir = store.root / timeframe
+            symbols = sorted(p.name for p in tf_dir.iterdir() if p.is_dir()) if tf_dir.is_dir() else []
+        return cls({s: store.read(timeframe, s, limit) for s in symbols}, timeframe, **kwargs)
+
+    def now_ms(self) -> int:
+        return int(self.start_ms + (self.clock() - self._t0) * 1000 * self.speed)
+
+    @property
+    def finished(self) -> bool:
+        return self.now_ms() >= self.end_ms
+
+    def price(self, coin: str) -> Optional[float]:
+        path = self.paths.get(coin)
+        if path is None:
+            return None
+        ts, close, _ = path
+        return float(np.interp(self.now_ms(), ts, close))
+
+    def quote_volume(self, coin: str) -> float:
+        """Trailing 24h quote volume at replay time."""
+        ts, _, vol = self.paths[coin]
+        end = int(np.searchsorted(ts, self.now_ms(), side='right'))
+        start = max(end - max(86_400_000 // self.bar_ms, 1), 0)
+        return float(vol[start:end].sum()) if end else float(vol[0])
+
+    async def load_markets(self) -> Dict[str, Dict[str, Any]]:
+        markets = {}
+        for c, (_, close, _) in self.paths.items():
+            # lot step worth roughly $1-10 at the recorded starting price, as Binance sizes them
+            step = min(1.0, 10.0 ** math.floor(math.log10(10.0 / max(float(close[0]), 1e-12))))
+            markets[_pair(c)] = {
+                'symbol': _pair(c), 'base': c, 'quote': 'USDT', 'swap': True, 'linear': True, 'active': True,
+                'precision': {'amount': step}, 'limits': {'amount': {'min': step}, 'cost': {'min': 5.0}},
+            }
+        return markets
+
+    async def fetch_tickers(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        coins = [_coin(s) for s in symbols] if symbols else list(self.paths)
+        now = int(time.time() * 1000)
+        out = {}
+        for c in coins:
+            price = self.price(c)
+            if price is not None:
+                out[_pair(c)] = {'symbol': _pair(c), 'timestamp': now, 'last': price, 'mark': price,
+                                 'quoteVolume': self.quote_volume(c)}
+        return out
+
+    async def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        tickers = await self.fetch_tickers([symbol])
+        if symbol not in tickers:
+            raise ccxt.BadSymbol(f"paper venue: unknown symbol {symbol}")
+        return tickers[symbol]
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', since: Optional[int] = None,
+                          limit: Optional[int] = None) -> List[list]:
+        coin = _coin(symbol)
+        if coin not in self.paths:
+            raise ccxt.BadSymbol(f"paper venue: unknown symbol {symbol}")
+        want = TIMEFRAMES[timeframe]
+        if want < self.bar_ms or want % self.bar_ms:
+            raise ccxt.BadRequest(f"paper venue replays {self.timeframe} bars, cannot serve {timeframe}")
+        ts, close, vol = self.paths[coin]
+        end = int(np.searchsorted(ts, self.now_ms() - self.bar_ms, side='right'))   # closed bars only
+        ts, close, vol = ts[:end], close[:end], vol[:end]
+        if want != self.bar_ms:
+            # resample: last close and summed volume per coarser bucket
+            bucket = ts // want * want
+            cut = np.flatnonzero(np.diff(bucket)) + 1
+            starts = np.concatenate(([0], cut)) if len(ts) else np.empty(0, dtype=np.int64)
+            ends = np.concatenate((cut, [len(ts)])) if len(ts) else np.empty(0, dtype=np.int64)
+            ts, close = bucket[starts], close[ends - 1]
+            vol = np.add.reduceat(vol, starts) if len(starts) else vol[:0]
+        at = int(np.searchsorted(ts, since)) if since is not None else (max(len(ts) - limit, 0) if limit else 0)
+        stop = min(at + limit, len(ts)) if (limit and since is not None) else len(ts)
+        return [[int(t), float(c), float(c), float(c), float(c), float(v)]
+                for t, c, v in zip(ts[at:stop], close[at:stop], vol[at:stop])]
+
+    async def fetch_funding_rates(self) -> Dict[str, Dict[str, Any]]:
+        next_ms = (int(time.time() * 1000) // FUNDING_INTERVAL_MS + 1) * FUNDING_INTERVAL_MS
+        return {
+            _pair(c): {'fundingRate': self.funding_rate, 'previousFundingRate': self.funding_rate,
+                       'fundingTimestamp': next_ms}
+            for c in self.paths
+        }
+
+    async def fetch_funding_rate_history(self, symbol: str, since: Optional[int] = None) -> List[Dict[str, Any]]:
+        now = int(time.time() * 1000)
+        start = since if since is not None else now - 3 * FUNDING_INTERVAL_MS
+        first = (start // FUNDING_INTERVAL_MS + 1) * FUNDING_INTERVAL_MS
+        return [{'timestamp': t, 'fundingRate': self.funding_rate} for t in range(first, now, FUNDING_INTERVAL_MS)]
+
+    async def close(self):
+        pass
+
+
+# ─────────────────────────────────────────────────────
+# Venue
+# ─────────────────────────────────────────────────────
+
+class PaperVenue:
+    def __init__(
+        self, source, balance: float = 10_000.0, leverage: float = 10.0, fee_rate: float = TAKER_FEE,
+        latency: Optional[LatencyModel] = None, slippage: Optional[SlippageModel] = None,
+        limits: Optional[RateLimits] = None, mark_ttl: float = 1.0,
+    ):
+        self.source = source
+        self.replaying = bool(getattr(source, 'replaying', False))
+        self.wallet = float(balance)                      # USDT: deposits + realized PnL - fees
+        self.leverage = leverage
+        self.fee_rate = fee_rate
+        self.latency = latency or LatencyModel()
+        self.slippage = slippage or SlippageModel()
+        self.limits = limits or RateLimits()
+        self.mark_ttl = mark_ttl
+        self.positions: Dict[str, Dict[str, float]] = {}  # coin -> {'contracts': signed, 'entry': avg price}
+        self.fills: List[Dict[str, Any]] = []
+        self.calls: Dict[str, int] = {}
+        self.realized_pnl = 0.0
+        self.fees_paid = 0.0
+        self._markets: Optional[Dict[str, Dict[str, Any]]] = None
+        self._marks: Dict[str, Tuple[float, float]] = {}  # coin -> (price, quote volume), live source only
+        self._marks_at = 0.0
+        self._order_seq = 0
+
+    async def _io(self, name: str, orders: int = 0):
+        """Charge the rate limits and sleep out the request leg of a round trip."""
+        self.calls[name] = self.calls.get(name, 0) + 1
+        await self.limits.acquire(WEIGHTS.get(name, 1), orders)
+        await asyncio.sleep(self.latency.sample() / 2)
+
+    async def _respond(self):
+        await asyncio.sleep(self.latency.sample() / 2)
+
+    async def _public(self, name: str, call):
+        # a live source is a real ccxt client with its own network and throttler
+        if not self.replaying:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            return await call()
+        await self._io(name)
+        res = await call()
+        await self._respond()
+        return res
+
+    # ── Market data (passed through to the source) ──
+
+    async def load_markets(self) -> Dict[str, Dict[str, Any]]:
+        if self._markets is None:
+            self._markets = await self._public('load_markets', self.source.load_markets)
+        return self._markets
+
+    async def fetch_tickers(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        return await self._public('fetch_tickers', lambda: self.source.fetch_tickers(symbols))
+
+    async def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        return await self._public('fetch_ticker', lambda: self.source.fetch_ticker(symbol))
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1d', since: Optional[int] = None,
+                          limit: Optional[int] = None) -> List[list]:
+        return await self._public('fetch_ohlcv', lambda: self.source.fetch_ohlcv(symbol, timeframe, since, limit))
+
+    async def fetch_funding_rates(self) -> Dict[str, Dict[str, Any]]:
+        return await self._public('fetch_funding_rates', self.source.fetch_funding_rates)
+
+    async def fetch_funding_rate_history(self, symbol: str, since: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await self._public('fetch_funding_rate_history',
+                                  lambda: self.source.fetch_funding_rate_history(symbol, since))
+
+    async def _mark(self, coin: str) -> Tuple[Optional[float], Optional[float]]:
+        """(price, 24h quote volume) at the moment an order reaches the venue."""
+        if self.replaying:
+            price = self.source.price(coin)
+            return price, (self.source.quote_volume(coin) if price is not None else None)
+        if time.time() - self._marks_at >= self.mark_ttl:
+            tickers = await self.source.fetch_tickers()
+            self._marks = {
+                _coin(s): (float(t.get('last') or t.get('mark') or 0), float(t.get('quoteVolume') or 0))
+                for s, t in tickers.items() if s.endswith('/USDT:USDT')
+            }
+            self._marks_at = time.time()
+        price, adv = self._marks.get(coin, (None, None))
+        return price or None, adv
+
+    # ── Account / orders ──
+
+    def amount_to_precision(self, symbol: str, amount: float) -> str:
+        """Truncate to the market's lot step (load_markets must have run, as with ccxt)."""
+        if self._markets is None:
+            raise ccxt.ExchangeError("paper venue: markets not loaded")
+        market = self._markets.get(symbol)
+        if market is None:
+            raise ccxt.BadSymbol(f"paper venue: unknown symbol {symbol}")
+        step = float(market['precision']['amount'])
+        decimals = max(0, -int(math.floor(math.log10(step)))) if step < 1 else 0
+        return f"{math.floor(amount / step + 1e-9) * step:.{decimals}f}"
+
+    def _equity(self, marks: Dict[str, float]) -> Tuple[float, float]:
+        """(wallet + unrealized PnL, initial margin in use) at the given marks."""
+        upnl = margin = 0.0
+        for coin, pos in self.positions.items():
+            mark = marks.get(coin) or pos['entry']
+            upnl += pos['contracts'] * (mark - pos['entry'])
+            margin += abs(pos['contracts']) * mark / self.leverage
+        return self.wallet + upnl, margin
+
+    async def _marks_for(self, coins) -> Dict[str, float]:
+        out = {}
+        for c in coins:
+            price, _ = await self._mark(c)
+            if price:
+                out[c] = price
+        return out
+
+    async def fetch_balance(self) -> Dict[str, Any]:
+        await self._io('fetch_balance')
+        equity, margin = self._equity(await self._marks_for(list(self.positions)))
+        free = max(equity - margin, 0.0)
+        await self._respond()
+        return {'total': {'USDT': equity}, 'free': {'USDT': free}, 'used': {'USDT': equity - free}}
+
+    async def create_market_order(self, symbol: str, side: str, amount: float, params: Optional[dict] = None) -> Dict[str, Any]:
+        await self._io('create_market_order', orders=1)
+        coin = _coin(symbol)
+        markets = await self.load_markets()
+        market = markets.get(symbol)
+        if market is None:
+            raise ccxt.BadSymbol(f"paper venue: unknown symbol {symbol}")
+        if side not in ('buy', 'sell'):
+            raise ccxt.InvalidOrder(f"paper venue: bad side {side!r}")
+        mark, adv = await self._mark(coin)
+        if not mark:
+            raise ccxt.ExchangeNotAvailable(f"paper venue: no price for {symbol}")
+
+        held = self.positions.get(coin, {}).get('contracts', 0.0)
+        qty = float(amount)
+        reduce_only = bool((params or {}).get('reduceOnly'))
+        if reduce_only:
+            # reduce-only never opens or flips: clip to what is held on the other side
+            closable = -held if (held < 0) == (side == 'buy') else 0.0
+            qty = min(qty, abs(closable))
+            if qty <= 0:
+                raise ccxt.InvalidOrder(f"paper venue: reduce-only {side} {symbol} with no position to reduce")
+        limits = market.get('limits') or {}
+        if qty < float((limits.get('amount') or {}).get('min') or 0) - 1e-12 or qty <= 0:
+            raise ccxt.InvalidOrder(f"paper venue: amount {qty} below lot step for {symbol}")
+        if not reduce_only and qty * mark < float((limits.get('cost') or {}).get('min') or 0):
+            raise ccxt.InvalidOrder(f"paper venue: notional {qty * mark:.2f} below minimum for {symbol}")
+
+        price = self.slippage.fill_price(mark, side, qty * mark, adv)
+        signed = qty if side == 'buy' else -qty
+        if not reduce_only:
+            equity, margin = self._equity(await self._marks_for(list(self.positions)))
+            added = max(abs(held + signed) - abs(held), 0.0) * price / self.leverage
+            if margin + added > equity:
+                raise ccxt.InsufficientFunds(
+                    f"paper venue: margin {margin + added:.2f} exceeds equity {equity:.2f} for {symbol}")
+
+        fee = qty * price * self.fee_rate
+        self._apply_fill(coin, signed, price, fee)
+        self._order_seq += 1
+        now = int(time.time() * 1000)
+        order = {
+            'id': f"paper_{self._order_seq}", 'symbol': symbol, 'type': 'market', 'side': side,
+            'amount': float(amount), 'filled': qty, 'remaining': 0.0, 'status': 'closed',
+            'price': price, 'average': price, 'cost': qty * price, 'reduceOnly': reduce_only,
+            'fee': {'cost': fee, 'currency': 'USDT'}, 'timestamp': now, 'lastTradeTimestamp': now,
+            'info': {'mark': mark, 'slippage_bps': abs(price / mark - 1) * 1e4},
+        }
+        self.fills.append({'symbol': coin, 'side': side, 'qty': qty, 'mark': mark, 'price': price,
+                           'fee': fee, 'timestamp': now})
+        await self._respond()
+        return order
+
+    def _apply_fill(self, coin: str, signed: float, price: float, fee: float):
+        pos = self.positions.get(coin, {'contracts': 0.0, 'entry': price})
+        held = pos['contracts']
+        if held and (held > 0) != (signed > 0):
+            closed = min(abs(signed), abs(held))
+            pnl = closed * (price - pos['entry']) * (1 if held > 0 else -1)
+            self.realized_pnl += pnl
+            self.wallet += pnl
+        new = held + signed
+        if abs(new) < 1e-12:
+            self.positions.pop(coin, None)
+        else:
+            if not held or (held > 0) != (new > 0):
+                entry = price                                        # opened or flipped
+            elif abs(new) > abs(held):
+                entry = (abs(held) * pos['entry'] + abs(signed) * price) / abs(new)   # added
+            else:
+                entry = pos['entry']                                 # reduced
+            self.positions[coin] = {'contracts': new, 'entry': entry}
+        self.wallet -= fee
+        self.fees_paid += fee
+
+    async def fetch_positions(self, symbols: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        await self._io('fetch_positions')
+        coins = [_coin(s) for s in symbols] if symbols else list(self.positions)
+        held = [c for c in coins if c in self.positions]
+        marks = await self._marks_for(held)
+        out = []
+        for c in held:
+            pos = self.positions[c]
+            mark = marks.get(c) or pos['entry']
+            contracts = pos['contracts']
+            out.append({
+                'symbol': _pair(c), 'contracts': abs(contracts), 'contractSize': 1.0,
+                'side': 'long' if contracts > 0 else 'short', 'entryPrice': pos['entry'], 'markPrice': mark,
+                'notional': abs(contracts) * mark, 'unrealizedPnl': contracts * (mark - pos['entry']),
+                'leverage': self.leverage, 'initialMargin': abs(contracts) * mark / self.leverage,
+                'timestamp': int(time.time() * 1000),
+            })
+        await self._respond()
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        slip = [abs(f['price'] / f['mark'] - 1) * 1e4 for f in self.fills]
+        return {
+            'orders':         len(self.fills),
+            'open_positions': len(self.positions),
+            'wallet':         round(self.wallet, 2),
+            'realized_pnl':   round(self.realized_pnl, 2),
+            'fees':           round(self.fees_paid, 2),
+            'avg_slip_bps':   round(float(np.mean(slip)), 2) if slip else None,
+            'rate_limited':   self.limits.rejected,
+            'throttled_sec':  round(self.limits.waited_sec, 2),
+        }
+
+    async def close(self):
+        await self.source.close()
+
+
+def paper_venue_from_env(public_client) -> PaperVenue:
+    """
+    PAPER_REPLAY=<timeframe> replays the column store's bars for that
+    timeframe at PAPER_REPLAY_SPEED (default 60x); otherwise prices come
+    live from `public_client`. PAPER_BALANCE sets the starting USDT.
+    """
+    balance = float(os.getenv('PAPER_BALANCE', '10000'))
+    replay = os.getenv('PAPER_REPLAY', '')
+    if replay:
+        from .column_store import column_store
+        source = ReplayMarket.from_store(column_store, replay, speed=float(os.getenv('PAPER_REPLAY_SPEED', '60')))
+        print(f"[Paper] Replaying {len(source.paths)} symbols of {replay} bars at {source.speed:g}x")
+    else:
+        source = public_client
+        print("[Paper] Simulated account on live public prices")
+    return PaperVenue(source, balance=balance)
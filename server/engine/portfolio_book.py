@@ -0,0 +1,63 @@
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+
+class PortfolioBook:
+    """
+    Authoritative in-memory book of open trades for this process.
+
+    DBManager.get_open_trades loads it once from `trades WHERE status='open'`
+    and then serves every read from it. The DBManager write paths
+    (open_trade, close_trade, update_trade_zscore) and ghost reconciliation
+    keep it in step; reconciliation also reloads it as a periodic
+    consistency check. Readers get an immutable snapshot: a tuple of
+    read-only mappings ordered by opened_at, rebuilt only after a change.
+    """
+
+    def __init__(self):
+        self._trades: Dict[str, dict] = {}
+        self._snapshot: Optional[Tuple[Mapping, ...]] = None
+        self.loaded = False
+        self.version = 0
+
+    def load(self, rows: Iterable[Mapping]):
+        self._trades = {str(r['group_id']): dict(r) for r in rows}
+        self._changed()
+        self.loaded = True
+
+    def snapshot(self) -> Tuple[Mapping, ...]:
+        if self._snapshot is None:
+            ordered = sorted(self._trades.values(), key=lambda t: t['opened_at'])
+            self._snapshot = tuple(MappingProxyType(dict(t)) for t in ordered)
+        return self._snapshot
+
+    def __len__(self):
+        return len(self._trades)
+
+    # ─────────────────────────────────────────────────────
+    # Events
+    # ─────────────────────────────────────────────────────
+
+    def on_open(self, trade: dict):
+        if self.loaded:
+            self._trades[str(trade['group_id'])] = dict(trade)
+            self._changed()
+
+    def on_close(self, group_id: str):
+        if self._trades.pop(str(group_id), None) is not None:
+            self._changed()
+
+    def on_zscore(self, group_id: str, current_zscore: float, monitored_at=None):
+        trade = self._trades.get(str(group_id))
+        if trade is not None:
+            trade['current_zscore'] = current_zscore
+            if monitored_at is not None:
+                trade['last_monitored_at'] = monitored_at
+            self._changed()
+
+    def _changed(self):
+        self._snapshot = None
+        self.version += 1
+
+
+portfolio_book = PortfolioBook()
@@ -0,0 +1,156 @@
+from datetime import date
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class PricePanel:
+    """
+    Date-indexed (days x symbols) daily closes and volumes with a presence mask.
+
+    Rows are the sorted union of candle dates across symbols, newest last;
+    a symbol with no candle on a date has NaN there and present=False, so
+    two legs are only ever compared on the same calendar day. A missing day
+    inside a series stays a hole: the trailing window both legs cover
+    (history_lengths) ends at the newest gap, so a symbol missing the newest
+    date has length 0 unless carry_forward() bridged it.
+
+    The matrices are column-major, so column() returns a contiguous
+    zero-copy view of one symbol and tail()/between() return panels that are
+    views of the same buffers. Built once per scan and handed to every
+    stats consumer (prefilter, batch stats, cache versions, z-scores).
+    """
+
+    def __init__(
+        self, days: Sequence[date], symbols: Sequence[str],
+        closes: np.ndarray, volumes: np.ndarray, present: np.ndarray,
+    ):
+        days = np.asarray(days)
+        self.days    = days if days.dtype.kind == 'M' else days.astype('datetime64[D]')   # intraday panels keep [ms]
+        self.symbols = list(symbols)
+        self.closes  = closes
+        self.volumes = volumes
+        self.present = present
+        self._col    = {s: k for k, s in enumerate(self.symbols)}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping], symbols: Sequence[str], limit: Optional[int] = None) -> 'PricePanel':
+        """Build from (symbol, ts, close, volume) rows in any order; keeps the last `limit` dates."""
+        rows = list(rows)
+        ts   = np.array([r['ts'] for r in rows], dtype='datetime64[D]')
+        days = np.unique(ts)
+        if limit is not None:
+            days = days[-limit:]
+        panel = cls.empty(days, symbols)
+        if not len(days):
+            return panel
+        col  = np.array([panel._col.get(r['symbol'], -1) for r in rows], dtype=np.intp)
+        keep = (col >= 0) & (ts >= days[0])
+        at   = (np.searchsorted(days, ts[keep]), col[keep])
+        panel.closes[at]  = np.array([float(r['close']) for r in rows])[keep]
+        panel.volumes[at] = np.array([float(r['volume'] or 0) for r in rows])[keep]
+        panel.present[at] = True
+        return panel
+
+    @classmethod
+    def empty(cls, days: Sequence[date], symbols: Sequence[str]) -> 'PricePanel':
+        shape = (len(days), len(symbols))
+        return cls(
+            days, symbols,
+            closes=np.full(shape, np.nan, order='F'),
+            volumes=np.full(shape, np.nan, order='F'),
+            present=np.zeros(shape, dtype=bool, order='F'),
+        )
+
+    # ─────────────────────────────────────────────────────
+    # Access
+    # ─────────────────────────────────────────────────────
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.closes.shape
+
+    def __len__(self):
+        return self.closes.shape[0]
+
+    def __contains__(self, symbol: str):
+        return symbol in self._col
+
+    def col(self, symbol: str) -> int:
+        return self._col[symbol]
+
+    def column(self, symbol: str) -> np.ndarray:
+        """Closes of one symbol (view, NaN where absent)."""
+        return self.closes[:, self._col[symbol]]
+
+    def volume(self, symbol: str) -> np.ndarray:
+        return self.volumes[:, self._col[symbol]]
+
+    def tail(self, n: int) -> 'PricePanel':
+        """Last n dates, as views."""
+        return self._rows(slice(max(len(self) - n, 0), None))
+
+    def between(self, start: Optional[date] = None, end: Optional[date] = None) -> 'PricePanel':
+        """Dates in [start, end], as views."""
+        lo = 0 if start is None else int(np.searchsorted(self.days, np.datetime64(start, 'D'), side='left'))
+        hi = len(self) if end is None else int(np.searchsorted(self.days, np.datetime64(end, 'D'), side='right'))
+        return self._rows(slice(lo, hi))
+
+    def _rows(self, rows: slice) -> 'PricePanel':
+        return PricePanel(self.days[rows], self.symbols, self.closes[rows], self.volumes[rows], self.present[rows])
+
+    # ─────────────────────────────────────────────────────
+    # Derived
+    # ─────────────────────────────────────────────────────
+
+    def history_lengths(self) -> np.ndarray:
+        """Trailing run of present dates per symbol."""
+        present = self.present[::-1]
+        return np.where(present.all(axis=0), len(self), present.argmin(axis=0))
+
+    def carry_forward(self, max_days: int) -> Tuple['PricePanel', List[str]]:
+        """
+        Bridge a symbol's missing newest dates (at most `max_days`) with its
+        last close, marked present with zero volume, so one failed fetch does
+        not drop it from every pair. Returns the panel (a copy if anything was
+        filled) and the symbols still missing the newest date.
+        """
+        n = len(self)
+        if not n:
+            return self, []
+        has = self.present.any(axis=0)
+        stale = np.where(has, self.present[::-1].argmax(axis=0), n)
+        bridge = (stale > 0) & (stale <= max_days) & (stale < n)
+        fill = np.nonzero(bridge)[0]
+        dropped = [self.symbols[k] for k in np.nonzero((stale > 0) & ~bridge)[0]]
+        if not len(fill):
+            return self, dropped
+        closes, volumes, present = self.closes.copy(order='F'), self.volumes.copy(order='F'), self.present.copy(order='F')
+        for k in fill:
+            last = n - 1 - stale[k]
+            closes[last + 1:, k] = closes[last, k]
+            volumes[last + 1:, k] = 0.0
+            present[last + 1:, k] = True
+        return PricePanel(self.days, self.symbols, closes, volumes, present), dropped
+
+    def last_days(self) -> List[Optional[date]]:
+        """Newest candle date per symbol (None if it has none)."""
+        has = self.present.any(axis=0)
+        last = len(self) - 1 - self.present[::-1].argmax(axis=0)
+        return [self.days[i].item() if ok else None for i, ok in zip(last, has)]
+
+    def aligned(self, symbol_a: str, symbol_b: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(days, closes_a, closes_b) on the dates both symbols have a candle."""
+        ia, ib = self._col[symbol_a], self._col[symbol_b]
+        both = self.present[:, ia] & self.present[:, ib]
+        if both.all():
+            return self.days, self.closes[:, ia], self.closes[:, ib]
+        return self.days[both], self.closes[both, ia], self.closes[both, ib]
+
+    def to_series(self) -> Dict[str, Tuple[List[date], List[float]]]:
+        """{symbol: (days, closes)} of present candles, oldest first."""
+        out = {}
+        for k, sym in enumerate(self.symbols):
+            mask = self.present[:, k]
+            out[sym] = ([d.item() for d in self.days[mask]], self.closes[mask, k].tolist())
+        return out
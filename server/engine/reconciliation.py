@@ -1,5 +1,6 @@
 import asyncio
 from .models import DBManager, get_pool
+from .portfolio_book import portfolio_book
 from .exchange import BinanceClient
 
 
@@ -18,7 +19,7 @@ class ReconciliationService:
                 db_keys.add(r['symbol_a'])
                 db_keys.add(r['symbol_b'])
 
-            # 2. Exchange open positions
+            # 2. Exchange open positions (PositionUnknown propagates: an unknown book must not reconcile ghosts)
             exch_positions = await self.exchange.get_all_positions()
             exch_keys = set(
                 p['symbol'].split('/')[0]
@@ -47,8 +48,16 @@ class ReconciliationService:
                             "UPDATE trades SET status='closed', exit_reason='ghost_reconciled', closed_at=NOW() WHERE group_id=$1",
                             row['group_id'],
                         )
+                        portfolio_book.on_close(str(row['group_id']))
                         print(f"[RECON] Ghost reconciled: {row['symbol_a']}/{row['symbol_b']}")
 
+            # Periodic consistency check of the in-memory book against the table;
+            # skipped if a trade opened/closed while the query was in flight
+            version = portfolio_book.version
+            rows = await self.db.fetch_open_trades()
+            if portfolio_book.version == version:
+                portfolio_book.load(rows)
+
             await self.db.log_reconciliation(
                 len(db_keys), len(exch_keys), len(orphans),
                 {'orphans': list(orphans), 'ghosts': list(ghosts)},
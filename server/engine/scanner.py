@@ -1,41 +1,40 @@
-import asyncio
 import time
 import json
+import contextlib
+import numpy as np
 from .exchange import BinanceClient
 from .models import DBManager
-from .stats import compute_pair_stats, classify_zone
+from .stats import PairStatsBatch, classify_zone, spread_zscores
+from .compute import CHUNK_PAIRS, stream_pair_stats
+from .pair_cache import CACHED_FIELDS, PairStatsCache
+from .ohlcv_sync import OHLCVSync
+from .pair_results import pair_results
+from .candidates import select_candidates
+from .price_panel import PricePanel
+from .column_store import column_store
 
 class PairsScanner:
     def __init__(self, exchange: BinanceClient):
         self.exchange = exchange
         self.db = DBManager()
+        self.ohlcv_sync = OHLCVSync(exchange)
+        self.stats_cache = PairStatsCache()
+        self.sec_per_pair = 0.0      # measured cost of the full stats stage, for the time budget
 
     async def scan(self):
         start_time = time.time()
         print("[Scan] Starting Python Scan...")
         
-        # 1. Get Top 25 Qualified Coins
-        qualified_coins = await self.exchange.get_trading_symbols(min_volume=20_000_000)
+        # 1. Get the liquid universe (universe_size 0 = every perp above the volume floor)
+        universe_size = int(await self.db.get_config('universe_size', 200))
+        qualified_coins = await self.exchange.get_trading_symbols(min_volume=20_000_000, limit=universe_size or None)
         print(f"[Scan] Qualified coins: {len(qualified_coins)}")
 
-        # 2. Get OHLCV Data (Cached or Fetch)
-        closes = {}
-        for coin in qualified_coins:
-            symbol = coin['symbol']
-            stored_closes = await self.db.get_ohlcv(symbol, 180)
-            if len(stored_closes) < 144: # Less than 80% coverage
-                print(f"[Scan] Fetching OHLCV for {symbol}")
-                ohlcv = await self.exchange.fetch_ohlcv(symbol, 180)
-                for row in ohlcv:
-                    ts_date = time.strftime('%Y-%m-%d', time.gmtime(row[0]/1000))
-                    await self.db.save_ohlcv(symbol, ts_date, row[4], row[5])
-                closes[symbol] = [float(r[4]) for r in ohlcv]
-            else:
-                closes[symbol] = stored_closes
-            await asyncio.sleep(0.05) # Rate limit protection
+        # 2. Get OHLCV Data (I/O stage)
+        panel = await self._load_panel(qualified_coins)
 
         # 3. Create Pairs and Compute Stats
-        symbol_list = list(closes.keys())
+        symbol_list = panel.symbols
         pairs_data = []
         
         # Load Configs
@@ -49,63 +48,161 @@ class PairsScanner:
             'pvalue_max': await self.db.get_config('pvalue_max', 0.05)
         }
 
-        for i in range(len(symbol_list)):
-            for j in range(i + 1, len(symbol_list)):
-                sym_a = symbol_list[i]
-                sym_b = symbol_list[j]
-                
-                c_a = closes[sym_a]
-                c_b = closes[sym_b]
-                min_len = min(len(c_a), len(c_b))
-                
-                corr, beta, hl, hurst, z, pval = compute_pair_stats(c_a[-min_len:], c_b[-min_len:])
-                
-                if any(v is None for v in [corr, beta, hl, hurst, z]): continue
-                
-                # Check stats
-                stats_pass = (corr >= config['corr_min'] and 
-                              hl >= config['half_life_min'] and 
-                              hl <= config['half_life_max'] and 
-                              hurst < 0.5 and 
-                              (pval is not None and pval <= config['pvalue_max']))
-                
-                zone_info = classify_zone(z, config)
-                can_open = zone_info['can_open'] and stats_pass
-                
-                pair_entry = {
-                    'symbol_a': sym_a,
-                    'symbol_b': sym_b,
-                    'correlation': corr,
-                    'hurst_exp': hurst,
-                    'half_life': hl,
-                    'hedge_ratio': beta,
-                    'zscore': z,
-                    'zone': zone_info['zone'],
-                    'qualified': can_open,
-                    'cointegration_pvalue': pval,
-                    'validation_json': {
-                        'zone': zone_info['zone'],
-                        'sizePct': zone_info['size_pct'],
-                        'direction': 'sell-buy' if z > 0 else 'buy-sell',
-                        'stats_pass': stats_pass
-                    }
-                }
-                
-                await self.db.upsert_pair(pair_entry)
-                pairs_data.append(pair_entry)
+        # Date-aligned (days x symbols) closes, NaN where a coin has no candle
+        prices = panel.closes
+
+        # 3a. Stage one: log-return correlation prefilter (+ clustering) picks the candidates
+        budget_ms = float(await self.db.get_config('scan_budget_ms', 30000))
+        candidates = select_candidates(
+            prices,
+            corr_min=float(await self.db.get_config('prefilter_corr_min', 0.5)),
+            n_clusters=int(await self.db.get_config('scan_clusters', 8)),
+            per_cluster=int(await self.db.get_config('candidates_per_cluster', 300)),
+        )
+        idx_a, idx_b = candidates.idx_a, candidates.idx_b
+        print(f"[Scan] Candidates: {len(idx_a)} of {candidates.n_pairs} pairs "
+              f"({len(set(candidates.clusters.tolist()))} clusters)")
+
+        # 3b. Reuse daily statistics for pairs whose candles have not changed
+        versions = self.stats_cache.versions(panel.last_days(), panel.history_lengths(), 180)
+        miss, stats = self.stats_cache.lookup(symbol_list, versions, idx_a, idx_b)
+        self.stats_cache.retain(symbol_list, idx_a, idx_b)
+
+        # 3c. Stage two, within the time budget: misses computed in the worker pool
+        #     (best candidates first), streamed back per chunk
+        deadline = start_time + budget_ms / 1000
+        miss_at = np.nonzero(miss)[0]
+        if len(miss_at) and self.sec_per_pair > 0:
+            affordable = int(max(deadline - time.time(), 0) / self.sec_per_pair)
+            if affordable < len(miss_at):
+                print(f"[Scan] Budget: computing {affordable} of {len(miss_at)} uncached candidates")
+                miss_at = miss_at[:affordable]
+        computed = 0
+        if len(miss_at):
+            workers = int(await self.db.get_config('scan_workers', 2))
+            pos = {pair: k for k, pair in enumerate(zip(idx_a[miss_at].tolist(), idx_b[miss_at].tolist()))}
+            stage_start = time.time()
+            # aclosing: a break cancels the queued chunks now, not whenever the generator is collected
+            async with contextlib.aclosing(
+                stream_pair_stats(prices, workers, pairs=(idx_a[miss_at], idx_b[miss_at]))
+            ) as batches:
+                async for batch in batches:
+                    self.stats_cache.store(symbol_list, versions, batch)
+                    at = miss_at[[pos[p] for p in zip(batch.idx_a.tolist(), batch.idx_b.tolist())]]
+                    for field in CACHED_FIELDS:
+                        stats[field][at] = getattr(batch, field)
+                    computed += len(at)
+                    if time.time() > deadline:
+                        print("[Scan] Budget exhausted, remaining candidates deferred to the next scan")
+                        break
+            if computed:
+                measured = (time.time() - stage_start) / computed
+                self.sec_per_pair = measured if self.sec_per_pair == 0 else 0.7 * self.sec_per_pair + 0.3 * measured
+        print(f"[Scan] Pair stats: {computed} computed, {int((~miss).sum())} cached")
+
+        # 3d. Z-score / zone layer always re-evaluated against the latest closes
+        usable = np.isfinite(stats['corr']) & np.isfinite(stats['beta']) \
+            & np.isfinite(stats['half_life']) & np.isfinite(stats['hurst'])
+        zscore = np.full(len(idx_a), np.nan)
+        zscore[usable] = spread_zscores(prices, idx_a[usable], idx_b[usable], stats['beta'][usable])
+        batch = PairStatsBatch(
+            idx_a=idx_a, idx_b=idx_b, zscore=zscore, valid=usable & np.isfinite(zscore), **stats,
+        )
+
+        valid_at = np.nonzero(batch.valid)[0]
+        for i in range(0, len(valid_at), CHUNK_PAIRS):
+            entries = [self._build_pair_entry(batch, k, symbol_list, config) for k in valid_at[i:i + CHUNK_PAIRS]]
+            await self.db.upsert_pairs(entries)
+            pairs_data.extend(entries)
 
         # 4. Save Final Scan Result
         duration = int((time.time() - start_time) * 1000)
         signals = [p for p in pairs_data if p['qualified']]
         
-        await self.db.save_scan_result(
+        scan_id = await self.db.save_scan_result(
             total=len(pairs_data),
             qualified=len([p for p in pairs_data if p['qualified']]),
             signals=len(signals),
             blocked=0, # Simplified
             duration=duration,
-            details={'signals': [s['symbol_a'] + '-' + s['symbol_b'] for s in signals[:10]]}
+            details={
+                'signals': [s['symbol_a'] + '-' + s['symbol_b'] for s in signals[:10]],
+                'universe': len(symbol_list),
+                'pairs_total': candidates.n_pairs,
+                'candidates': len(idx_a),
+                'computed': computed,
+                'pruning_ratio': round(1 - len(idx_a) / candidates.n_pairs, 4) if candidates.n_pairs else 0.0,
+                'budget_ms': budget_ms,
+            }
         )
         
+        pair_results.replace(pairs_data, scan_id)
+
         print(f"[Scan] Complete in {duration}ms. {len(signals)} signals found.")
         return pairs_data
+
+    async def _load_panel(self, qualified_coins: list) -> PricePanel:
+        """
+        I/O stage: delta-sync daily candles into Postgres, mirror the new bars
+        into the local column store and read the panel from its memory maps.
+        """
+        symbols = [c['symbol'] for c in qualified_coins]
+        refresh = await self.db.get_config('ohlcv_refresh_sec', 300)
+        synced  = await self.ohlcv_sync.sync(symbols, float(refresh))
+        stored  = await column_store.sync_daily(self.db, symbols)
+        print(f"[Scan] OHLCV sync: {synced}, column store: {stored}")
+
+        intraday_bars = int(await self.db.get_config('intraday_bars', 0))
+        if intraday_bars > 0:
+            for timeframe in ('4h', '1h'):
+                res = await column_store.sync_exchange(self.exchange, symbols, timeframe, intraday_bars)
+                print(f"[Scan] {timeframe} bars: {res}")
+
+        panel = column_store.panel(symbols, '1d', 180)
+        max_stale = int(await self.db.get_config('max_stale_days', 2))
+        panel, dropped = panel.carry_forward(max_stale)
+        if dropped:
+            print(f"[Scan] {len(dropped)} coins missing more than {max_stale} newest daily bars, left out of every pair: {dropped}")
+        return panel
+
+    @staticmethod
+    def _build_pair_entry(batch, k: int, symbol_list: list, config: dict) -> dict:
+        sym_a = symbol_list[batch.idx_a[k]]
+        sym_b = symbol_list[batch.idx_b[k]]
+        corr  = float(batch.corr[k])
+        beta  = float(batch.beta[k])
+        hl    = float(batch.half_life[k])
+        hurst = float(batch.hurst[k])
+        z     = float(batch.zscore[k])
+        pval  = float(batch.pvalue[k]) if np.isfinite(batch.pvalue[k]) else None
+
+        # Check stats
+        stats_pass = (corr >= config['corr_min'] and 
+                      hl >= config['half_life_min'] and 
+                      hl <= config['half_life_max'] and 
+                      hurst < 0.5 and 
+                      (pval is not None and pval <= config['pvalue_max']))
+
+        zone_info = classify_zone(z, config)
+        can_open = zone_info['can_open'] and stats_pass
+
+        pair_entry = {
+            'symbol_a': sym_a,
+            'symbol_b': sym_b,
+            'correlation': corr,
+            'hurst_exp': hurst,
+            'half_life': hl,
+            'hedge_ratio': beta,
+            'zscore': z,
+            'zone': zone_info['zone'],
+            'qualified': can_open,
+            'cointegration_pvalue': pval,
+            'validation_json': {
+                'zone': zone_info['zone'],
+                'sizePct': zone_info['size_pct'],
+                'direction': 'sell-buy' if z > 0 else 'buy-sell',
+                'stats_pass': stats_pass
+            }
+        }
+
+        return pair_entry
@@ -1,7 +1,8 @@
 import numpy as np
 import pandas as pd
-import statsmodels.tsa.stattools as ts
-from typing import Tuple, Optional
+from typing import NamedTuple, Tuple, Optional
+
+from .cointegration import adf_pvalues
 
 
 def compute_pair_stats(
@@ -70,17 +71,207 @@ def compute_pair_stats(
     zscore  = float((spreads[-1] - mean_60) / std_60) if std_60 > 0 else None
 
     # 7. Cointegration via ADF test on spread
-    pval = None
-    try:
-        adf_result = ts.adfuller(spreads, maxlag=1, autolag=None)
-        raw_pval   = float(adf_result[1])
-        pval       = raw_pval if not np.isnan(raw_pval) else None
-    except Exception:
-        pass
+    raw_pval = float(adf_pvalues(spreads)[0])
+    pval     = raw_pval if not np.isnan(raw_pval) else None
 
     return corr, beta, hl, hurst_val, zscore, pval
 
 
+class PairStatsBatch(NamedTuple):
+    """
+    Column-aligned statistics for many pairs at once.
+    Pair k is (idx_a[k], idx_b[k]) into the symbol axis of the price matrix.
+    Values that cannot be computed are NaN; `valid` marks pairs where
+    corr, beta, half_life, hurst and zscore are all available.
+    """
+    idx_a:     np.ndarray
+    idx_b:     np.ndarray
+    corr:      np.ndarray
+    beta:      np.ndarray
+    half_life: np.ndarray
+    hurst:     np.ndarray
+    zscore:    np.ndarray
+    pvalue:    np.ndarray
+    valid:     np.ndarray
+
+
+def history_lengths(prices: np.ndarray) -> np.ndarray:
+    """Number of trailing finite rows per column of a (days x symbols) matrix."""
+    finite = np.isfinite(prices)[::-1]
+    return np.where(finite.all(axis=0), prices.shape[0], finite.argmin(axis=0))
+
+
+def compute_all_pair_stats(prices, pairs: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> PairStatsBatch:
+    """
+    Vectorized compute_pair_stats over a (days x symbols) close matrix.
+
+    Rows are aligned by date, newest last. Symbols with shorter history are
+    left-padded with NaN; each pair is evaluated on the trailing window both
+    legs cover, exactly like compute_pair_stats(a[-n:], b[-n:]).
+    `pairs` restricts the work to explicit (idx_a, idx_b) arrays, default all i<j.
+    """
+    x = np.asarray(prices, dtype=float)
+    n_days, n_syms = x.shape
+    if pairs is None:
+        idx_a, idx_b = np.triu_indices(n_syms, k=1)
+    else:
+        idx_a = np.asarray(pairs[0], dtype=np.intp)
+        idx_b = np.asarray(pairs[1], dtype=np.intp)
+
+    n_pairs = len(idx_a)
+    out = {k: np.full(n_pairs, np.nan) for k in ('corr', 'beta', 'half_life', 'hurst', 'zscore', 'pvalue')}
+
+    lengths = history_lengths(x)
+    window  = np.minimum(lengths[idx_a], lengths[idx_b])
+
+    # One broadcasted pass per distinct window length (normally just one)
+    for length in np.unique(window[window >= 60]):
+        sel  = np.nonzero(window == length)[0]
+        cols = np.union1d(idx_a[sel], idx_b[sel])
+        sub  = x[n_days - length:, cols]
+        ia   = np.searchsorted(cols, idx_a[sel])
+        ib   = np.searchsorted(cols, idx_b[sel])
+        for key, vals in _window_pair_stats(sub, ia, ib).items():
+            out[key][sel] = vals
+
+    valid = np.isfinite(out['corr']) & np.isfinite(out['beta']) & np.isfinite(out['half_life']) \
+        & np.isfinite(out['hurst']) & np.isfinite(out['zscore'])
+
+    return PairStatsBatch(idx_a=idx_a, idx_b=idx_b, valid=valid, **out)
+
+
+def spread_zscores(prices: np.ndarray, idx_a: np.ndarray, idx_b: np.ndarray, beta: np.ndarray, window: int = 60) -> np.ndarray:
+    """
+    Latest rolling z-score of spread = A - beta*B for many pairs, using the
+    last `window` rows of the price matrix (step 6 of compute_pair_stats).
+    """
+    recent = prices[-window:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spreads = recent[:, idx_a] - beta * recent[:, idx_b]
+        std = spreads.std(axis=0)
+        return np.where(std > 0, (spreads[-1] - spreads.mean(axis=0)) / std, np.nan)
+
+
+def rolling_pair_stats(
+    prices: np.ndarray, idx_a: np.ndarray, idx_b: np.ndarray,
+    window: int = 180, start: Optional[int] = None, chunk_days: int = 16,
+) -> dict:
+    """
+    Walk-forward compute_all_pair_stats: for every row t >= start, the stats
+    a scan on day t would have produced from the trailing `window` rows.
+
+    Returns {field: (days x pairs) array} for corr, beta, half_life, hurst,
+    zscore and pvalue; NaN before `start` and wherever either leg lacks a
+    complete window. Days are batched `chunk_days` at a time by laying the
+    windows side by side as extra columns, so a whole chunk is one
+    _window_pair_stats pass.
+    """
+    x = np.asarray(prices, dtype=float)
+    idx_a = np.asarray(idx_a, dtype=np.intp)
+    idx_b = np.asarray(idx_b, dtype=np.intp)
+    n_days, n_pairs = x.shape[0], len(idx_a)
+    out = {k: np.full((n_days, n_pairs), np.nan) for k in ('corr', 'beta', 'half_life', 'hurst', 'zscore', 'pvalue')}
+    start = max(window - 1 if start is None else start, window - 1)
+    if n_days < window or start >= n_days or not n_pairs:
+        return out
+
+    cols = np.union1d(idx_a, idx_b)
+    ia, ib = np.searchsorted(cols, idx_a), np.searchsorted(cols, idx_b)
+    n_cols = len(cols)
+    windows = np.lib.stride_tricks.sliding_window_view(x[:, cols], window, axis=0)   # (days-window+1, cols, window)
+    complete = np.isfinite(windows).all(axis=2)
+
+    for first in range(start, n_days, chunk_days):
+        days = np.arange(first, min(first + chunk_days, n_days))
+        w = windows[days - window + 1]                                   # (D, cols, window)
+        stacked = np.nan_to_num(np.moveaxis(w, 2, 0).reshape(window, -1))
+        offset = (np.arange(len(days)) * n_cols)[:, None]
+        res = _window_pair_stats(stacked, (offset + ia).ravel(), (offset + ib).ravel())
+        ok = complete[days - window + 1][:, ia] & complete[days - window + 1][:, ib]
+        for key, vals in res.items():
+            out[key][days] = np.where(ok, vals.reshape(len(days), n_pairs), np.nan)
+    return out
+
+
+def _window_pair_stats(x: np.ndarray, ia: np.ndarray, ib: np.ndarray) -> dict:
+    """compute_pair_stats for every (ia, ib) column pair of a NaN-free window."""
+    n = x.shape[0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 1. Pearson Correlation + 2. Hedge Ratio from one covariance matrix
+        xc    = x - x.mean(axis=0)
+        cov   = xc.T @ xc / (n - 1)
+        var   = np.diag(cov)
+        cov_ab = cov[ia, ib]
+        corr  = cov_ab / np.sqrt(var[ia] * var[ib])
+        beta  = np.where(np.isfinite(corr) & (var[ib] != 0), cov_ab / var[ib], np.nan)
+        beta[~(beta > 0)] = np.nan
+        ok    = np.isfinite(beta)
+
+        # 3. Spread (T x P), invalid betas masked out afterwards
+        spreads = x[:, ia] - np.where(ok, beta, 0.0) * x[:, ib]
+
+        # 4. Half-Life (Ornstein-Uhlenbeck)
+        lag    = spreads[:-1]
+        delta  = spreads[1:] - lag
+        dev    = lag - lag.mean(axis=0)
+        var_d  = dev.var(axis=0)
+        cov_dl = ((dev - dev.mean(axis=0)) * (delta - delta.mean(axis=0))).mean(axis=0)
+        lam    = cov_dl / var_d
+        hl     = np.where((var_d > 0) & (lam < 0), -np.log(2) / lam, np.nan)
+
+        # 5. Hurst Exponent via R/S analysis
+        cum   = np.cumsum(spreads - spreads.mean(axis=0), axis=0)
+        r     = cum.max(axis=0) - cum.min(axis=0)
+        s     = spreads.std(axis=0)
+        hurst = np.where((s > 0) & (r > 0), np.log(r / s) / np.log(n), np.nan)
+
+        # 6. Z-Score (rolling 60-period)
+        recent = spreads[-60:]
+        std_60 = recent.std(axis=0)
+        zscore = np.where(std_60 > 0, (spreads[-1] - recent.mean(axis=0)) / std_60, np.nan)
+
+    # 7. Cointegration via batched ADF test on spread
+    pvalue = np.full(len(ia), np.nan)
+    pvalue[ok] = adf_pvalues(spreads[:, ok])
+
+    nan = np.full(len(ia), np.nan)
+    return {
+        'corr':      corr,
+        'beta':      beta,
+        'half_life': np.where(ok, hl, nan),
+        'hurst':     np.where(ok, hurst, nan),
+        'zscore':    np.where(ok, zscore, nan),
+        'pvalue':    pvalue,
+    }
+
+
+ZONES = ('neutral', 'safe', 'caution', 'danger')
+
+
+def classify_zones(z: np.ndarray, config: dict) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized classify_zone: (zone index into ZONES, size_pct) per z-score.
+    can_open is size_pct > 0. NaN z-scores are neutral.
+    """
+    abs_z  = np.abs(np.asarray(z, dtype=float))
+    entry  = float(config.get('zscore_entry', 2.0))
+    sl     = float(config.get('zscore_sl',    3.0))
+    buffer = float(config.get('safe_buffer',  0.5))
+
+    safe_max   = sl - buffer
+    caution_at = entry + 0.6 * (safe_max - entry)
+    if safe_max <= entry:
+        safe_max   = entry + 0.1
+        caution_at = entry + 0.06
+
+    zone = np.select(
+        [abs_z >= safe_max, abs_z >= caution_at, abs_z >= entry],
+        [3, 2, 1], default=0,
+    )
+    size_pct = np.array([0.0, 1.0, 0.5, 0.0])[zone]
+    return zone, size_pct
+
+
 def classify_zone(z, config: dict) -> dict:
     """
     Classify a z-score into a trading zone.
@@ -0,0 +1,185 @@
+"""
+In-memory stand-in for DBManager covering what the scanner, OHLCV sync,
+column store, monitor and executor call.
+
+    db = FakeDB(config={'scan_workers': 0})
+    attach_db(db, scanner, monitor, executor)
+
+Same method names, arguments and return shapes as DBManager, no Postgres.
+Every call can sleep `latency_ms` to stand in for a round trip.
+"""
+import uuid
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from engine.price_panel import PricePanel
+
+# Seed values from db/init.sql + migrations that the hot paths read
+DEFAULT_CONFIG = {
+    'zscore_entry': 2.0, 'zscore_tp': 0.5, 'zscore_sl': 3.0, 'corr_min': 0.8,
+    'half_life_min': 5, 'half_life_max': 30, 'safe_buffer': 0.5, 'grace_period_sec': 300,
+    'cooldown_sec': 3600, 'max_same_coin': 2, 'max_open_pairs': 5, 'position_size_usd': 500,
+    'corr_break_sl': 0.5, 'max_loss_pct': 5.0, 'funding_rate_max': 0.001, 'beta_drift_max_pct': 20.0,
+    'pvalue_max': 0.05, 'scan_workers': 2, 'ohlcv_refresh_sec': 300, 'universe_size': 200,
+    'prefilter_corr_min': 0.5, 'scan_clusters': 8, 'candidates_per_cluster': 300,
+    'scan_budget_ms': 30000, 'intraday_bars': 0, 'max_stale_days': 2,
+}
+
+
+def _day(ms: int) -> date:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).date()
+
+
+class FakeDB:
+    def __init__(self, config: Optional[Dict[str, Any]] = None, latency_ms: float = 0.0):
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+        self.latency_ms = latency_ms
+        self.ohlcv: Dict[str, Dict[date, tuple]] = {}      # symbol -> day -> (close, volume)
+        self.pairs: Dict[tuple, Dict[str, Any]] = {}
+        self.trades: Dict[str, Dict[str, Any]] = {}
+        self.scans: List[Dict[str, Any]] = []
+        self.calls: Dict[str, int] = {}
+
+    async def _io(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+    # ── OHLCV ──
+
+    async def save_ohlcv_bulk(self, symbol: str, rows: List[List[Any]]):
+        await self._io('save_ohlcv_bulk')
+        bars = self.ohlcv.setdefault(symbol, {})
+        for r in rows:
+            bars[_day(r[0])] = (float(r[4]), float(r[5] or 0))
+
+    async def get_price_panel(self, symbols: List[str], limit: int = 180) -> PricePanel:
+        await self._io('get_price_panel')
+        rows = []
+        for s in symbols:
+            for d in sorted(self.ohlcv.get(s, {}))[-limit:]:
+                close, volume = self.ohlcv[s][d]
+                rows.append({'symbol': s, 'ts': d, 'close': close, 'volume': volume})
+        return PricePanel.from_rows(rows, symbols, limit)
+
+    async def get_ohlcv_coverage(self, last_days: Dict[str, Optional[date]]) -> Dict[str, int]:
+        await self._io('get_ohlcv_coverage')
+        floor = date(1970, 1, 1)
+        return {s: sum(1 for d in self.ohlcv[s] if d <= (last or floor))
+                for s, last in last_days.items() if s in self.ohlcv}
+
+    async def get_ohlcv_since(self, since: Dict[str, Optional[date]]) -> List[Dict[str, Any]]:
+        await self._io('get_ohlcv_since')
+        out = []
+        for s in sorted(since):
+            start = since[s] or date(1970, 1, 1)
+            for d in sorted(self.ohlcv.get(s, {})):
+                if d >= start:
+                    close, volume = self.ohlcv[s][d]
+                    out.append({'symbol': s, 'ts': d, 'close': close, 'volume': volume})
+        return out
+
+    async def get_ohlcv_sync_state(self, symbols: List[str], since: date) -> Dict[str, Dict[str, Any]]:
+        await self._io('get_ohlcv_sync_state')
+        state = {}
+        for s in symbols:
+            days = sorted(d for d in self.ohlcv.get(s, {}) if d >= since)
+            if not days:
+                continue
+            gaps = [prev for prev, d in zip(days, days[1:]) if (d - prev).days > 1]
+            state[s] = {'symbol': s, 'rows': len(days), 'first_ts': days[0], 'last_ts': days[-1],
+                        'gap_from': gaps[0] if gaps else None}
+        return state
+
+    # ── Pairs / scans ──
+
+    async def upsert_pairs(self, pairs: List[dict]):
+        await self._io('upsert_pairs')
+        now = datetime.now(timezone.utc)
+        for p in pairs:
+            self.pairs[(p['symbol_a'], p['symbol_b'])] = {**p, 'scanned_at': now}
+
+    async def get_pair_stats(self, symbol_a: str, symbol_b: str) -> Optional[Dict]:
+        await self._io('get_pair_stats')
+        row = self.pairs.get((symbol_a, symbol_b))
+        return dict(row) if row else None
+
+    async def save_scan_result(self, total, qualified, signals, blocked, duration, details) -> int:
+        await self._io('save_scan_result')
+        self.scans.append({'total_pairs': total, 'qualified': qualified, 'signals': signals,
+                           'blocked': blocked, 'duration_ms': duration, 'details': details})
+        return len(self.scans)
+
+    # ── Config ──
+
+    async def get_config(self, key: str, default=None):
+        return self.config.get(key, default)
+
+    async def get_all_config(self) -> Dict[str, Any]:
+        return dict(self.config)
+
+    # ── Trades ──
+
+    async def open_trade(self, data: dict) -> str:
+        await self._io('open_trade')
+        gid = str(data['group_id'])
+        self.trades[gid] = {**data, 'group_id': gid, 'status': 'open', 'opened_at': datetime.now(timezone.utc),
+                            'closed_at': None, 'current_zscore': None, 'last_monitored_at': None}
+        return gid
+
+    async def close_trade(self, group_id: str, exit_zscore: float, exit_reason: str, pnl_usd: float):
+        await self._io('close_trade')
+        t = self.trades.get(group_id)
+        if t:
+            t.update(status='closed', exit_zscore=exit_zscore, exit_reason=exit_reason,
+                     pnl_usd=pnl_usd, closed_at=datetime.now(timezone.utc))
+
+    async def update_trade_zscore(self, group_id: str, current_zscore: float):
+        await self._io('update_trade_zscore')
+        t = self.trades.get(group_id)
+        if t:
+            t.update(current_zscore=current_zscore, last_monitored_at=datetime.now(timezone.utc))
+
+    async def get_open_trades(self) -> List[Dict]:
+        await self._io('get_open_trades')
+        return [dict(t) for t in self.trades.values() if t['status'] == 'open']
+
+    async def get_trade_by_group(self, group_id: str) -> Optional[Dict]:
+        await self._io('get_trade_by_group')
+        t = self.trades.get(group_id)
+        return dict(t) if t else None
+
+    async def get_pretrade_state(self, symbol_a: str, symbol_b: str, cooldown_sec: float) -> Dict[str, Any]:
+        await self._io('get_pretrade_state')
+        open_ = [t for t in self.trades.values() if t['status'] == 'open']
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=int(cooldown_sec))
+        return {
+            'pair_open':    any(t['symbol_a'] == symbol_a and t['symbol_b'] == symbol_b for t in open_),
+            'in_cooldown':  any(t['symbol_a'] == symbol_a and t['symbol_b'] == symbol_b and t['status'] == 'closed'
+                                and t['closed_at'] > cutoff for t in self.trades.values()),
+            'open_count_a': sum(symbol_a in (t['symbol_a'], t['symbol_b']) for t in open_),
+            'open_count_b': sum(symbol_b in (t['symbol_a'], t['symbol_b']) for t in open_),
+            'open_pairs':   len(open_),
+        }
+
+    def seed_trade(self, symbol_a: str, symbol_b: str, **fields) -> str:
+        """Insert an open trade directly (monitor benchmarks / fixtures)."""
+        gid = str(uuid.uuid4())
+        self.trades[gid] = {
+            'group_id': gid, 'symbol_a': symbol_a, 'symbol_b': symbol_b, 'status': 'open',
+            'leg_a_side': 'buy', 'leg_b_side': 'sell', 'leg_a_size_usd': 500.0, 'leg_b_size_usd': 500.0,
+            'leg_a_entry_price': None, 'leg_b_entry_price': None, 'entry_zscore': -2.2, 'entry_corr': 0.9,
+            'entry_beta': 1.0, 'entry_half_life': None, 'entry_zone': 'safe', 'grace_until': None,
+            'opened_at': datetime.now(timezone.utc), 'closed_at': None, 'current_zscore': None,
+            **fields,
+        }
+        return gid
+
+
+def attach_db(db, *components):
+    """Point the engine components (and the scanner's OHLCV sync) at `db`."""
+    for c in components:
+        c.db = db
+        if hasattr(c, 'ohlcv_sync'):
+            c.ohlcv_sync.db = db
@@ -0,0 +1,145 @@
+"""
+In-memory stand-in for the ccxt binance client that BinanceClient wraps.
+
+    market = synthetic_market(100, 400)
+    client = fake_binance_client(market, latency_ms=5)
+    await client.get_trading_symbols(limit=50)
+
+Only the ccxt calls BinanceClient makes are implemented, so every
+BinanceClient code path (kline semaphore, shared ticker snapshot, funding
+cache, paired order submission) runs for real against it. Each call sleeps
+`latency_ms` (+ up to `jitter_ms`, seeded) to stand in for the network;
+market orders fill at the last close and are kept as net positions.
+"""
+import time
+import random
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from .synthetic import SyntheticMarket
+
+FUNDING_INTERVAL_MS = 8 * 3600 * 1000
+
+
+def _pair(coin: str) -> str:
+    return f"{coin}/USDT:USDT"
+
+
+def _coin(symbol: str) -> str:
+    return symbol.split('/')[0]
+
+
+class FakeExchange:
+    def __init__(
+        self, market: SyntheticMarket, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+        funding_rate: float = 0.0001, seed: int = 0,
+    ):
+        self.market = market
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.funding_rate = funding_rate
+        self.prices = market.last_prices()
+        self.positions: Dict[str, float] = {}      # coin -> signed contracts
+        self.calls: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._order_seq = 0
+
+    async def _io(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        delay = self.latency_ms + (self._rng.random() * self.jitter_ms if self.jitter_ms else 0.0)
+        await asyncio.sleep(delay / 1000 if delay > 0 else 0)
+
+    # ── Markets ──
+
+    async def load_markets(self) -> Dict[str, Dict[str, Any]]:
+        await self._io('load_markets')
+        return {
+            _pair(c): {'symbol': _pair(c), 'swap': True, 'linear': True, 'quote': 'USDT', 'active': True}
+            for c in self.market.symbols
+        }
+
+    async def fetch_tickers(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        await self._io('fetch_tickers')
+        vol = self.market.volumes[-1]
+        coins = [_coin(s) for s in symbols] if symbols else self.market.symbols
+        return {
+            _pair(c): {'symbol': _pair(c), 'last': self.prices[c], 'mark': self.prices[c],
+                       'quoteVolume': float(vol[self.market.column(c)])}
+            for c in coins if c in self.prices
+        }
+
+    async def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        return (await self.fetch_tickers([symbol]))[symbol]
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1d', since: Optional[int] = None,
+                          limit: Optional[int] = None) -> List[list]:
+        await self._io('fetch_ohlcv')
+        if timeframe != '1d':
+            raise ValueError(f"FakeExchange only serves daily bars, not {timeframe}")
+        return self.market.ohlcv(_coin(symbol), since, limit)
+
+    async def fetch_funding_rates(self) -> Dict[str, Dict[str, Any]]:
+        await self._io('fetch_funding_rates')
+        next_ms = (int(time.time() * 1000) // FUNDING_INTERVAL_MS + 1) * FUNDING_INTERVAL_MS
+        return {
+            _pair(c): {'fundingRate': self.funding_rate, 'previousFundingRate': self.funding_rate,
+                       'fundingTimestamp': next_ms}
+            for c in self.market.symbols
+        }
+
+    async def fetch_funding_rate_history(self, symbol: str, since: Optional[int] = None) -> List[Dict[str, Any]]:
+        await self._io('fetch_funding_rate_history')
+        now = int(time.time() * 1000)
+        start = since if since is not None else now - 3 * FUNDING_INTERVAL_MS
+        first = (start // FUNDING_INTERVAL_MS + 1) * FUNDING_INTERVAL_MS
+        return [{'timestamp': t, 'fundingRate': self.funding_rate} for t in range(first, now, FUNDING_INTERVAL_MS)]
+
+    # ── Account / orders ──
+
+    def amount_to_precision(self, symbol: str, amount: float) -> str:
+        return f"{amount:.6f}"
+
+    async def fetch_balance(self) -> Dict[str, Any]:
+        await self._io('fetch_balance')
+        return {'total': {'USDT': 10_000.0}, 'free': {'USDT': 10_000.0}}
+
+    async def create_market_order(self, symbol: str, side: str, amount: float, params: Optional[dict] = None) -> Dict[str, Any]:
+        await self._io('create_market_order')
+        coin = _coin(symbol)
+        if coin not in self.prices:
+            raise ValueError(f"unknown symbol {symbol}")
+        signed = amount if side == 'buy' else -amount
+        held = self.positions.get(coin, 0.0)
+        if (params or {}).get('reduceOnly'):
+            signed = max(min(signed, -held), 0.0) if held < 0 else min(max(signed, -held), 0.0)
+        held += signed
+        if abs(held) < 1e-12:
+            self.positions.pop(coin, None)
+        else:
+            self.positions[coin] = held
+        self._order_seq += 1
+        price = self.prices[coin]
+        return {'id': f"fake_{self._order_seq}", 'symbol': symbol, 'side': side, 'type': 'market',
+                'average': price, 'price': price, 'filled': abs(signed), 'cost': abs(signed) * price,
+                'timestamp': int(time.time() * 1000)}
+
+    async def fetch_positions(self, symbols: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        await self._io('fetch_positions')
+        coins = [_coin(s) for s in symbols] if symbols else list(self.positions)
+        return [
+            {'symbol': _pair(c), 'contracts': abs(self.positions[c]),
+             'side': 'long' if self.positions[c] > 0 else 'short'}
+            for c in coins if c in self.positions
+        ]
+
+    async def close(self):
+        pass
+
+
+def fake_binance_client(market: SyntheticMarket, latency_ms: float = 0.0, jitter_ms: float = 0.0, **kwargs):
+    """A real BinanceClient (live-order code paths, no websocket feed) over a FakeExchange."""
+    from engine.exchange import BinanceClient
+
+    client = BinanceClient()
+    client.attach_venue(FakeExchange(market, latency_ms, jitter_ms, **kwargs))
+    return client
@@ -0,0 +1,115 @@
+"""
+Offline stand-in for Binance's `!markPrice@arr@1s` websocket stream.
+
+    python -m sim.fake_market_ws --port 8765 --symbols BTC,ETH,SOL
+    BINANCE_MARKET_WS_URL=ws://127.0.0.1:8765/stream uvicorn app:socket_app ...
+
+or in-process:
+
+    server = FakeMarketServer({'BTC': 60000.0, 'ETH': 3000.0})
+    url = await server.start()
+    ...
+    await server.stop()
+"""
+import time
+import json
+import random
+import asyncio
+import argparse
+from typing import Dict, Optional
+
+from aiohttp import web
+
+FUNDING_INTERVAL_MS = 8 * 3600 * 1000
+
+
+class FakeMarketServer:
+    """Pushes random-walk markPriceUpdate arrays to every connected client."""
+
+    def __init__(
+        self, prices: Dict[str, float], interval_sec: float = 1.0,
+        funding_rate: float = 0.0001, volatility: float = 0.0005, seed: Optional[int] = None,
+    ):
+        self.prices = dict(prices)
+        self.funding = {c: funding_rate for c in prices}
+        self.interval_sec = interval_sec
+        self.volatility = volatility
+        self._rng = random.Random(seed)
+        self._clients = set()
+        self._runner: Optional[web.AppRunner] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_get('/stream', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self._task = asyncio.create_task(self._broadcast_loop())
+        return f"ws://{host}:{port}/stream"
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+        for ws in list(self._clients):
+            await ws.close()
+        if self._runner:
+            await self._runner.cleanup()
+
+    def snapshot(self) -> dict:
+        now = int(time.time() * 1000)
+        next_funding = (now // FUNDING_INTERVAL_MS + 1) * FUNDING_INTERVAL_MS
+        return {
+            'stream': '!markPrice@arr@1s',
+            'data': [
+                {
+                    'e': 'markPriceUpdate', 'E': now, 's': f"{coin}USDT",
+                    'p': f"{price:.8f}", 'i': f"{price:.8f}", 'P': f"{price:.8f}",
+                    'r': f"{self.funding[coin]:.8f}", 'T': next_funding,
+                }
+                for coin, price in self.prices.items()
+            ],
+        }
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        self._clients.add(ws)
+        try:
+            await ws.send_str(json.dumps(self.snapshot()))
+            async for _ in ws:
+                pass
+        finally:
+            self._clients.discard(ws)
+        return ws
+
+    async def _broadcast_loop(self):
+        while True:
+            await asyncio.sleep(self.interval_sec)
+            for coin in self.prices:
+                self.prices[coin] *= 1 + self._rng.gauss(0, self.volatility)
+            msg = json.dumps(self.snapshot())
+            for ws in list(self._clients):
+                try:
+                    await ws.send_str(msg)
+                except Exception:
+                    self._clients.discard(ws)
+
+
+async def _main(args):
+    coins = [c.strip().upper() for c in args.symbols.split(',') if c.strip()]
+    server = FakeMarketServer({c: 100.0 * (i + 1) for i, c in enumerate(coins)}, args.interval)
+    url = await server.start(args.host, args.port)
+    print(f"[FakeMarketWS] Serving {len(coins)} symbols at {url}")
+    await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--symbols', default='BTC,ETH,SOL,BNB,XRP')
+    parser.add_argument('--interval', type=float, default=1.0)
+    asyncio.run(_main(parser.parse_args()))
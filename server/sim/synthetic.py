@@ -0,0 +1,90 @@
+"""
+Deterministic synthetic daily prices for offline runs (benchmarks, fakes).
+
+    market = synthetic_market(n_symbols=100, n_days=400, seed=7)
+    market.closes          # (days x symbols), newest last
+    market.ohlcv('S003')   # ccxt rows [ms, o, h, l, c, v]
+
+Every symbol loads on one market-wide random walk, as crypto does, so
+return correlations are broadly positive. On top of that, symbols come in
+groups that share a group random walk plus their own mean-reverting
+(AR(1)) residual, so pairs inside a group are cointegrated; the remaining
+`1 - coint_frac` of symbols carry an idiosyncratic random walk instead.
+The same seed always gives the same market.
+"""
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+DAY_MS = 86_400_000
+
+
+class SyntheticMarket(NamedTuple):
+    symbols: List[str]
+    days_ms: np.ndarray        # open time of each daily bar (ms), oldest first
+    closes: np.ndarray         # (days x symbols)
+    volumes: np.ndarray        # (days x symbols), quote volume per day
+    groups: np.ndarray         # cointegration group per symbol, -1 = independent
+
+    def column(self, symbol: str) -> int:
+        return self.symbols.index(symbol)
+
+    def ohlcv(self, symbol: str, since: Optional[int] = None, limit: Optional[int] = None) -> List[list]:
+        """ccxt-style daily rows for one symbol, from `since` (ms) or the last `limit` bars."""
+        k, n = self.column(symbol), len(self.days_ms)
+        if since is not None:
+            at = int(np.searchsorted(self.days_ms, since))
+            end = min(at + limit, n) if limit else n
+        else:
+            at, end = (max(n - limit, 0) if limit else 0), n
+        close, vol = self.closes[at:end, k], self.volumes[at:end, k]
+        return [[int(t), float(c), float(c), float(c), float(c), float(v)]
+                for t, c, v in zip(self.days_ms[at:end], close, vol)]
+
+    def last_prices(self) -> Dict[str, float]:
+        return {s: float(p) for s, p in zip(self.symbols, self.closes[-1])}
+
+
+def synthetic_market(
+    n_symbols: int = 50, n_days: int = 400, coint_frac: float = 0.6, group_size: int = 4,
+    seed: int = 0, end_ms: Optional[int] = None,
+) -> SyntheticMarket:
+    """
+    `end_ms` is the open time of the newest bar (default: today 00:00 UTC,
+    so the newest bar is the one still forming).
+    """
+    rng = np.random.default_rng(seed)
+    if end_ms is None:
+        end_ms = int(np.datetime64('today', 'D').astype('datetime64[ms]').astype(np.int64))
+    days_ms = end_ms - DAY_MS * np.arange(n_days - 1, -1, -1, dtype=np.int64)
+
+    n_coint = int(round(n_symbols * coint_frac)) // group_size * group_size
+    groups = np.full(n_symbols, -1)
+    groups[:n_coint] = np.arange(n_coint) // group_size
+    n_groups = n_coint // group_size
+
+    log_p = np.empty((n_days, n_symbols))
+    factors = np.cumsum(rng.normal(0, 0.04, (n_days, max(n_groups, 1))), axis=0)
+    for g in range(n_groups):
+        cols = np.nonzero(groups == g)[0]
+        loading = rng.uniform(0.7, 1.3, len(cols))
+        phi = rng.uniform(0.6, 0.9, len(cols))
+        resid = np.zeros((n_days, len(cols)))
+        shocks = rng.normal(0, 0.01, (n_days, len(cols)))
+        for t in range(1, n_days):
+            resid[t] = phi * resid[t - 1] + shocks[t]
+        log_p[:, cols] = factors[:, [g]] * loading + resid
+    free = np.nonzero(groups < 0)[0]
+    log_p[:, free] = np.cumsum(rng.normal(0, 0.04, (n_days, len(free))), axis=0)
+    # Shared market factor; a group shares one loading so it stays cointegrated
+    market = np.cumsum(rng.normal(0, 0.03, n_days))
+    loading = rng.uniform(0.5, 1.5, n_symbols)
+    for g in range(n_groups):
+        loading[groups == g] = loading[np.argmax(groups == g)]
+    log_p += market[:, None] * loading
+
+    level = np.exp(rng.uniform(np.log(0.05), np.log(50_000), n_symbols))
+    closes = level * np.exp(log_p - log_p[0])
+    volumes = np.exp(rng.normal(np.log(5e7), 1.0, (n_days, n_symbols)))
+    symbols = [f"S{k:03d}" for k in range(n_symbols)]
+    return SyntheticMarket(symbols, days_ms, closes, volumes, groups)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from statsmodels.tsa.stattools import adfuller
+
+from engine.cointegration import ADF_PVALUE_TOL, adf_pvalues
+
+
+def _spreads(n_days: int = 180, seed: int = 0) -> np.ndarray:
+    """Random-walk (unit root) and AR(1) (stationary) columns side by side."""
+    rng = np.random.default_rng(seed)
+    shocks = rng.normal(0, 1, (n_days, 12))
+    walks = np.cumsum(shocks[:, :6], axis=0)
+    ar = np.zeros((n_days, 6))
+    phi = np.linspace(0.2, 0.9, 6)
+    for t in range(1, n_days):
+        ar[t] = phi * ar[t - 1] + shocks[t, 6:]
+    return np.hstack([walks, ar + 100.0])
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('n_days', [60, 180, 365])
+def test_adf_pvalues_match_adfuller(seed, n_days):
+    spreads = _spreads(n_days, seed)
+    expected = np.array([adfuller(spreads[:, k], maxlag=1, autolag=None)[1] for k in range(spreads.shape[1])])
+    got = adf_pvalues(spreads)
+    assert np.max(np.abs(got - expected)) <= ADF_PVALUE_TOL
+
+
+def test_adf_pvalues_separate_stationary_from_unit_root():
+    p = adf_pvalues(_spreads(365, seed=3))
+    assert (p[6:] < 0.05).all()
+    assert np.median(p[:6]) > 0.05
+
+
+def test_adf_pvalues_single_column_and_degenerate():
+    x = _spreads(120)[:, 7]
+    assert adf_pvalues(x).shape == (1,)
+    assert abs(adf_pvalues(x)[0] - adfuller(x, maxlag=1, autolag=None)[1]) <= ADF_PVALUE_TOL
+    assert np.isnan(adf_pvalues(np.ones((50, 1))))[0]
@@ -0,0 +1,63 @@
+import time
+import asyncio
+
+from engine.exchange import PRICE_SNAPSHOT_MAX_AGE, PRICE_SNAPSHOT_TTL, BinanceClient
+
+
+class TickerExchange:
+    """fetch_tickers that serves fixed prices, or raises once `down` is set."""
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.down = False
+        self.calls = 0
+
+    async def fetch_tickers(self, symbols=None):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("exchange unavailable")
+        return {f"{c}/USDT:USDT": {'last': p} for c, p in self.prices.items()}
+
+
+def _client(prices):
+    client = BinanceClient()
+    client.exchange = TickerExchange(prices)
+    return client
+
+
+def test_snapshot_served_within_ttl():
+    client = _client({'BTC': 60000.0})
+
+    async def run():
+        first = await client.get_prices(['BTC'])
+        client.exchange.prices['BTC'] = 1.0
+        return first, await client.get_prices(['BTC'])
+
+    first, second = asyncio.run(run())
+    assert first == second == {'BTC': 60000.0}
+    assert client.exchange.calls == 1
+
+
+def test_failed_refresh_serves_recent_snapshot():
+    client = _client({'BTC': 60000.0, 'ETH': 3000.0})
+
+    async def run():
+        await client.get_prices(['BTC'])
+        client.exchange.down = True
+        client._snapshot_at = time.time() - (PRICE_SNAPSHOT_TTL + PRICE_SNAPSHOT_MAX_AGE) / 2
+        return await client.get_prices(['BTC', 'ETH'])
+
+    assert asyncio.run(run()) == {'BTC': 60000.0, 'ETH': 3000.0}
+
+
+def test_failed_refresh_never_serves_expired_snapshot():
+    client = _client({'BTC': 60000.0, 'ETH': 3000.0})
+
+    async def run():
+        await client.get_prices(['BTC'])
+        client.exchange.down = True
+        client._snapshot_at = time.time() - PRICE_SNAPSHOT_MAX_AGE - 1
+        return await client.get_prices(['BTC', 'ETH'])
+
+    assert asyncio.run(run()) == {'BTC': None, 'ETH': None}
+    assert client.exchange.calls == 2
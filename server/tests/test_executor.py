@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from engine.exchange import BinanceClient
+from engine.executor import TradeExecutor
+from sim.fake_db import FakeDB, attach_db
+
+
+class PositionExchange:
+    """Positions by coin and reduce-only close orders; fetch_positions raises once `down` is set."""
+
+    def __init__(self, positions=None, down_after_order=False):
+        self.positions = dict(positions or {})    # coin -> contracts
+        self.down = False
+        self.down_after_order = down_after_order
+        self.orders = []
+
+    async def fetch_positions(self, symbols=None):
+        if self.down:
+            raise ConnectionError("429 Too Many Requests")
+        coins = [s.split('/')[0] for s in symbols] if symbols else list(self.positions)
+        return [{'symbol': f"{c}/USDT:USDT", 'contracts': self.positions[c]} for c in coins if c in self.positions]
+
+    async def create_market_order(self, symbol, side, amount, params=None):
+        self.orders.append((symbol, side, amount))
+        self.down = self.down or self.down_after_order
+        return {'id': str(len(self.orders)), 'symbol': symbol}
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    async def sleep(seconds):
+        pass
+    monkeypatch.setattr('engine.executor.asyncio.sleep', sleep)
+
+
+def _executor(venue, **config):
+    client = BinanceClient()
+    client.exchange = venue
+    client.dry_run = False
+    executor = TradeExecutor(client)
+    db = FakeDB(config)
+    attach_db(db, executor)
+    return executor, db
+
+
+def test_open_refused_when_positions_unknown():
+    venue = PositionExchange()
+    venue.down = True
+    executor, db = _executor(venue)
+
+    res = asyncio.run(executor.open_pair({'symbol_a': 'BTC', 'symbol_b': 'ETH', 'zscore': 2.5, 'hedge_ratio': 1.0}))
+
+    assert res == {'success': False, 'reason': 'exchange_position_unknown'}
+    assert venue.orders == []
+    assert db.trades == {}
+
+
+def test_close_left_open_when_unverified():
+    venue = PositionExchange({'BTC': 0.01, 'ETH': 0.2})
+    venue.down = True
+    executor, db = _executor(venue)
+    gid = db.seed_trade('BTC', 'ETH')
+
+    res = asyncio.run(executor.close_pair(gid, 'manual'))
+
+    assert res == {'success': False, 'reason': 'close_unverified'}
+    assert db.trades[gid]['status'] == 'open'
+
+
+def test_rollback_rechecks_instead_of_resending_close():
+    venue = PositionExchange({'BTC': 0.01}, down_after_order=True)
+    executor, _ = _executor(venue)
+    sent = []
+    close_position = executor.exchange.close_position
+
+    async def counting_close(symbol, open_side):
+        sent.append(symbol)
+        return await close_position(symbol, open_side)
+
+    executor.exchange.close_position = counting_close
+    asyncio.run(executor._rollback_leg('BTC', 'buy', 500.0))
+
+    assert sent == ['BTC']
+    assert venue.orders == [('BTC/USDT:USDT', 'sell', 0.01)]